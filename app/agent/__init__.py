@@ -1,3 +1,5 @@
 from .agent import Agent
+from .digest_cache import DigestCache
+from .prompt_cache import PromptCache
 
-__all__ = ["Agent"]
+__all__ = ["Agent", "DigestCache", "PromptCache"]
@@ -1,77 +1,325 @@
 import os
 from google.genai import Client
 from ..models.news import NewsItem
-from typing import List
-from ..models.llm_response import DigestLLMResponse, EmailLLMResponse
+from typing import Dict, List, Tuple
+from ..models.llm_response import DigestLLMResponse, EmailLLMResponse, EmailSection
+from ..models.subscriber import Edition
+from ..models.config import (
+    DigestConfig,
+    LLMCallStats,
+    LLMConfig,
+    PromptCacheConfig,
+)
 import logging
 import asyncio
-from dotenv import load_dotenv
+import time
 from langfuse import observe, get_client
 
-load_dotenv()
+from .digest_cache import DigestCache
+from .prompt_cache import PromptCache
+from .rate_limiter import RateLimiter
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .condenser import estimate_tokens, extractive_condense, split_chunks
 
 logger = logging.getLogger(__name__)
 
 
 class Agent:
-    def __init__(self):
+    def __init__(
+        self,
+        digest_cache: DigestCache | None = None,
+        digest_config: DigestConfig | None = None,
+        prompt_config: PromptCacheConfig | None = None,
+        llm_config: LLMConfig | None = None,
+    ):
         self.model = "gemini-2.5-flash"
-        self.client = Client(api_key=os.getenv("GEMINI_API_KEY"))
+        self._client: Client | None = None
         self.langfuse = get_client()
+        self.prompts = PromptCache(self.langfuse, prompt_config)
+        self.digest_cache = digest_cache or DigestCache()
+        self.digest_config = digest_config or DigestConfig()
+        self._semaphore: asyncio.Semaphore | None = None
+        self._semaphore_loop: asyncio.AbstractEventLoop | None = None
+        self.llm_config = llm_config or LLMConfig()
+        self.rate_limiter = RateLimiter(
+            self.llm_config.requests_per_minute, self.llm_config.tokens_per_minute
+        )
+        self.circuit_breaker = CircuitBreaker(
+            "gemini",
+            self.llm_config.circuit_failure_threshold,
+            self.llm_config.circuit_reset_seconds,
+        )
+        self.call_stats: List[LLMCallStats] = []
 
-    @observe(capture_input=False, capture_output=False, as_type="generation")
+    @property
+    def client(self) -> Client:
+        """The Gemini client, open until ``aclose`` at the end of a run."""
+        if self._client is None:
+            base_url = os.getenv("GEMINI_BASE_URL")
+            self._client = Client(
+                api_key=os.getenv("GEMINI_API_KEY"),
+                http_options={"base_url": base_url} if base_url else None,
+            )
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Shared by every digest call so concurrent callers respect one limit.
+
+        Created again in each event loop, as every run has its own.
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.digest_config.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def aclose(self):
+        """Close the Gemini client's async transport, bound to the running loop.
+
+        The next call opens a new client, so the agent can serve another run.
+        """
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aio.aclose()
+
+    async def _generate(self, stats: LLMCallStats, formatted_prompt: str, config: dict):
+        """Make one rate-limited, circuit-broken async call to Gemini.
+
+        Fills in the latency and token usage of ``stats`` and updates the
+        current Langfuse generation.
+        """
+        self.circuit_breaker.before_call()
+        estimated_tokens = estimate_tokens(formatted_prompt)
+        await self.rate_limiter.acquire(estimated_tokens)
+
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(
+                self.client.aio.models.generate_content(
+                    model=self.model, contents=formatted_prompt, config=config
+                ),
+                timeout=self.llm_config.timeout_seconds,
+            )
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        finally:
+            stats.latency_seconds = time.perf_counter() - start
+        self.circuit_breaker.record_success()
+
+        stats.input_tokens = response.usage_metadata.prompt_token_count or 0
+        stats.output_tokens = response.usage_metadata.candidates_token_count or 0
+        self.rate_limiter.record(
+            estimated_tokens, stats.input_tokens + stats.output_tokens
+        )
+        logger.info(
+            f"LLM call {stats.name}: {stats.latency_seconds:.2f}s, "
+            f"{stats.input_tokens} input / {stats.output_tokens} output tokens",
+            extra={"llm_call": stats.model_dump()},
+        )
+
+        self.langfuse.update_current_generation(
+            model=self.model,
+            input=formatted_prompt,
+            output=response.text,
+            usage_details={"input": stats.input_tokens, "output": stats.output_tokens},
+        )
+        return response
+
+    def _make_batches(self, contents: List[Tuple[NewsItem, str]]) -> List[List]:
+        """Split serialized items into batches that fit the token budget."""
+        batches, batch, batch_tokens = [], [], 0
+        for item, content in contents:
+            tokens = estimate_tokens(content)
+            if batch and batch_tokens + tokens > self.digest_config.max_batch_tokens:
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append((item, content))
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    @observe(capture_input=False, capture_output=False)
     async def add_digest(self, items: List[NewsItem]) -> List[NewsItem]:
-        prompt = self.langfuse.get_prompt("digest-prompt")
-        formatted_prompt = prompt.compile(
-            contents="\n".join(
-                [
-                    item.model_dump_json(
+        if not items:
+            return items
+
+        prompt = self.prompts.get("digest-prompt")
+        prompt_version = str(prompt.version)
+
+        cache_keys = {
+            item.guid: DigestCache.key(self.model, prompt_version, item)
+            for item in items
+        }
+        cached_digests = await asyncio.to_thread(
+            self.digest_cache.get, list(cache_keys.values())
+        )
+        for item in items:
+            if cache_keys[item.guid] in cached_digests:
+                item.digest = cached_digests[cache_keys[item.guid]]
+
+        uncached_items = [item for item in items if not item.digest]
+        logger.info(
+            f"Digest cache: {len(items) - len(uncached_items)} hits, "
+            f"{len(uncached_items)} misses"
+        )
+        if not uncached_items:
+            return items
+
+        descriptions = await asyncio.gather(
+            *(self._condense(item.description) for item in uncached_items)
+        )
+        batches = self._make_batches(
+            [
+                (
+                    item,
+                    item.model_copy(
+                        update={"description": description}
+                    ).model_dump_json(
                         indent=2, include={"guid", "source", "title", "description"}
-                    )
-                    for item in items
-                ]
+                    ),
+                )
+                for item, description in zip(uncached_items, descriptions)
+            ]
+        )
+        stats = await asyncio.gather(
+            *(
+                self._digest_batch(prompt, batch, index)
+                for index, batch in enumerate(batches, start=1)
             )
         )
+        self.call_stats.extend(stats)
 
-        try:
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
-                model=self.model,
-                contents=formatted_prompt,
-                config={
-                    "response_mime_type": "application/json",
-                    "response_json_schema": DigestLLMResponse.model_json_schema(),
-                },
-            )
+        failed = sum(1 for batch_stats in stats if not batch_stats.success)
+        logger.info(
+            f"Digested {len(uncached_items)} items in {len(batches)} batches "
+            f"({failed} failed, "
+            f"{sum(batch_stats.input_tokens for batch_stats in stats)} input tokens, "
+            f"{sum(batch_stats.output_tokens for batch_stats in stats)} output tokens)"
+        )
 
-            self.langfuse.update_current_generation(
-                model=self.model,
-                input=formatted_prompt,
-                output=response.text,
-                usage_details={
-                    "input": response.usage_metadata.prompt_token_count,
-                    "output": response.usage_metadata.candidates_token_count,
-                },
+        await asyncio.to_thread(
+            self.digest_cache.put,
+            {
+                cache_keys[item.guid]: item.digest
+                for item in uncached_items
+                if item.digest
+            },
+            self.model,
+            prompt_version,
+        )
+        return items
+
+    async def _condense(self, description: str | None) -> str | None:
+        """Shrink a description to the per-item token ceiling of the prompt.
+
+        The full description is kept on the item, only the prompt sees the
+        condensed version.
+        """
+        max_tokens = self.digest_config.max_item_tokens
+        if not description or estimate_tokens(description) <= max_tokens:
+            return description
+
+        threshold = self.digest_config.llm_condense_threshold_tokens
+        if threshold is not None and estimate_tokens(description) > threshold:
+            chunks = split_chunks(description, self.digest_config.condense_chunk_tokens)
+            chunk_tokens = max(1, max_tokens // len(chunks))
+            summaries = await asyncio.gather(
+                *(self._condense_chunk(chunk, chunk_tokens) for chunk in chunks)
             )
+            if all(summaries):
+                description = " ".join(summaries)
 
-            validated_response = DigestLLMResponse.model_validate_json(response.text)
+        return await asyncio.to_thread(extractive_condense, description, max_tokens)
 
-            digest_map = {
-                digest.guid: digest.digest for digest in validated_response.digests
-            }
+    @observe(capture_input=False, capture_output=False, as_type="generation")
+    async def _condense_chunk(self, chunk: str, max_tokens: int) -> str | None:
+        stats = LLMCallStats(name="condense-chunk", items=1)
+        self.call_stats.append(stats)
+        try:
+            prompt = self.prompts.get("condense-prompt")
+            formatted_prompt = prompt.compile(
+                contents=chunk, max_tokens=str(max_tokens)
+            )
 
-            for item in items:
-                if item.guid in digest_map:
-                    item.digest = digest_map[item.guid]
-            return items
+            async with self.semaphore:
+                response = await self._generate(
+                    stats, formatted_prompt, {"max_output_tokens": max_tokens}
+                )
+            return response.text
 
         except Exception as e:
-            logger.exception(f"Failed to generate digests for news articles: {e}")
-            return items
+            stats.success = False
+            logger.exception(f"Failed to condense transcript chunk: {e}")
+            return None
+
+    @observe(capture_input=False, capture_output=False, as_type="generation")
+    async def _digest_batch(
+        self,
+        prompt,
+        batch: List[Tuple[NewsItem, str]],
+        index: int,
+    ) -> LLMCallStats:
+        formatted_prompt = prompt.compile(
+            contents="\n".join([content for _, content in batch])
+        )
+        stats = LLMCallStats(name="digest-batch", items=len(batch), attempts=0)
+
+        for attempt in range(self.digest_config.max_retries + 1):
+            stats.attempts += 1
+            try:
+                async with self.semaphore:
+                    response = await self._generate(
+                        stats,
+                        formatted_prompt,
+                        {
+                            "response_mime_type": "application/json",
+                            "response_json_schema": DigestLLMResponse.model_json_schema(),
+                        },
+                    )
+
+                validated_response = DigestLLMResponse.model_validate_json(
+                    response.text
+                )
+
+                digest_map = {
+                    digest.guid: digest.digest for digest in validated_response.digests
+                }
+
+                for item, _ in batch:
+                    if item.guid in digest_map:
+                        item.digest = digest_map[item.guid]
+
+                logger.info(
+                    f"Digest batch {index}: {len(batch)} items in "
+                    f"{stats.latency_seconds:.1f}s, {stats.input_tokens} input / "
+                    f"{stats.output_tokens} output tokens"
+                )
+                return stats
+
+            except CircuitOpenError as e:
+                logger.error(f"Skipping digest batch {index}: {e}")
+                break
+            except Exception as e:
+                if attempt == self.digest_config.max_retries:
+                    logger.exception(
+                        f"Failed to generate digests for batch {index}: {e}"
+                    )
+                    break
+                delay = self.digest_config.backoff_base_seconds * (2**attempt)
+                logger.warning(
+                    f"Digest batch {index} failed ({e}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+        stats.success = False
+        return stats
 
     @observe(capture_input=False, capture_output=False, as_type="generation")
-    def create_email_content(self, items: List[NewsItem]) -> EmailLLMResponse:
-        prompt = self.langfuse.get_prompt("email-prompt")
+    async def create_email_content(self, items: List[NewsItem]) -> EmailLLMResponse:
+        prompt = self.prompts.get("email-prompt")
         formatted_prompt = prompt.compile(
             contents="\n".join(
                 [
@@ -83,37 +331,112 @@ class Agent:
                             "url",
                             "digest",
                             "author",
+                            "also_covered_by",
                         },
                     )
                     for item in items
-                    if item.digest
+                    if item.digest and not item.duplicate_of
                 ]
             ),
         )
+        stats = LLMCallStats(name="email-content", items=len(items))
+        self.call_stats.append(stats)
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=formatted_prompt,
-                config={
+            response = await self._generate(
+                stats,
+                formatted_prompt,
+                {
                     "response_mime_type": "application/json",
                     "response_json_schema": EmailLLMResponse.model_json_schema(),
                 },
             )
 
-            self.langfuse.update_current_generation(
-                model=self.model,
-                input=formatted_prompt,
-                output=response.text,
-                usage_details={
-                    "input": response.usage_metadata.prompt_token_count,
-                    "output": response.usage_metadata.candidates_token_count,
-                },
-            )
-
             validated_response = EmailLLMResponse.model_validate_json(response.text)
+
+            also_covered_by = {
+                item.url: item.also_covered_by for item in items if item.also_covered_by
+            }
+            for email_item in validated_response.digest_items:
+                email_item.also_covered_by = also_covered_by.get(email_item.url, [])
             return validated_response
 
         except Exception as e:
+            stats.success = False
             logger.exception(f"Failed to generate email content: {e}")
             return None
+
+    async def write_editions(self, editions: List[Edition]) -> int:
+        """Write the email content of each edition.
+
+        Editions grouped into topics get one LLM call per topic, run
+        concurrently, and the sections are merged. Calls for the same items
+        are shared between editions, so the cost follows the number of
+        distinct item sets, not of subscribers. Returns the number of LLM
+        calls made.
+        """
+        calls: Dict[Tuple[str, ...], asyncio.Task] = {}
+
+        def call(items: List[NewsItem]) -> asyncio.Task:
+            key = tuple(item.guid for item in items)
+            if key not in calls:
+                calls[key] = asyncio.create_task(self.create_email_content(items))
+            return calls[key]
+
+        sections = {
+            index: [(topic.label, call(topic.items)) for topic in edition.topics]
+            for index, edition in enumerate(editions)
+            if edition.topics
+        }
+        whole = {
+            index: call(edition.top_items)
+            for index, edition in enumerate(editions)
+            if edition.top_items and not edition.topics
+        }
+        await asyncio.gather(*calls.values())
+
+        for index, edition in enumerate(editions):
+            if index in sections:
+                edition.email_content = self._merge_sections(
+                    [(label, task.result()) for label, task in sections[index]]
+                )
+            elif index in whole:
+                edition.email_content = whole[index].result()
+            else:
+                edition.email_content = EmailLLMResponse(
+                    introduction="You're all caught up for today, check again tomorrow :)",
+                    digest_items=[],
+                )
+        return len(calls)
+
+    @staticmethod
+    def _merge_sections(
+        responses: List[Tuple[str, EmailLLMResponse | None]],
+    ) -> EmailLLMResponse | None:
+        """Combine the content written per topic, leaving out failed topics."""
+        sections = [
+            EmailSection(
+                topic=label,
+                introduction=response.introduction,
+                digest_items=response.digest_items,
+            )
+            for label, response in responses
+            if response is not None
+        ]
+        if not sections:
+            return None
+        if len(sections) < len(responses):
+            logger.warning(
+                f"Left {len(responses) - len(sections)} failed topics out of the email"
+            )
+        return EmailLLMResponse(
+            introduction=(
+                f"Today's news in {len(sections)} topics: "
+                + ", ".join(section.topic for section in sections)
+                + "."
+            ),
+            digest_items=[
+                item for section in sections for item in section.digest_items
+            ],
+            sections=sections,
+        )
@@ -0,0 +1,96 @@
+import math
+import re
+from collections import Counter
+from typing import List
+
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+# Auto-generated transcripts often have no punctuation, so long sentences are
+# split into windows of this many words before scoring.
+WINDOW_WORDS = 40
+
+CHARS_PER_TOKEN = 4
+
+STOPWORDS = frozenset("""
+    a about above after again all also am an and any are as at be because been
+    before being below between both but by can could did do does doing down
+    during each few for from further get got had has have having he her here
+    hers him his how i if in into is it its itself just know like me more most
+    my no nor not now of off on once only or other our out over own really
+    right same she should so some such than that the their them then there
+    these they this those through to too um uh under until up very was we
+    were what when where which while who whom why will with would yeah you
+    your going gonna thing things think actually kind lot okay oh
+    """.split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate, about four characters per token."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def split_segments(text: str) -> List[str]:
+    """Split text into sentences, windowing sentences that are too long."""
+    segments = []
+    for sentence in SENTENCE_PATTERN.split(text):
+        words = sentence.split()
+        for start in range(0, len(words), WINDOW_WORDS):
+            segments.append(" ".join(words[start : start + WINDOW_WORDS]))
+    return segments
+
+
+def extractive_condense(text: str, max_tokens: int) -> str:
+    """Keep the highest scoring segments of a text within a token budget.
+
+    Segments are scored by the average document frequency of their content
+    words, with a small boost for the opening of the text, and the selected
+    ones are returned in their original order.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    segments = split_segments(text)
+    segment_words = [
+        [
+            word
+            for word in WORD_PATTERN.findall(segment.lower())
+            if word not in STOPWORDS
+        ]
+        for segment in segments
+    ]
+    frequencies = Counter(word for words in segment_words for word in words)
+
+    scores = []
+    for position, words in enumerate(segment_words):
+        score = (
+            sum(frequencies[word] for word in set(words)) / math.sqrt(len(words))
+            if words
+            else 0.0
+        )
+        scores.append(score * (1.5 if position < 3 else 1.0))
+
+    selected, used_tokens = set(), 0
+    for position in sorted(range(len(segments)), key=scores.__getitem__, reverse=True):
+        tokens = estimate_tokens(segments[position]) + 1
+        if used_tokens + tokens > max_tokens:
+            continue
+        selected.add(position)
+        used_tokens += tokens
+
+    return " ... ".join(segments[position] for position in sorted(selected))
+
+
+def split_chunks(text: str, chunk_tokens: int) -> List[str]:
+    """Split text into consecutive chunks of roughly ``chunk_tokens`` tokens."""
+    chunks, chunk, chunk_size = [], [], 0
+    for segment in split_segments(text):
+        tokens = estimate_tokens(segment)
+        if chunk and chunk_size + tokens > chunk_tokens:
+            chunks.append(" ".join(chunk))
+            chunk, chunk_size = [], 0
+        chunk.append(segment)
+        chunk_size += tokens
+    if chunk:
+        chunks.append(" ".join(chunk))
+    return chunks
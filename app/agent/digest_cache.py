@@ -0,0 +1,47 @@
+import hashlib
+import json
+from typing import Dict, List, Optional
+import logging
+
+from ..db import Repository
+from ..models.news import NewsItem
+
+logger = logging.getLogger(__name__)
+
+
+class DigestCache:
+    """Content-addressed cache of LLM digests stored in the database.
+
+    Entries are keyed by a hash of the model, the prompt version and the item
+    content, so the same article digested in another run or syndicated under
+    another GUID is only sent to the LLM once.
+    """
+
+    def __init__(self, repository: Optional[Repository] = None):
+        self.repository = repository
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, prompt_version: str, item: NewsItem) -> str:
+        content = json.dumps(
+            [model, prompt_version, item.source, item.title, item.description or ""]
+        )
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def get(self, keys: List[str]) -> Dict[str, str]:
+        """Return the cached digests among the given keys."""
+        digests = self.repository.get_cached_digests(keys) if self.repository else {}
+        hits = sum(1 for key in keys if key in digests)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return digests
+
+    def put(self, digests: Dict[str, str], model: str, prompt_version: str):
+        if self.repository and digests:
+            self.repository.save_cached_digests(digests, model, prompt_version)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
@@ -0,0 +1,134 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Optional, Set
+import logging
+
+from ..models.config import PromptCacheConfig
+from ..models.prompt import CachedPrompt
+
+logger = logging.getLogger(__name__)
+
+
+class PromptCache:
+    """In-process and on-disk cache of Langfuse prompts.
+
+    Fresh prompts are served from memory, stale ones are served immediately
+    while a background thread refreshes them, and the on-disk copy is used
+    when Langfuse is unreachable. Pinned versions never change, so once
+    fetched they are not refreshed at all. With no copy on disk either, the
+    template bundled in ``prompts/`` is used until Langfuse is back.
+    """
+
+    BUNDLED_DIR = Path(__file__).parent / "prompts"
+    # Langfuse numbers versions from 1
+    BUNDLED_VERSION = 0
+
+    def __init__(self, langfuse, config: Optional[PromptCacheConfig] = None):
+        self.langfuse = langfuse
+        self.config = config or PromptCacheConfig()
+        self.cache_dir = Path(self.config.cache_dir)
+        self._prompts: Dict[str, CachedPrompt] = {}
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        pinned = self.config.pinned_versions.get(name)
+        suffix = f"-v{pinned}" if pinned is not None else ""
+        return self.cache_dir / f"{name}{suffix}.json"
+
+    def _is_fresh(self, prompt: CachedPrompt) -> bool:
+        if prompt.version == self.BUNDLED_VERSION:
+            return False
+        if prompt.name in self.config.pinned_versions:
+            return True
+        age = datetime.now(timezone.utc) - prompt.fetched_at
+        return age < timedelta(seconds=self.config.ttl_seconds)
+
+    def _load(self, name: str) -> Optional[CachedPrompt]:
+        path = self._path(name)
+        if not path.exists():
+            return None
+        try:
+            return CachedPrompt.model_validate_json(path.read_text())
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cached prompt {path}: {e}")
+            return None
+
+    def _store(self, prompt: CachedPrompt):
+        with self._lock:
+            self._prompts[prompt.name] = prompt
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(prompt.name)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_text(prompt.model_dump_json())
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning(f"Failed to write prompt cache for {prompt.name}: {e}")
+
+    def _fetch(self, name: str) -> CachedPrompt:
+        prompt = self.langfuse.get_prompt(
+            name, version=self.config.pinned_versions.get(name)
+        )
+        cached_prompt = CachedPrompt(
+            name=name,
+            version=prompt.version,
+            template=prompt.prompt,
+            fetched_at=datetime.now(timezone.utc),
+        )
+        self._store(cached_prompt)
+        return cached_prompt
+
+    def _bundled(self, name: str) -> CachedPrompt:
+        """The template shipped with the code, kept in memory only."""
+        prompt = CachedPrompt(
+            name=name,
+            version=self.BUNDLED_VERSION,
+            template=(self.BUNDLED_DIR / f"{name}.txt").read_text(),
+            fetched_at=datetime.now(timezone.utc),
+        )
+        with self._lock:
+            self._prompts[name] = prompt
+        return prompt
+
+    def _refresh(self, name: str):
+        try:
+            self._fetch(name)
+        except Exception as e:
+            logger.warning(f"Failed to refresh prompt {name}, keeping cached copy: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(name)
+
+    def _refresh_in_background(self, name: str):
+        with self._lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+        threading.Thread(target=self._refresh, args=(name,), daemon=True).start()
+
+    def get(self, name: str) -> CachedPrompt:
+        """Return a prompt, hitting Langfuse synchronously only on a cold cache."""
+        with self._lock:
+            prompt = self._prompts.get(name)
+
+        if prompt is None:
+            prompt = self._load(name)
+            if prompt is not None:
+                with self._lock:
+                    self._prompts[name] = prompt
+
+        if prompt is None:
+            try:
+                return self._fetch(name)
+            except Exception as e:
+                logger.warning(
+                    f"Failed to fetch prompt {name} with no cached copy, "
+                    f"using the bundled template: {e}"
+                )
+                return self._bundled(name)
+
+        if not self._is_fresh(prompt):
+            self._refresh_in_background(name)
+        return prompt
@@ -0,0 +1,373 @@
+"""Command line interface of the AI News Aggregator.
+
+Commands import what they use when they run, so quick ones like ``search``
+or ``--help`` do not load the LLM, scraping and clustering libraries.
+"""
+
+import argparse
+import csv
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, List
+
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from app.db.repository import Repository
+    from app.models.config import RunnerConfig
+
+logger = logging.getLogger(__name__)
+
+YOUTUBE_CHANNELS = [
+    "UCLKPca3kwwd-B59HNr-_lvA",
+    "UCn8ujwUInbJkBhffxqAPBVQ",
+    "UCDsVC_ewpcEW_AQcO-H-RDQ",
+]
+SOURCES = ["OpenAI", "Anthropic", "YouTube", "Modular"]
+
+
+def split_list(value: str, separator: str = ",") -> List[str]:
+    return [entry.strip() for entry in value.split(separator) if entry.strip()]
+
+
+def load_config() -> "RunnerConfig":
+    """Load the .env file into the environment and build the run configuration."""
+    from app.models.config import MetricsConfig, RunnerConfig
+
+    load_dotenv()
+    return RunnerConfig(
+        time_window_hours=24,
+        youtube_channels=YOUTUBE_CHANNELS,
+        metrics=MetricsConfig(
+            json_path=os.getenv("METRICS_JSON_PATH"),
+            prometheus_path=os.getenv("METRICS_PROMETHEUS_PATH"),
+        ),
+    )
+
+
+def stored_since(args: argparse.Namespace, config: "RunnerConfig") -> datetime:
+    hours = args.hours or config.time_window_hours
+    return datetime.now(timezone.utc) - timedelta(hours=hours)
+
+
+def run(args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"):
+    from app.runner import Runner
+
+    Runner(config, repository).run()
+
+
+def scrape(args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"):
+    from app.runner import Runner
+
+    Runner(config, repository).scrape(args.hours)
+
+
+def digest(args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"):
+    from app.runner import Runner
+
+    Runner(config, repository).digest(stored_since(args, config))
+
+
+def send(args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"):
+    from app.runner import Runner
+
+    Runner(config, repository).send(stored_since(args, config))
+
+
+def dry_run(args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"):
+    from app.runner import Runner
+
+    for path in Runner(config, repository).preview(
+        stored_since(args, config), args.output
+    ):
+        print(path)
+
+
+def backfill(
+    args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"
+):
+    from app.runner import Runner
+
+    Runner(config, repository).backfill(args.days)
+
+
+def daemon(args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"):
+    from app.daemon import Daemon
+    from app.models.config import DaemonConfig
+
+    if args.send_at:
+        config.daemon = DaemonConfig(send_at=args.send_at)
+    Daemon(config, repository).serve()
+
+
+def coordinator(
+    args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"
+):
+    from app.distributed import Coordinator
+
+    Coordinator(config, repository).run()
+
+
+def worker(args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"):
+    from app.distributed import Worker
+
+    if args.concurrency:
+        config.distributed.worker_concurrency = args.concurrency
+    Worker(config, repository, args.worker_id).run(args.idle_exit)
+
+
+def search(args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"):
+    since = args.since
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    results = repository.search(args.query, args.source, since, args.limit)
+    if not results:
+        print("No matches")
+    for result in results:
+        item = result.item
+        print(
+            f"{result.rank:7.3f}  {item.published_at:%Y-%m-%d}  {item.source}  {item.title}"
+        )
+        print(f"         {item.url}")
+        if result.snippet:
+            print(f"         {' '.join(result.snippet.split())}")
+
+
+def subscribers(
+    args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"
+):
+    from app.models.subscriber import Subscriber
+
+    if args.add:
+        repository.save_subscribers(
+            [
+                Subscriber(
+                    email=args.add,
+                    name=args.name,
+                    sources=args.sources,
+                    keywords=args.keywords,
+                )
+            ]
+        )
+    if args.import_path:
+        with open(args.import_path, newline="") as file:
+            imported = repository.save_subscribers(
+                [
+                    Subscriber(
+                        email=row["email"].strip(),
+                        name=row.get("name") or None,
+                        sources=split_list(row.get("sources") or "", ";"),
+                        keywords=split_list(row.get("keywords") or "", ";"),
+                    )
+                    for row in csv.DictReader(file)
+                    if row.get("email")
+                ]
+            )
+        logger.info(f"Imported {imported} subscribers")
+    if args.remove and not repository.remove_subscriber(args.remove):
+        logger.warning(f"{args.remove} is not subscribed")
+    if not any([args.add, args.import_path, args.remove]):
+        for subscriber in repository.get_subscribers():
+            print(
+                f"{subscriber.email}\t{subscriber.name or ''}\t"
+                f"{','.join(subscriber.sources) or 'all sources'}\t"
+                f"{','.join(subscriber.keywords) or 'all topics'}"
+            )
+
+
+def maintenance(
+    args: argparse.Namespace, config: "RunnerConfig", repository: "Repository"
+):
+    from app.db.maintenance import PartitionMaintenance
+
+    partitions = PartitionMaintenance(repository)
+    if args.convert:
+        partitions.convert_to_partitioned()
+    if args.train_dictionary:
+        repository.train_compression_dictionary()
+    if args.compress:
+        repository.compress_descriptions()
+        repository.index_compressed_descriptions()
+    if args.rebuild_term_stats:
+        repository.rebuild_term_stats()
+    if repository.is_sqlite or not repository.is_partitioned():
+        return
+    repository.ensure_partitions(months_ahead=args.months_ahead)
+    if args.retain_months is not None:
+        partitions.apply_retention(args.retain_months, args.archive_dir)
+
+
+def add_hours_argument(parser: argparse.ArgumentParser, help_text: str):
+    parser.add_argument(
+        "--hours", type=int, help=f"{help_text}, defaults to the run time window"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="AI News Aggregator")
+    parser.set_defaults(handler=run)
+    commands = parser.add_subparsers(dest="command")
+
+    commands.add_parser(
+        "run", help="Scrape, digest and store new items and email them (default)"
+    ).set_defaults(handler=run)
+    command = commands.add_parser(
+        "scrape", help="Store new items and transcripts without digesting them"
+    )
+    add_hours_argument(command, "Only items published in the last HOURS")
+    command.set_defaults(handler=scrape)
+    command = commands.add_parser(
+        "digest", help="Digest stored items that have no digest yet"
+    )
+    add_hours_argument(command, "Only items stored in the last HOURS")
+    command.set_defaults(handler=digest)
+    command = commands.add_parser(
+        "send", help="Email the digested items stored recently"
+    )
+    add_hours_argument(command, "Items stored in the last HOURS")
+    command.set_defaults(handler=send)
+    command = commands.add_parser(
+        "dry-run",
+        help="Write the email of the items stored recently to HTML files "
+        "instead of sending it",
+    )
+    add_hours_argument(command, "Items stored in the last HOURS")
+    command.add_argument(
+        "--output", default="dry-run", help="Directory of the HTML files"
+    )
+    command.set_defaults(handler=dry_run)
+    command = commands.add_parser(
+        "backfill",
+        help="Scrape, digest and store the items of the last days without "
+        "emailing them, including feed entries seen before",
+    )
+    command.add_argument("--days", type=int, default=7)
+    command.set_defaults(handler=backfill)
+
+    command = commands.add_parser(
+        "daemon",
+        help="Keep polling sources and digesting new items, and send the email daily",
+    )
+    command.add_argument(
+        "--send-at", metavar="HH:MM", help="UTC time of day to send the email"
+    )
+    command.set_defaults(handler=daemon)
+    commands.add_parser(
+        "coordinator", help="Queue a run for workers, wait for it and send the email"
+    ).set_defaults(handler=coordinator)
+    command = commands.add_parser(
+        "worker", help="Process queued scrape and digest tasks"
+    )
+    command.add_argument(
+        "--concurrency", type=int, help="Number of tasks processed at once"
+    )
+    command.add_argument(
+        "--idle-exit",
+        type=float,
+        metavar="SECONDS",
+        help="Exit after this long without tasks instead of waiting forever",
+    )
+    command.add_argument("--worker-id", help="Defaults to hostname-pid")
+    command.set_defaults(handler=worker)
+
+    command = commands.add_parser("search", help="Full-text search stored news")
+    command.add_argument("query", help='e.g. "open weights" release -rumor')
+    command.add_argument("--source", choices=SOURCES)
+    command.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="Only items published since this date, e.g. 2025-06-01",
+    )
+    command.add_argument("--limit", type=int, default=20)
+    command.set_defaults(handler=search)
+
+    command = commands.add_parser(
+        "maintenance", help="Manage the monthly news_items partitions"
+    )
+    command.add_argument(
+        "--convert",
+        action="store_true",
+        help="Move an unpartitioned news_items table into monthly partitions",
+    )
+    command.add_argument(
+        "--train-dictionary",
+        action="store_true",
+        help="Train a new compression dictionary on recent long descriptions",
+    )
+    command.add_argument(
+        "--compress",
+        action="store_true",
+        help="Compress long descriptions stored before compression was enabled, "
+        "and index the full text of compressed ones for search",
+    )
+    command.add_argument(
+        "--rebuild-term-stats",
+        action="store_true",
+        help="Recount the term statistics used to group the email into topics",
+    )
+    command.add_argument(
+        "--months-ahead", type=int, help="Months of partitions to create in advance"
+    )
+    command.add_argument(
+        "--retain-months",
+        type=int,
+        help="Drop partitions older than this many whole months",
+    )
+    command.add_argument(
+        "--archive-dir",
+        help="Archive dropped partitions here as gzipped CSV files first",
+    )
+    command.set_defaults(handler=maintenance)
+
+    command = commands.add_parser(
+        "subscribers", help="List, add or remove recipients of the email"
+    )
+    command.add_argument("--add", metavar="EMAIL", help="Add a subscriber")
+    command.add_argument("--name", help="Name of the added subscriber")
+    command.add_argument(
+        "--sources",
+        type=split_list,
+        default=[],
+        help="Comma-separated sources the added subscriber gets, e.g. YouTube",
+    )
+    command.add_argument(
+        "--keywords",
+        type=split_list,
+        default=[],
+        help='Comma-separated topics, e.g. "open weights,agents"',
+    )
+    command.add_argument(
+        "--import",
+        dest="import_path",
+        metavar="CSV",
+        help="Add subscribers from a CSV file with email and optional name, "
+        "sources and keywords columns, the last two separated by semicolons",
+    )
+    command.add_argument("--remove", metavar="EMAIL", help="Remove a subscriber")
+    command.set_defaults(handler=subscribers)
+    return parser
+
+
+def main(argv: List[str] | None = None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+    try:
+        logger.info("Starting AI News Aggregator...")
+        config = load_config()
+
+        from app.db.repository import Repository
+
+        repository = Repository()
+        repository.create_tables()
+        logger.info("Database initialized successfully")
+
+        args.handler(args, config, repository)
+
+    except Exception as e:
+        logger.error(f"Fatal error in AI News Aggregator: {e}", exc_info=True)
+        raise
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import random
+import signal
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Coroutine, Deque, Dict, List, Tuple
+
+from .db import Repository
+from .models import DaemonConfig, RunnerConfig, RunnerResult, SaveResult
+from .models.news import NewsItem
+from .runner import Runner
+from .scrapers import FeedFetcher
+
+logger = logging.getLogger(__name__)
+
+
+class SourceSchedule:
+    """When to poll one source next, adapted to how often it posts.
+
+    The interval is a fraction of the mean time between the source's recent
+    posts. It grows while polls find nothing new and doubles per failure,
+    and is jittered so sources do not poll in lockstep.
+    """
+
+    def __init__(self, name: str, urls: List[str], config: DaemonConfig):
+        self.name = name
+        self.urls = urls
+        self.config = config
+        self.posted: Deque[datetime] = deque(maxlen=config.posting_history)
+        self.interval = config.initial_poll_seconds
+        self.failures = 0
+        # On the time.monotonic clock, due immediately
+        self.next_poll_at = 0.0
+
+    def posting_interval(self) -> float | None:
+        """Mean seconds between the remembered posts, None with fewer than two."""
+        if len(self.posted) < 2:
+            return None
+        posted = sorted(self.posted)
+        return (posted[-1] - posted[0]).total_seconds() / (len(posted) - 1)
+
+    def record(self, items: List[NewsItem] | None, now: float) -> float:
+        """Schedule the next poll after one found ``items``, or None if it failed.
+
+        Returns the delay until the next poll.
+        """
+        config = self.config
+        if items is None:
+            self.failures += 1
+            interval = self.interval * 2**self.failures
+        else:
+            self.failures = 0
+            self.posted.extend(item.published_at for item in items)
+            posting_interval = self.posting_interval()
+            if items:
+                self.interval = (
+                    config.initial_poll_seconds
+                    if posting_interval is None
+                    else posting_interval / config.polls_per_post
+                )
+            else:
+                self.interval *= config.quiet_backoff
+            self.interval = min(
+                max(self.interval, config.min_poll_seconds), config.max_poll_seconds
+            )
+            interval = self.interval
+
+        interval = min(interval, config.max_poll_seconds)
+        delay = interval * random.uniform(1 - config.jitter, 1 + config.jitter)
+        self.next_poll_at = now + delay
+        return delay
+
+
+class Daemon(Runner):
+    """Runs the pipeline continuously and sends the email at a set time.
+
+    Sources are polled on their own schedules, and new items are digested
+    and stored as they arrive, so the scheduled send only plans, writes and
+    mails the email from stored items. The HTTP, LLM and database clients
+    stay open between polls.
+    """
+
+    # Longest sleep, so a changed wall clock is noticed
+    MAX_SLEEP_SECONDS = 60.0
+
+    def __init__(self, config: RunnerConfig, repository: Repository):
+        super().__init__(config, repository)
+        self.daemon_config = config.daemon
+        self._save_result = SaveResult()
+        self._dedup_loaded_at: datetime | None = None
+
+    def next_send_time(self, now: datetime) -> datetime:
+        """The first scheduled send after ``now``."""
+        hour, minute = map(int, self.daemon_config.send_at.split(":"))
+        send_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return send_at if send_at > now else send_at + timedelta(days=1)
+
+    async def _poll(
+        self,
+        fetcher: FeedFetcher,
+        sources: Dict[str, Tuple[List[str], Callable[[int], Coroutine]]],
+        schedules: List[SourceSchedule],
+    ):
+        """Ingest new items from the due sources and schedule their next polls."""
+        now = datetime.now(timezone.utc)
+        if self.dedup_config.enabled and (
+            self._dedup_loaded_at is None
+            or now - self._dedup_loaded_at > timedelta(days=1)
+        ):
+            # Reloaded daily, so items older than the lookback are dropped
+            self.dedup_index = await asyncio.to_thread(self._load_dedup_index)
+            self._dedup_loaded_at = now
+
+        try:
+            scraped, _, save_result = await self._ingest(
+                fetcher,
+                [
+                    (
+                        schedule.name,
+                        schedule.urls,
+                        sources[schedule.name][1](self.time_window_hours),
+                    )
+                    for schedule in schedules
+                ],
+            )
+        except Exception as e:
+            logger.exception(f"Failed to ingest {len(schedules)} sources: {e}")
+            scraped, save_result = {}, SaveResult()
+        self._save_result.add(save_result)
+
+        for schedule in schedules:
+            items = scraped.get(schedule.name)
+            if any(url in fetcher.failed_urls for url in schedule.urls):
+                items = None
+            delay = schedule.record(items, time.monotonic())
+            logger.info(
+                f"Polled {schedule.name}: "
+                + ("failed" if items is None else f"{len(items)} new items")
+                + f", next poll in {delay / 60:.1f} min"
+            )
+
+    async def _send(self, since: datetime) -> RunnerResult:
+        """Email the digested items stored since ``since``."""
+        result = RunnerResult(started_at=datetime.now(timezone.utc))
+        started = time.perf_counter()
+
+        result.save_result, self._save_result = self._save_result, SaveResult()
+        editions = await self._write_stored(since, result)
+        await asyncio.to_thread(self._deliver, editions, result)
+
+        self._collect_metrics(result)
+        self._reset_metrics()
+        result.duration_seconds = time.perf_counter() - started
+        logger.info(
+            f"Sent the email in {result.duration_seconds:.1f}s: "
+            f"{result.emails_sent} sent, {result.items_scraped} items scraped "
+            f"and {result.items_digested} digested since the last one"
+        )
+        self.metrics_service.export(result)
+        return result
+
+    async def _serve(self):
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+
+        now = datetime.now(timezone.utc)
+        last_sent = now - timedelta(hours=self.time_window_hours)
+        next_send = self.next_send_time(now)
+        logger.info(
+            f"Daemon started, sending the email at {next_send:%Y-%m-%d %H:%M} UTC"
+        )
+
+        async with FeedFetcher(self.feed_cache, self.fetch_config) as fetcher:
+            sources = self._scrape_sources(fetcher)
+            schedules = [
+                SourceSchedule(name, urls, self.daemon_config)
+                for name, (urls, _) in sources.items()
+            ]
+            stopping = asyncio.create_task(stop.wait())
+            polling: asyncio.Task | None = None
+
+            while not stop.is_set():
+                if polling is None or polling.done():
+                    due = [
+                        schedule
+                        for schedule in schedules
+                        if schedule.next_poll_at <= time.monotonic()
+                    ]
+                    polling = (
+                        asyncio.create_task(self._poll(fetcher, sources, due))
+                        if due
+                        else None
+                    )
+
+                now = datetime.now(timezone.utc)
+                if now >= next_send:
+                    # Items being digested right now belong in this email
+                    if polling is not None:
+                        await polling
+                    try:
+                        await self._send(last_sent)
+                    except Exception as e:
+                        logger.exception(f"Failed to send the email: {e}")
+                    last_sent, next_send = now, self.next_send_time(now)
+                    logger.info(f"Next email at {next_send:%Y-%m-%d %H:%M} UTC")
+                    continue
+
+                wake_in = min(
+                    (next_send - now).total_seconds(),
+                    min(schedule.next_poll_at for schedule in schedules)
+                    - time.monotonic(),
+                    self.MAX_SLEEP_SECONDS,
+                )
+                waiting = [stopping] + ([polling] if polling else [])
+                await asyncio.wait(
+                    waiting,
+                    timeout=max(wake_in, 0.0) if not polling else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+            stopping.cancel()
+            if polling is not None:
+                await polling
+        logger.info("Daemon stopped")
+
+    def serve(self):
+        """Poll, digest and send until interrupted with SIGINT or SIGTERM."""
+        self._reset_metrics()
+        asyncio.run(self._closing(self._serve()))
@@ -1,6 +1,27 @@
 """Database module for storing scraped content."""
 
-from .models import Base, NewsItemDB
+from .models import (
+    Base,
+    NewsItemDB,
+    CompressionDictionaryDB,
+    FeedStateDB,
+    TranscriptDB,
+    DigestCacheDB,
+    TermStatDB,
+    SubscriberDB,
+    TaskDB,
+)
 from .repository import Repository
 
-__all__ = ["Base", "NewsItemDB", "Repository"]
+__all__ = [
+    "Base",
+    "NewsItemDB",
+    "CompressionDictionaryDB",
+    "FeedStateDB",
+    "TranscriptDB",
+    "DigestCacheDB",
+    "TermStatDB",
+    "SubscriberDB",
+    "TaskDB",
+    "Repository",
+]
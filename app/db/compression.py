@@ -0,0 +1,77 @@
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+# zlib only looks back 32 KiB, so a larger preset dictionary is never used
+MAX_DICTIONARY_BYTES = 32 * 1024
+WORD = re.compile(r"\S+")
+
+
+def train_dictionary(
+    samples: Iterable[str], size: int = MAX_DICTIONARY_BYTES, max_words: int = 4
+) -> bytes:
+    """Build a zlib preset dictionary from phrases common across the samples.
+
+    Phrases of up to ``max_words`` words are scored by the number of samples
+    containing them times their length, and the best ones are placed last,
+    where back-references to them are shortest.
+    """
+    counts = Counter()
+    for sample in samples:
+        words = WORD.findall(sample[:MAX_DICTIONARY_BYTES])
+        phrases = set()
+        for length in range(1, max_words + 1):
+            for start in range(len(words) - length + 1):
+                phrases.add(" ".join(words[start : start + length]))
+        counts.update(phrases)
+
+    chosen, used = [], 0
+    for phrase, count in sorted(
+        counts.items(), key=lambda entry: entry[1] * len(entry[0]), reverse=True
+    ):
+        if count < 2:
+            break
+        encoded = phrase.encode() + b" "
+        if used + len(encoded) > size:
+            continue
+        if any(phrase in longer for longer in chosen[-64:]):
+            continue
+        chosen.append(phrase)
+        used += len(encoded)
+    return " ".join(reversed(chosen)).encode()
+
+
+class BodyCompressor:
+    """Compresses large item descriptions with zlib and shared dictionaries.
+
+    Every dictionary ever trained is kept, so bodies compressed with an
+    older one stay readable. New bodies use the latest.
+    """
+
+    # Descriptions this long are stored compressed, with a plain preview
+    MIN_CHARS = 4_000
+    PREVIEW_CHARS = 2_000
+    LEVEL = 9
+
+    def __init__(self, dictionaries: Optional[Dict[int, bytes]] = None):
+        self.dictionaries = dictionaries or {}
+        self.dictionary_id = max(self.dictionaries, default=None)
+
+    def compress(self, body: str) -> Tuple[Optional[int], bytes]:
+        """Compress a body with the latest dictionary, returning the dictionary id."""
+        if self.dictionary_id is None:
+            return None, zlib.compress(body.encode(), self.LEVEL)
+        compressor = zlib.compressobj(
+            self.LEVEL, zdict=self.dictionaries[self.dictionary_id]
+        )
+        return (
+            self.dictionary_id,
+            compressor.compress(body.encode()) + compressor.flush(),
+        )
+
+    def decompress(self, data: bytes, dictionary_id: Optional[int]) -> str:
+        if dictionary_id is None:
+            return zlib.decompress(data).decode()
+        decompressor = zlib.decompressobj(zdict=self.dictionaries[dictionary_id])
+        return (decompressor.decompress(data) + decompressor.flush()).decode()
@@ -0,0 +1,172 @@
+import gzip
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import text
+
+from .repository import Repository, month_start
+
+logger = logging.getLogger(__name__)
+
+# Columns archived and copied between layouts; search_vector is generated
+NEWS_ITEM_COLUMNS = ", ".join(
+    [
+        "id",
+        "guid",
+        "source",
+        "title",
+        "description",
+        "description_zlib",
+        "compression_dict_id",
+        "url",
+        "published_at",
+        "author",
+        "digest",
+        "duplicate_of",
+        "created_at",
+    ]
+)
+
+
+class PartitionMaintenance:
+    """Converts news_items to monthly partitions and retires old partitions.
+
+    Postgres only: SQLite databases keep a single table.
+    """
+
+    def __init__(self, repository: Repository):
+        self.repository = repository
+        self.engine = repository.engine
+
+    def _supported(self) -> bool:
+        if self.repository.is_sqlite:
+            logger.warning("Partition maintenance is not supported on SQLite")
+            return False
+        return True
+
+    def convert_to_partitioned(self) -> int:
+        """Move an unpartitioned news_items table into the partitioned layout.
+
+        Runs in one transaction, so readers see either table and a failure
+        leaves the original in place. Returns the number of rows moved.
+        """
+        if not self._supported() or self.repository.is_partitioned():
+            return 0
+
+        with self.engine.begin() as connection:
+            connection.execute(text("LOCK TABLE news_items IN ACCESS EXCLUSIVE MODE"))
+            connection.execute(
+                text("ALTER TABLE news_items RENAME TO news_items_legacy")
+            )
+            connection.execute(
+                text(
+                    "ALTER SEQUENCE IF EXISTS news_items_id_seq "
+                    "RENAME TO news_items_legacy_id_seq"
+                )
+            )
+            # Free the constraint and index names for the partitioned table
+            constraints = connection.execute(
+                text(
+                    "SELECT conname FROM pg_constraint "
+                    "WHERE conrelid = 'news_items_legacy'::regclass "
+                    "AND contype IN ('p', 'u')"
+                )
+            ).scalars()
+            for name in constraints.all():
+                connection.execute(
+                    text(f'ALTER TABLE news_items_legacy DROP CONSTRAINT "{name}"')
+                )
+            indexes = connection.execute(
+                text(
+                    "SELECT indexname FROM pg_indexes "
+                    "WHERE tablename = 'news_items_legacy'"
+                )
+            ).scalars()
+            for name in indexes.all():
+                connection.execute(text(f'DROP INDEX "{name}"'))
+
+            connection.execute(text(self.repository.NEWS_ITEMS_DDL))
+            for statement in self.repository.MIGRATIONS:
+                connection.execute(text(statement))
+
+            oldest = connection.execute(
+                text(
+                    "SELECT min(coalesce(published_at, created_at)) "
+                    "FROM news_items_legacy"
+                )
+            ).scalar()
+            self.repository.ensure_partitions(since=oldest, connection=connection)
+            # The search index of compressed bodies moves along, unarchived
+            columns = f"{NEWS_ITEM_COLUMNS}, description_vector"
+            # published_at used to be nullable, and is now the partition key
+            legacy_columns = columns.replace(
+                "published_at", "coalesce(published_at, created_at)"
+            )
+            moved = connection.execute(
+                text(
+                    f"INSERT INTO news_items ({columns}) "
+                    f"SELECT {legacy_columns} FROM news_items_legacy "
+                    "ON CONFLICT DO NOTHING"
+                )
+            ).rowcount
+            connection.execute(
+                text(
+                    "SELECT setval(pg_get_serial_sequence('news_items', 'id'), "
+                    "coalesce(max(id), 0) + 1, false) FROM news_items"
+                )
+            )
+            connection.execute(text("DROP TABLE news_items_legacy"))
+
+        logger.info(f"Moved {moved} news items into the partitioned table")
+        return moved
+
+    def archive_partition(self, name: str, archive_dir: str) -> Path:
+        """Write a partition's rows to a gzipped CSV file in ``archive_dir``."""
+        target = Path(archive_dir) / f"{name}.csv.gz"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        connection = self.engine.raw_connection()
+        try:
+            with connection.cursor() as cursor, gzip.open(tmp_path, "wt") as archive:
+                cursor.copy_expert(
+                    f"COPY (SELECT {NEWS_ITEM_COLUMNS} FROM {name} ORDER BY id) "
+                    "TO STDOUT WITH (FORMAT csv, HEADER)",
+                    archive,
+                )
+            connection.commit()
+        finally:
+            connection.close()
+        tmp_path.replace(target)
+        return target
+
+    def apply_retention(
+        self, retain_months: int, archive_dir: str | None = None
+    ) -> List[str]:
+        """Drop the partitions older than ``retain_months`` whole months.
+
+        With ``archive_dir``, each partition is archived before it is
+        dropped. Returns the names of the partitions dropped.
+        """
+        if not self._supported() or not self.repository.is_partitioned():
+            return []
+
+        cutoff = month_start(datetime.now(timezone.utc), -retain_months)
+        expired = sorted(
+            name
+            for name, month in self.repository.list_partitions().items()
+            if month < cutoff
+        )
+        for name in expired:
+            if archive_dir:
+                path = self.archive_partition(name, archive_dir)
+                logger.info(f"Archived {name} to {path}")
+            with self.engine.begin() as connection:
+                connection.execute(
+                    text(f"ALTER TABLE news_items DETACH PARTITION {name}")
+                )
+                connection.execute(text(f"DROP TABLE {name}"))
+            logger.info(f"Dropped news_items partition {name}")
+        return expired
@@ -1,5 +1,15 @@
 from datetime import datetime, timezone
-from sqlalchemy import String, DateTime, Text
+from sqlalchemy import (
+    Boolean,
+    String,
+    DateTime,
+    Text,
+    JSON,
+    Integer,
+    Index,
+    LargeBinary,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -10,21 +20,154 @@ class Base(DeclarativeBase):
 
 
 class NewsItemDB(Base):
-    """Database model for news items."""
+    """Database model for news items.
+
+    On Postgres the table is partitioned by month of ``published_at``, so
+    unique keys must include it. ``Repository.save_news_items`` keeps one
+    row per GUID by reusing the stored publication time of known GUIDs,
+    and SQLite also has a unique index on the GUID alone. See
+    ``Repository.NEWS_ITEMS_DDL``.
+    """
 
     __tablename__ = "news_items"
+    __table_args__ = (
+        UniqueConstraint(
+            "guid", "published_at", name="uq_news_items_guid_published_at"
+        ),
+        Index("ix_news_items_source_published_at", "source", "published_at", "id"),
+        Index("ix_news_items_published_at", "published_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    guid: Mapped[str] = mapped_column(
-        String(500), unique=True, index=True, nullable=False
-    )
+    guid: Mapped[str] = mapped_column(String(500), index=True, nullable=False)
     source: Mapped[str] = mapped_column(String(50), nullable=False)
     title: Mapped[str] = mapped_column(String(500), nullable=False)
+    # Only a preview when the full body is stored compressed in description_zlib
     description: Mapped[str] = mapped_column(Text, nullable=True)
+    description_zlib: Mapped[bytes] = mapped_column(
+        LargeBinary, nullable=True, deferred=True
+    )
+    compression_dict_id: Mapped[int] = mapped_column(Integer, nullable=True)
     url: Mapped[str] = mapped_column(String(500), nullable=False)
-    published_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    published_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     author: Mapped[str] = mapped_column(String(255), nullable=True)
     digest: Mapped[str] = mapped_column(Text, nullable=True)
+    duplicate_of: Mapped[str] = mapped_column(String(500), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        index=True,
+        nullable=False,
+    )
+
+
+class CompressionDictionaryDB(Base):
+    """Database model for the zlib dictionaries shared by compressed descriptions."""
+
+    __tablename__ = "compression_dictionaries"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    dictionary: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    samples: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+
+
+class FeedStateDB(Base):
+    """Database model for the conditional GET state of a feed."""
+
+    __tablename__ = "feed_states"
+
+    url: Mapped[str] = mapped_column(String(500), primary_key=True)
+    etag: Mapped[str] = mapped_column(String(500), nullable=True)
+    last_modified: Mapped[str] = mapped_column(String(100), nullable=True)
+    seen_guids: Mapped[list[str]] = mapped_column(JSON, default=list, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+class TranscriptDB(Base):
+    """Database model for fetched YouTube transcripts."""
+
+    __tablename__ = "transcripts"
+
+    video_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    text: Mapped[str] = mapped_column(Text, nullable=True)
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+
+
+class DigestCacheDB(Base):
+    """Database model for content-addressed LLM digests."""
+
+    __tablename__ = "digest_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(50), nullable=False)
+    digest: Mapped[str] = mapped_column(Text, nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.now(timezone.utc), nullable=False
+        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+    last_hit_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+
+class TermStatDB(Base):
+    """Database model for the number of digested items containing each term.
+
+    The row with an empty term counts the items themselves.
+    """
+
+    __tablename__ = "term_stats"
+
+    term: Mapped[str] = mapped_column(String(50), primary_key=True)
+    documents: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class SubscriberDB(Base):
+    """Database model for recipients of the digest email."""
+
+    __tablename__ = "subscribers"
+
+    email: Mapped[str] = mapped_column(String(320), primary_key=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=True)
+    sources: Mapped[list[str]] = mapped_column(JSON, default=list, nullable=False)
+    keywords: Mapped[list[str]] = mapped_column(JSON, default=list, nullable=False)
+    active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+
+
+class TaskDB(Base):
+    """Database model for the distributed work queue."""
+
+    __tablename__ = "tasks"
+    __table_args__ = (Index("ix_tasks_status_id", "status", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    run_id: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    worker_id: Mapped[str] = mapped_column(String(255), nullable=True)
+    lease_expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    result: Mapped[dict] = mapped_column(JSON, nullable=True)
+    error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
     )
@@ -1,57 +1,1334 @@
+import logging
 import os
-from typing import List
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.dialects.postgresql import insert
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import (
+    bindparam,
+    case,
+    create_engine,
+    delete,
+    func,
+    inspect,
+    literal_column,
+    null,
+    select,
+    table,
+    text,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.orm import sessionmaker, undefer
+from sqlalchemy.dialects import postgresql, sqlite
 
-from .models import Base, NewsItemDB
-from ..models.news import NewsItem
+from .models import (
+    Base,
+    NewsItemDB,
+    CompressionDictionaryDB,
+    FeedStateDB,
+    TranscriptDB,
+    DigestCacheDB,
+    TermStatDB,
+    SubscriberDB,
+    TaskDB,
+)
+from .compression import BodyCompressor, train_dictionary
+from ..processing.terms import document_terms
+from ..models.news import NewsItem, Transcript
+from ..models.feed import FeedState
+from ..models.task import Task
+from ..models.page import NewsItemPage, PageCursor
+from ..models.search import SearchResult
+from ..models.subscriber import Subscriber
+from ..models.config import SaveResult
 
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+def month_start(value: datetime, months: int = 0) -> datetime:
+    """The first instant of the month ``months`` after the one containing ``value``."""
+    month_index = value.year * 12 + value.month - 1 + months
+    return datetime(month_index // 12, month_index % 12 + 1, 1)
 
 
 class Repository:
     """Repository for database operations."""
 
+    LOOKUP_CHUNK_SIZE = 1000
+    SAVE_CHUNK_SIZE = 500
+    # term_stats row counting the documents
+    CORPUS_TERM = ""
+
     def __init__(self, database_url: str | None = None):
         self.database_url = database_url or os.getenv("DATABASE_URL")
         self.engine = create_engine(self.database_url)
         self.SessionLocal = sessionmaker(bind=self.engine)
+        self.is_sqlite = self.engine.dialect.name == "sqlite"
+        self._compressor: BodyCompressor | None = None
+
+    @property
+    def compressor(self) -> BodyCompressor:
+        """The description compressor, with every stored dictionary."""
+        if self._compressor is None:
+            with self.SessionLocal() as session:
+                self._compressor = BodyCompressor(
+                    dict(
+                        session.execute(
+                            select(
+                                CompressionDictionaryDB.id,
+                                CompressionDictionaryDB.dictionary,
+                            )
+                        ).all()
+                    )
+                )
+        return self._compressor
+
+    def _compress_description(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Move a long description into description_zlib, leaving a preview."""
+        description = row.get("description")
+        row["description_zlib"] = row["compression_dict_id"] = None
+        if description and len(description) >= self.compressor.MIN_CHARS:
+            row["compression_dict_id"], row["description_zlib"] = (
+                self.compressor.compress(description)
+            )
+            row["description"] = description[: self.compressor.PREVIEW_CHARS]
+        return row
+
+    def _to_news_item(self, row, description_chars: int | None = None) -> NewsItem:
+        """Convert a row to a news item, decompressing its description if loaded."""
+        item = NewsItem.model_validate(row, from_attributes=True)
+        body = getattr(row, "description_zlib", None)
+        if body is not None:
+            if row.compression_dict_id not in (None, *self.compressor.dictionaries):
+                # Trained by another process since the dictionaries were loaded
+                self._compressor = None
+            item.description = self.compressor.decompress(
+                body, row.compression_dict_id
+            )[:description_chars]
+        return item
+
+    def _insert(self, model):
+        """An INSERT supporting ON CONFLICT clauses in the engine's dialect."""
+        return (sqlite if self.is_sqlite else postgresql).insert(model)
+
+    # Postgres layout of news_items, range partitioned by month of publication.
+    # Rows outside every monthly partition land in the default partition.
+    NEWS_ITEMS_DDL = (
+        "CREATE TABLE IF NOT EXISTS news_items ("
+        "id BIGSERIAL NOT NULL, "
+        "guid VARCHAR(500) NOT NULL, "
+        "source VARCHAR(50) NOT NULL, "
+        "title VARCHAR(500) NOT NULL, "
+        "description TEXT, "
+        "description_zlib BYTEA, "
+        "compression_dict_id INTEGER, "
+        "url VARCHAR(500) NOT NULL, "
+        "published_at TIMESTAMP WITHOUT TIME ZONE NOT NULL, "
+        "author VARCHAR(255), "
+        "digest TEXT, "
+        "duplicate_of VARCHAR(500), "
+        "created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(), "
+        "CONSTRAINT news_items_pkey PRIMARY KEY (id, published_at), "
+        "CONSTRAINT uq_news_items_guid_published_at UNIQUE (guid, published_at)"
+        ") PARTITION BY RANGE (published_at)"
+    )
+    PARTITION_MONTHS_AHEAD = 2
+
+    # Idempotent Postgres DDL for columns added after a table was first created
+    MIGRATIONS = [
+        "ALTER TABLE news_items ADD COLUMN IF NOT EXISTS duplicate_of VARCHAR(500)",
+        "CREATE INDEX IF NOT EXISTS ix_news_items_source_published_at "
+        "ON news_items (source, published_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_news_items_published_at "
+        "ON news_items (published_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_news_items_created_at "
+        "ON news_items (created_at)",
+        "ALTER TABLE news_items ADD COLUMN IF NOT EXISTS description_zlib BYTEA",
+        "ALTER TABLE news_items ADD COLUMN IF NOT EXISTS compression_dict_id INTEGER",
+        # Items are keyed by GUID and publication time, as partitioning requires
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_news_items_guid_published_at "
+        "ON news_items (guid, published_at)",
+        "DO $$ BEGIN IF EXISTS (SELECT 1 FROM pg_indexes "
+        "WHERE indexname = 'ix_news_items_guid' AND indexdef LIKE 'CREATE UNIQUE%') "
+        "THEN DROP INDEX ix_news_items_guid; END IF; END $$",
+        "CREATE INDEX IF NOT EXISTS ix_news_items_guid ON news_items (guid)",
+        # Compressed descriptions keep a preview in plain text, so the full
+        # body is indexed when the row is written
+        "ALTER TABLE news_items ADD COLUMN IF NOT EXISTS description_vector tsvector",
+        "DO $$ BEGIN IF EXISTS (SELECT 1 FROM information_schema.columns "
+        "WHERE table_name = 'news_items' AND column_name = 'search_vector' "
+        "AND generation_expression NOT LIKE '%description_vector%') "
+        "THEN ALTER TABLE news_items DROP COLUMN search_vector; END IF; END $$",
+        "ALTER TABLE news_items ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(digest, '')), 'B') || "
+        "setweight(coalesce(description_vector, "
+        "to_tsvector('english', coalesce(description, ''))), 'C')"
+        ") STORED",
+        "CREATE INDEX IF NOT EXISTS ix_news_items_search_vector "
+        "ON news_items USING GIN (search_vector)",
+        "ALTER TABLE subscribers ADD COLUMN IF NOT EXISTS sources JSON "
+        "NOT NULL DEFAULT '[]'",
+        "ALTER TABLE subscribers ADD COLUMN IF NOT EXISTS keywords JSON "
+        "NOT NULL DEFAULT '[]'",
+    ]
+
+    # SQLite has no ADD COLUMN IF NOT EXISTS, so missing columns are looked up
+    SQLITE_COLUMNS = {
+        "news_items": {
+            "description_zlib": "BLOB",
+            "compression_dict_id": "INTEGER",
+        },
+        "subscribers": {
+            "sources": "JSON NOT NULL DEFAULT '[]'",
+            "keywords": "JSON NOT NULL DEFAULT '[]'",
+        },
+    }
+
+    # SQLite keeps its full-text index in an FTS5 table synced by triggers.
+    # Full compressed bodies go to a contentless one, written with the row.
+    SQLITE_MIGRATIONS = [
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_news_items_guid_published_at "
+        "ON news_items (guid, published_at)",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS news_items_fts USING fts5("
+        "title, digest, description, content='news_items', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS news_items_fts_insert "
+        "AFTER INSERT ON news_items BEGIN "
+        "INSERT INTO news_items_fts(rowid, title, digest, description) "
+        "VALUES (new.id, new.title, new.digest, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS news_items_fts_delete "
+        "AFTER DELETE ON news_items BEGIN "
+        "INSERT INTO news_items_fts(news_items_fts, rowid, title, digest, description) "
+        "VALUES ('delete', old.id, old.title, old.digest, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS news_items_fts_update "
+        "AFTER UPDATE ON news_items BEGIN "
+        "INSERT INTO news_items_fts(news_items_fts, rowid, title, digest, description) "
+        "VALUES ('delete', old.id, old.title, old.digest, old.description); "
+        "INSERT INTO news_items_fts(rowid, title, digest, description) "
+        "VALUES (new.id, new.title, new.digest, new.description); END",
+        "CREATE VIRTUAL TABLE IF NOT EXISTS news_items_body_fts "
+        "USING fts5(body, content='')",
+    ]
+
+    # SQLite is not partitioned, so GUIDs stay unique there. Duplicates
+    # stored by earlier versions are dropped first, keeping the oldest row.
+    SQLITE_UNIQUE_GUID = [
+        "DELETE FROM news_items WHERE id NOT IN "
+        "(SELECT MIN(id) FROM news_items GROUP BY guid)",
+        "CREATE UNIQUE INDEX uq_news_items_guid ON news_items (guid)",
+    ]
 
     def create_tables(self):
-        """Create all database tables."""
+        """Create all database tables and apply pending column migrations.
+
+        On Postgres, news_items is created partitioned and the partitions
+        for the coming months are added.
+        """
+        if not self.is_sqlite:
+            with self.engine.begin() as connection:
+                connection.execute(text(self.NEWS_ITEMS_DDL))
         Base.metadata.create_all(self.engine)
+        migrations = self.SQLITE_MIGRATIONS if self.is_sqlite else self.MIGRATIONS
+        if self.is_sqlite:
+            inspector = inspect(self.engine)
+            migrations = [
+                f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type}"
+                for table_name, columns in self.SQLITE_COLUMNS.items()
+                for name, column_type in columns.items()
+                if name
+                not in {column["name"] for column in inspector.get_columns(table_name)}
+            ] + migrations
+            if "uq_news_items_guid" not in {
+                index["name"] for index in inspector.get_indexes("news_items")
+            }:
+                migrations += self.SQLITE_UNIQUE_GUID
+        with self.engine.begin() as connection:
+            for statement in migrations:
+                connection.execute(text(statement))
+
+        if self.is_sqlite:
+            return
+        if self.is_partitioned():
+            self.ensure_partitions()
+        else:
+            logger.warning(
+                "news_items is not partitioned, run `python main.py maintenance "
+                "--convert` to partition it"
+            )
+
+    def is_partitioned(self) -> bool:
+        with self.engine.connect() as connection:
+            kind = connection.execute(
+                text("SELECT relkind FROM pg_class WHERE oid = 'news_items'::regclass")
+            ).scalar()
+        return kind == "p"
+
+    @staticmethod
+    def partition_name(month: datetime) -> str:
+        return f"news_items_p{month:%Y_%m}"
+
+    def list_partitions(self, connection=None) -> Dict[str, datetime]:
+        """The monthly news_items partitions, by name, with the month they hold."""
+        query = text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'news_items'::regclass"
+        )
+        if connection is None:
+            with self.engine.connect() as connection:
+                names = connection.execute(query).scalars().all()
+        else:
+            names = connection.execute(query).scalars().all()
+        return {
+            name: datetime.strptime(name, "news_items_p%Y_%m")
+            for name in names
+            if name.startswith("news_items_p")
+        }
+
+    def ensure_partitions(
+        self,
+        since: datetime | None = None,
+        months_ahead: int | None = None,
+        connection=None,
+    ) -> List[str]:
+        """Create the missing monthly partitions from ``since`` until months ahead.
+
+        ``since`` defaults to last month, which the scrape window can reach
+        into. Returns the names of the partitions created.
+        """
+        if connection is None:
+            with self.engine.begin() as connection:
+                return self.ensure_partitions(since, months_ahead, connection)
+
+        now = datetime.now(timezone.utc)
+        month = month_start(since) if since else month_start(now, -1)
+        last = month_start(
+            now,
+            self.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead,
+        )
+        connection.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS news_items_default "
+                "PARTITION OF news_items DEFAULT"
+            )
+        )
+        existing = self.list_partitions(connection)
+        created = []
+        while month <= last:
+            name = self.partition_name(month)
+            if name not in existing:
+                connection.execute(
+                    text(
+                        f"CREATE TABLE {name} PARTITION OF news_items "
+                        f"FOR VALUES FROM ('{month.isoformat()}') "
+                        f"TO ('{month_start(month, 1).isoformat()}')"
+                    )
+                )
+                created.append(name)
+            month = month_start(month, 1)
+        if created:
+            logger.info(f"Created news_items partitions {', '.join(created)}")
+        return created
 
-    def save_news_items(self, items: List[NewsItem]) -> int:
-        """Save news items to the database using upsert."""
+    def save_news_items(
+        self, items: List[NewsItem], update_digests: bool = True
+    ) -> SaveResult:
+        """Save news items to the database using a chunked multi-row upsert.
+
+        Existing rows are left untouched, except that a row stored without a
+        digest receives the new one when ``update_digests`` is set. Items
+        stored with their first digest are counted in the term statistics,
+        unless they are near-duplicates.
+
+        An item is identified by its GUID alone. Postgres can only enforce
+        uniqueness with the partition key, so a known GUID is written with
+        its stored publication time, as a feed may change an entry's date.
+        """
         if not items:
+            return SaveResult()
+
+        # A multi-row upsert cannot touch the same row twice
+        rows = list(
+            {
+                item.guid: item.model_dump(
+                    include={
+                        "source",
+                        "title",
+                        "description",
+                        "url",
+                        "published_at",
+                        "guid",
+                        "digest",
+                        "author",
+                        "duplicate_of",
+                    }
+                )
+                for item in items
+            }.values()
+        )
+        documents = {
+            row["guid"]: document_terms(row["title"], row["digest"])
+            for row in rows
+            if row["digest"] and not row["duplicate_of"]
+        }
+        descriptions = {row["guid"]: row["description"] for row in rows}
+        rows = [self._compress_description(row) for row in rows]
+        result = SaveResult()
+        # Only rows inserted, or updated with a digest, are returned
+        written = set()
+        conflict_keys = ["guid"] if self.is_sqlite else ["guid", "published_at"]
+
+        with self.SessionLocal() as session:
+            for start in range(0, len(rows), self.SAVE_CHUNK_SIZE):
+                chunk = rows[start : start + self.SAVE_CHUNK_SIZE]
+                # Also tells inserts apart, as Postgres cannot return xmax
+                # from a partitioned table
+                existing = dict(
+                    session.execute(
+                        select(NewsItemDB.guid, NewsItemDB.published_at).where(
+                            NewsItemDB.guid.in_([row["guid"] for row in chunk])
+                        )
+                    ).all()
+                )
+                for row in chunk:
+                    if row["guid"] in existing:
+                        row["published_at"] = existing[row["guid"]]
+
+                stmt = self._insert(NewsItemDB).values(chunk)
+                if update_digests:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=conflict_keys,
+                        set_={"digest": stmt.excluded.digest},
+                        where=NewsItemDB.digest.is_(None)
+                        & stmt.excluded.digest.is_not(None),
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=conflict_keys)
+                stmt = stmt.returning(
+                    NewsItemDB.guid, NewsItemDB.id, NewsItemDB.published_at
+                )
+
+                chunk_rows = {row["guid"]: row for row in chunk}
+                bodies = []
+                for guid, item_id, published_at in session.execute(stmt):
+                    written.add(guid)
+                    if guid in existing:
+                        result.updated += 1
+                        continue
+                    row = chunk_rows[guid]
+                    result.inserted += 1
+                    result.inserted_by_source[row["source"]] = (
+                        result.inserted_by_source.get(row["source"], 0) + 1
+                    )
+                    if row["description_zlib"] is not None:
+                        bodies.append(
+                            {
+                                "id": item_id,
+                                "published_at": published_at,
+                                "body": descriptions[guid],
+                            }
+                        )
+                self._index_bodies(session, bodies)
+
+            self._add_term_counts(
+                session,
+                self._term_counts(
+                    terms for guid, terms in documents.items() if guid in written
+                ),
+            )
+            session.commit()
+
+        result.skipped = len(rows) - result.inserted - result.updated
+        return result
+
+    def _index_bodies(self, session, bodies: List[Dict[str, Any]]):
+        """Add full descriptions, given with their row's id, to the search index.
+
+        Only needed for compressed descriptions, of which the row keeps a
+        preview in plain text.
+        """
+        if not bodies:
+            return
+        if self.is_sqlite:
+            statement = text(
+                "INSERT INTO news_items_body_fts (rowid, body) VALUES (:id, :body)"
+            )
+        else:
+            statement = text(
+                "UPDATE news_items "
+                "SET description_vector = to_tsvector('english', :body) "
+                "WHERE id = :id AND published_at = :published_at"
+            )
+        session.execute(statement, bodies)
+
+    @classmethod
+    def _term_counts(cls, documents: Iterable[List[str]]) -> Counter:
+        """Count the documents containing each term, given the documents' terms."""
+        counts = Counter()
+        for terms in documents:
+            counts.update(set(terms))
+            counts[cls.CORPUS_TERM] += 1
+        return counts
+
+    def _add_term_counts(self, session, counts: Counter):
+        """Add document counts by term to the term statistics."""
+        # Sorted, so concurrent writers lock rows in the same order
+        rows = [
+            {"term": term, "documents": count} for term, count in sorted(counts.items())
+        ]
+        for start in range(0, len(rows), self.SAVE_CHUNK_SIZE):
+            stmt = self._insert(TermStatDB).values(
+                rows[start : start + self.SAVE_CHUNK_SIZE]
+            )
+            session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["term"],
+                    set_={"documents": TermStatDB.documents + stmt.excluded.documents},
+                )
+            )
+
+    def get_term_stats(self, terms: List[str]) -> Tuple[int, Dict[str, int]]:
+        """The number of counted documents and how many contain each term."""
+        terms = list(dict.fromkeys([self.CORPUS_TERM, *terms]))
+        frequencies = {}
+
+        with self.SessionLocal() as session:
+            for start in range(0, len(terms), self.LOOKUP_CHUNK_SIZE):
+                chunk = terms[start : start + self.LOOKUP_CHUNK_SIZE]
+                frequencies.update(
+                    session.execute(
+                        select(TermStatDB.term, TermStatDB.documents).where(
+                            TermStatDB.term.in_(chunk)
+                        )
+                    ).all()
+                )
+
+        return frequencies.pop(self.CORPUS_TERM, 0), frequencies
+
+    def rebuild_term_stats(self, batch_size: int = 1000) -> int:
+        """Recount the term statistics over every stored, digested item.
+
+        Needed once for items stored before the statistics were kept.
+        Returns the number of items counted.
+        """
+        counts = self._term_counts(
+            document_terms(item.title, item.digest)
+            for item in self.iter_news_items(batch_size=batch_size, description_chars=0)
+            if item.digest and not item.duplicate_of
+        )
+        with self.SessionLocal() as session:
+            session.execute(delete(TermStatDB))
+            self._add_term_counts(session, counts)
+            session.commit()
+        logger.info(f"Counted the terms of {counts[self.CORPUS_TERM]} items")
+        return counts[self.CORPUS_TERM]
+
+    def get_news_items_by_guids(self, guids: List[str]) -> Dict[str, NewsItem]:
+        """Retrieve the already stored news items among the given GUIDs."""
+        guids = list(dict.fromkeys(guids))
+        items = {}
+
+        with self.SessionLocal() as session:
+            for start in range(0, len(guids), self.LOOKUP_CHUNK_SIZE):
+                chunk = guids[start : start + self.LOOKUP_CHUNK_SIZE]
+                rows = (
+                    session.query(NewsItemDB)
+                    .options(undefer(NewsItemDB.description_zlib))
+                    .filter(NewsItemDB.guid.in_(chunk))
+                )
+                for row in rows:
+                    items[row.guid] = self._to_news_item(row)
+
+        return items
+
+    def train_compression_dictionary(self, samples: int = 500) -> int | None:
+        """Train a dictionary on the latest long descriptions and use it from now on.
+
+        Returns the new dictionary's id, or None without enough samples.
+        """
+        stmt = (
+            self._select_news_items()
+            .where(
+                (NewsItemDB.description_zlib.is_not(None))
+                | (func.length(NewsItemDB.description) >= BodyCompressor.MIN_CHARS)
+            )
+            .order_by(NewsItemDB.published_at.desc())
+            .limit(samples)
+        )
+        with self.SessionLocal() as session:
+            bodies = [
+                self._to_news_item(row).description for row in session.execute(stmt)
+            ]
+            if len(bodies) < 2:
+                logger.warning("Not enough long descriptions to train a dictionary")
+                return None
+
+            dictionary = CompressionDictionaryDB(
+                dictionary=train_dictionary(bodies), samples=len(bodies)
+            )
+            session.add(dictionary)
+            session.commit()
+            self._compressor = None
+            logger.info(
+                f"Trained compression dictionary {dictionary.id} of "
+                f"{len(dictionary.dictionary)} bytes on {len(bodies)} descriptions"
+            )
+            return dictionary.id
+
+    def compress_descriptions(self, batch_size: int = 500) -> int:
+        """Compress the long descriptions stored before compression, in batches.
+
+        Returns the number of descriptions compressed.
+        """
+        compressed = 0
+        while True:
+            with self.SessionLocal() as session:
+                rows = session.execute(
+                    select(
+                        NewsItemDB.id, NewsItemDB.published_at, NewsItemDB.description
+                    )
+                    .where(
+                        NewsItemDB.description_zlib.is_(None),
+                        func.length(NewsItemDB.description) >= BodyCompressor.MIN_CHARS,
+                    )
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    return compressed
+                bodies = [
+                    {
+                        "id": row.id,
+                        "published_at": row.published_at,
+                        "body": row.description,
+                    }
+                    for row in rows
+                ]
+
+                # Executed on the connection, as the ORM would require primary keys
+                session.connection().execute(
+                    update(NewsItemDB)
+                    .where(
+                        NewsItemDB.id == bindparam("item_id"),
+                        NewsItemDB.published_at == bindparam("item_published_at"),
+                    )
+                    .values(
+                        description=bindparam("item_description"),
+                        description_zlib=bindparam("item_description_zlib"),
+                        compression_dict_id=bindparam("item_compression_dict_id"),
+                    ),
+                    [
+                        {
+                            f"item_{key}": value
+                            for key, value in self._compress_description(
+                                dict(row._mapping)
+                            ).items()
+                        }
+                        for row in rows
+                    ],
+                )
+                self._index_bodies(session, bodies)
+                session.commit()
+                compressed += len(rows)
+                logger.info(f"Compressed {compressed} descriptions")
+
+    def index_compressed_descriptions(self, batch_size: int = 500) -> int:
+        """Index the full text of descriptions compressed before it was indexed.
+
+        Returns the number of descriptions indexed.
+        """
+        if self.is_sqlite:
+            indexed = select(literal_column("rowid")).select_from(
+                table("news_items_body_fts")
+            )
+            unindexed = NewsItemDB.id.not_in(indexed)
+        else:
+            unindexed = literal_column("news_items.description_vector").is_(None)
+        count = 0
+        while True:
+            with self.SessionLocal() as session:
+                rows = session.execute(
+                    select(
+                        NewsItemDB.id,
+                        NewsItemDB.published_at,
+                        NewsItemDB.description_zlib,
+                        NewsItemDB.compression_dict_id,
+                    )
+                    .where(NewsItemDB.description_zlib.is_not(None), unindexed)
+                    .limit(batch_size)
+                ).all()
+                if not rows:
+                    return count
+                self._index_bodies(
+                    session,
+                    [
+                        {
+                            "id": row.id,
+                            "published_at": row.published_at,
+                            "body": self.compressor.decompress(
+                                row.description_zlib, row.compression_dict_id
+                            ),
+                        }
+                        for row in rows
+                    ],
+                )
+                session.commit()
+                count += len(rows)
+                logger.info(f"Indexed {count} compressed descriptions for search")
+
+    @staticmethod
+    def _select_news_items(
+        description_chars: int | None = None,
+        source: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ):
+        """Select news item columns, filtered by source and publication time.
+
+        Descriptions are truncated to ``description_chars`` in the database
+        when set, so long transcripts are not transferred. Compressed bodies
+        are only selected when the stored preview is too short. ``since`` is
+        inclusive and ``until`` exclusive.
+        """
+        description = NewsItemDB.description
+        if description_chars is not None:
+            description = func.substr(description, 1, description_chars)
+        columns = []
+        if (
+            description_chars is None
+            or description_chars > BodyCompressor.PREVIEW_CHARS
+        ):
+            columns = [NewsItemDB.description_zlib, NewsItemDB.compression_dict_id]
+        stmt = select(
+            NewsItemDB.id,
+            NewsItemDB.guid,
+            NewsItemDB.source,
+            NewsItemDB.title,
+            description.label("description"),
+            NewsItemDB.url,
+            NewsItemDB.published_at,
+            NewsItemDB.author,
+            NewsItemDB.digest,
+            NewsItemDB.duplicate_of,
+            *columns,
+        )
+        if source is not None:
+            stmt = stmt.where(NewsItemDB.source == source)
+        if since is not None:
+            stmt = stmt.where(NewsItemDB.published_at >= since)
+        if until is not None:
+            stmt = stmt.where(NewsItemDB.published_at < until)
+        return stmt
+
+    def get_recent_news_items(
+        self, since: datetime, description_chars: int | None = None
+    ) -> List[NewsItem]:
+        """Retrieve items published since the given time."""
+        stmt = self._select_news_items(description_chars, since=since)
+        with self.SessionLocal() as session:
+            return [
+                self._to_news_item(row, description_chars)
+                for row in session.execute(stmt)
+            ]
+
+    def get_stored_news_items(
+        self,
+        since: datetime,
+        description_chars: int | None = None,
+        undigested: bool = False,
+    ) -> List[NewsItem]:
+        """Retrieve items stored since the given time, whenever they were published.
+
+        With ``undigested``, only the items still waiting for a digest.
+        """
+        stmt = self._select_news_items(description_chars).where(
+            NewsItemDB.created_at >= since
+        )
+        if undigested:
+            stmt = stmt.where(NewsItemDB.digest.is_(None))
+        with self.SessionLocal() as session:
+            return [
+                self._to_news_item(row, description_chars)
+                for row in session.execute(stmt)
+            ]
+
+    def get_news_items_page(
+        self,
+        source: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        cursor: PageCursor | None = None,
+        limit: int = 100,
+        description_chars: int | None = BodyCompressor.PREVIEW_CHARS,
+    ) -> NewsItemPage:
+        """Retrieve one page of items, newest first, using keyset pagination.
+
+        Pass the returned ``next_cursor`` to get the following page. Unlike
+        an offset, the cursor seeks straight into the (source, published_at,
+        id) index, so late pages are as fast as the first one. Descriptions
+        are cut to the stored preview; pass ``description_chars=None`` for
+        full bodies, which are decompressed.
+        """
+        stmt = self._select_news_items(description_chars, source, since, until)
+        if cursor is not None:
+            stmt = stmt.where(
+                tuple_(NewsItemDB.published_at, NewsItemDB.id)
+                < (cursor.published_at, cursor.id)
+            )
+        stmt = stmt.order_by(
+            NewsItemDB.published_at.desc(), NewsItemDB.id.desc()
+        ).limit(limit + 1)
+
+        with self.SessionLocal() as session:
+            rows = session.execute(stmt).all()
+
+        page = NewsItemPage(
+            items=[self._to_news_item(row, description_chars) for row in rows[:limit]]
+        )
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            page.next_cursor = PageCursor(published_at=last.published_at, id=last.id)
+        return page
+
+    def iter_news_items(
+        self,
+        source: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        batch_size: int = 1000,
+        description_chars: int | None = BodyCompressor.PREVIEW_CHARS,
+    ) -> Iterator[NewsItem]:
+        """Stream items, oldest first, through a server-side cursor.
+
+        Rows are fetched ``batch_size`` at a time, so memory use stays flat
+        however many items match. The session stays open until the iterator
+        is exhausted or closed. Like pages, descriptions are cut to the
+        stored preview unless ``description_chars=None``.
+        """
+        stmt = self._select_news_items(
+            description_chars, source, since, until
+        ).order_by(NewsItemDB.published_at, NewsItemDB.id)
+
+        with self.SessionLocal() as session:
+            result = session.execute(stmt.execution_options(yield_per=batch_size))
+            for row in result:
+                yield self._to_news_item(row, description_chars)
+
+    def search(
+        self,
+        query: str,
+        source: str | None = None,
+        since: datetime | None = None,
+        limit: int = 20,
+        description_chars: int | None = 500,
+    ) -> List[SearchResult]:
+        """Full-text search over item titles, digests and descriptions.
+
+        Title matches rank above digest matches, which rank above description
+        matches. Postgres accepts web search syntax: quoted phrases, ``or``
+        and ``-`` to exclude a word. SQLite matches items containing all
+        the words.
+        """
+        if not query.strip():
+            return []
+        if self.is_sqlite:
+            return self._search_sqlite(query, source, since, limit, description_chars)
+
+        ts_query = func.websearch_to_tsquery("english", query)
+        search_vector = literal_column("news_items.search_vector")
+        rank = func.ts_rank_cd(search_vector, ts_query)
+        matches = select(NewsItemDB.id, rank.label("rank")).where(
+            search_vector.op("@@")(ts_query)
+        )
+        if source is not None:
+            matches = matches.where(NewsItemDB.source == source)
+        if since is not None:
+            matches = matches.where(NewsItemDB.published_at >= since)
+        matches = matches.order_by(rank.desc()).limit(limit).subquery()
+
+        # Headlines are only computed for the returned page of matches
+        snippet = func.ts_headline(
+            "english",
+            func.coalesce(NewsItemDB.digest, NewsItemDB.title),
+            ts_query,
+            "MaxFragments=2, MaxWords=30, MinWords=10",
+        )
+        stmt = (
+            self._select_news_items(description_chars)
+            .add_columns(matches.c.rank, snippet.label("snippet"))
+            .join(matches, matches.c.id == NewsItemDB.id)
+            .order_by(matches.c.rank.desc())
+        )
+        with self.SessionLocal() as session:
+            return [
+                SearchResult(
+                    item=self._to_news_item(row, description_chars),
+                    rank=row.rank,
+                    snippet=row.snippet,
+                )
+                for row in session.execute(stmt)
+            ]
+
+    def _search_sqlite(
+        self,
+        query: str,
+        source: str | None,
+        since: datetime | None,
+        limit: int,
+        description_chars: int | None,
+    ) -> List[SearchResult]:
+        # Quoting every word keeps FTS5 query syntax out of user input
+        match = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+        # bm25 is lower for better matches; columns are title, digest, description
+        item_matches = (
+            select(
+                literal_column("rowid").label("id"),
+                literal_column("bm25(news_items_fts, 10.0, 5.0, 1.0)").label("rank"),
+                literal_column(
+                    "snippet(news_items_fts, -1, '<b>', '</b>', '...', 30)"
+                ).label("snippet"),
+            )
+            .select_from(table("news_items_fts"))
+            .where(literal_column("news_items_fts").op("MATCH")(match))
+        )
+        # Compressed bodies past their preview, weighted like descriptions
+        body_matches = (
+            select(
+                literal_column("rowid").label("id"),
+                literal_column("bm25(news_items_body_fts)").label("rank"),
+                null().label("snippet"),
+            )
+            .select_from(table("news_items_body_fts"))
+            .where(literal_column("news_items_body_fts").op("MATCH")(match))
+        )
+        matches = union_all(item_matches, body_matches).subquery()
+        best = (
+            select(
+                matches.c.id,
+                func.min(matches.c.rank).label("rank"),
+                func.max(matches.c.snippet).label("snippet"),
+            )
+            .group_by(matches.c.id)
+            .subquery()
+        )
+        stmt = (
+            self._select_news_items(description_chars, source, since)
+            .add_columns((-best.c.rank).label("rank"), best.c.snippet)
+            .join(best, best.c.id == NewsItemDB.id)
+            .order_by(best.c.rank)
+            .limit(limit)
+        )
+        with self.SessionLocal() as session:
+            return [
+                SearchResult(
+                    item=self._to_news_item(row, description_chars),
+                    rank=row.rank,
+                    snippet=row.snippet,
+                )
+                for row in session.execute(stmt)
+            ]
+
+    def get_feed_states(self, urls: Optional[List[str]] = None) -> Dict[str, FeedState]:
+        """Retrieve the conditional GET state of known feeds, keyed by URL.
+
+        Every feed is returned unless ``urls`` is given.
+        """
+        with self.SessionLocal() as session:
+            query = session.query(FeedStateDB)
+            if urls is not None:
+                query = query.filter(FeedStateDB.url.in_(urls))
+            return {
+                row.url: FeedState(
+                    url=row.url,
+                    etag=row.etag,
+                    last_modified=row.last_modified,
+                    seen_guids=row.seen_guids or [],
+                )
+                for row in query
+            }
+
+    def save_feed_states(self, states: List[FeedState]) -> int:
+        """Save feed states to the database using upsert."""
+        if not states:
+            return 0
+
+        with self.SessionLocal() as session:
+            stmt = self._insert(FeedStateDB).values(
+                [state.model_dump() for state in states]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["url"],
+                set_={
+                    "etag": stmt.excluded.etag,
+                    "last_modified": stmt.excluded.last_modified,
+                    "seen_guids": stmt.excluded.seen_guids,
+                    "updated_at": func.now(),
+                },
+            )
+            session.execute(stmt)
+            session.commit()
+            return len(states)
+
+    def get_transcripts(self, video_ids: List[str]) -> Dict[str, Transcript]:
+        """Retrieve the stored transcripts among the given video IDs."""
+        video_ids = list(dict.fromkeys(video_ids))
+        transcripts = {}
+
+        with self.SessionLocal() as session:
+            for start in range(0, len(video_ids), self.LOOKUP_CHUNK_SIZE):
+                chunk = video_ids[start : start + self.LOOKUP_CHUNK_SIZE]
+                rows = session.query(TranscriptDB).filter(
+                    TranscriptDB.video_id.in_(chunk)
+                )
+                for row in rows:
+                    transcripts[row.video_id] = Transcript.model_validate(
+                        row, from_attributes=True
+                    )
+
+        return transcripts
+
+    def save_transcripts(self, transcripts: List[Transcript]) -> int:
+        """Save transcripts to the database in chunks, replacing stale entries."""
+        if not transcripts:
             return 0
 
+        # A multi-row upsert cannot touch the same row twice
+        rows = list(
+            {
+                transcript.video_id: transcript.model_dump()
+                for transcript in transcripts
+            }.values()
+        )
         with self.SessionLocal() as session:
-            for item in items:
-                stmt = insert(NewsItemDB).values(
-                    source=item.source,
-                    title=item.title,
-                    description=item.description,
-                    url=item.url,
-                    published_at=item.published_at,
-                    guid=item.guid,
-                    digest=item.digest,
-                    author=item.author,
+            for start in range(0, len(rows), self.SAVE_CHUNK_SIZE):
+                stmt = self._insert(TranscriptDB).values(
+                    rows[start : start + self.SAVE_CHUNK_SIZE]
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["video_id"],
+                    set_={
+                        "text": stmt.excluded.text,
+                        "fetched_at": stmt.excluded.fetched_at,
+                    },
                 )
-                stmt = stmt.on_conflict_do_nothing(index_elements=["guid"])
                 session.execute(stmt)
+            session.commit()
+            return len(rows)
+
+    def get_cached_digests(self, keys: List[str]) -> Dict[str, str]:
+        """Retrieve cached digests by content key and record the cache hits."""
+        keys = list(dict.fromkeys(keys))
+        digests = {}
 
+        with self.SessionLocal() as session:
+            for start in range(0, len(keys), self.LOOKUP_CHUNK_SIZE):
+                chunk = keys[start : start + self.LOOKUP_CHUNK_SIZE]
+                rows = session.execute(
+                    update(DigestCacheDB)
+                    .where(DigestCacheDB.key.in_(chunk))
+                    .values(
+                        hit_count=DigestCacheDB.hit_count + 1, last_hit_at=func.now()
+                    )
+                    .returning(DigestCacheDB.key, DigestCacheDB.digest)
+                )
+                digests.update({key: digest for key, digest in rows})
+            session.commit()
+
+        return digests
+
+    def save_cached_digests(
+        self, digests: Dict[str, str], model: str, prompt_version: str
+    ) -> int:
+        """Save digests to the cache, keeping existing entries."""
+        if not digests:
+            return 0
+
+        with self.SessionLocal() as session:
+            stmt = self._insert(DigestCacheDB).values(
+                [
+                    {
+                        "key": key,
+                        "model": model,
+                        "prompt_version": prompt_version,
+                        "digest": digest,
+                    }
+                    for key, digest in digests.items()
+                ]
+            )
+            stmt = stmt.on_conflict_do_nothing(index_elements=["key"])
+            session.execute(stmt)
+            session.commit()
+            return len(digests)
+
+    def mark_duplicates(self, items: List[NewsItem]) -> int:
+        """Store which item each near-duplicate duplicates, and its borrowed digest."""
+        if not items:
+            return 0
+
+        with self.SessionLocal() as session:
+            # Executed on the connection, as the ORM would require primary keys
+            session.connection().execute(
+                update(NewsItemDB)
+                .where(
+                    NewsItemDB.guid == bindparam("item_guid"),
+                    NewsItemDB.published_at == bindparam("item_published_at"),
+                )
+                .values(
+                    duplicate_of=bindparam("item_duplicate_of"),
+                    digest=func.coalesce(NewsItemDB.digest, bindparam("item_digest")),
+                ),
+                [
+                    {
+                        "item_guid": item.guid,
+                        "item_published_at": item.published_at,
+                        "item_duplicate_of": item.duplicate_of,
+                        "item_digest": item.digest,
+                    }
+                    for item in items
+                ],
+            )
             session.commit()
             return len(items)
 
-    def get_all_youtube_videos(self) -> List[NewsItemDB]:
-        """Retrieve all YouTube videos from the database."""
+    def get_subscribers(self) -> List[Subscriber]:
+        """Retrieve the active subscribers."""
+        with self.SessionLocal() as session:
+            rows = session.query(SubscriberDB).filter(SubscriberDB.active.is_(True))
+            return [
+                Subscriber.model_validate(row, from_attributes=True)
+                for row in rows.order_by(SubscriberDB.email)
+            ]
+
+    def save_subscribers(self, subscribers: List[Subscriber]) -> int:
+        """Add or reactivate subscribers, replacing their topics.
+
+        Names are only updated when given.
+        """
+        if not subscribers:
+            return 0
+
+        rows = list(
+            {
+                subscriber.email.lower(): {
+                    "email": subscriber.email.lower(),
+                    "name": subscriber.name,
+                    "sources": subscriber.sources,
+                    "keywords": subscriber.keywords,
+                    "active": True,
+                }
+                for subscriber in subscribers
+            }.values()
+        )
+        with self.SessionLocal() as session:
+            for start in range(0, len(rows), self.SAVE_CHUNK_SIZE):
+                stmt = self._insert(SubscriberDB).values(
+                    rows[start : start + self.SAVE_CHUNK_SIZE]
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["email"],
+                    set_={
+                        "name": func.coalesce(stmt.excluded.name, SubscriberDB.name),
+                        "sources": stmt.excluded.sources,
+                        "keywords": stmt.excluded.keywords,
+                        "active": True,
+                    },
+                )
+                session.execute(stmt)
+            session.commit()
+            return len(rows)
+
+    def remove_subscriber(self, email: str) -> bool:
+        """Deactivate a subscriber, returning whether they were active."""
+        with self.SessionLocal() as session:
+            removed = session.execute(
+                update(SubscriberDB)
+                .where(
+                    SubscriberDB.email == email.lower(), SubscriberDB.active.is_(True)
+                )
+                .values(active=False)
+            ).rowcount
+            session.commit()
+            return removed > 0
+
+    def enqueue_tasks(
+        self, run_id: str, kind: str, payloads: List[Dict[str, Any]]
+    ) -> int:
+        """Add tasks of one kind to the work queue."""
+        if not payloads:
+            return 0
+
+        with self.SessionLocal() as session:
+            session.execute(
+                self._insert(TaskDB).values(
+                    [
+                        {"run_id": run_id, "kind": kind, "payload": payload}
+                        for payload in payloads
+                    ]
+                )
+            )
+            session.commit()
+            return len(payloads)
+
+    def claim_task(
+        self, worker_id: str, lease_seconds: int, max_attempts: int
+    ) -> Optional[Task]:
+        """Lease the oldest available task to a worker, None if there is none.
+
+        Pending tasks and running tasks whose lease expired are available.
+        ``SKIP LOCKED`` lets concurrent workers claim different tasks without
+        waiting on each other.
+        """
+        available = (
+            select(TaskDB.id)
+            .where(
+                (TaskDB.status == "pending")
+                | (
+                    (TaskDB.status == "running")
+                    & (TaskDB.lease_expires_at < func.now())
+                )
+            )
+            .where(TaskDB.attempts < max_attempts)
+            .order_by(TaskDB.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(TaskDB)
+            .where(TaskDB.id == available)
+            .values(
+                status="running",
+                worker_id=worker_id,
+                attempts=TaskDB.attempts + 1,
+                lease_expires_at=func.now() + timedelta(seconds=lease_seconds),
+                updated_at=func.now(),
+            )
+            .returning(
+                TaskDB.id, TaskDB.run_id, TaskDB.kind, TaskDB.payload, TaskDB.attempts
+            )
+        )
+
+        with self.SessionLocal() as session:
+            row = session.execute(stmt).first()
+            session.commit()
+        return Task.model_validate(row, from_attributes=True) if row else None
+
+    def _update_leased_task(self, task_id: int, worker_id: str, **values) -> bool:
+        """Update a task only while the given worker still holds its lease."""
+        with self.SessionLocal() as session:
+            updated = session.execute(
+                update(TaskDB)
+                .where(
+                    TaskDB.id == task_id,
+                    TaskDB.worker_id == worker_id,
+                    TaskDB.status == "running",
+                )
+                .values(updated_at=func.now(), **values)
+            ).rowcount
+            session.commit()
+        return updated == 1
+
+    def extend_lease(self, task_id: int, worker_id: str, lease_seconds: int) -> bool:
+        return self._update_leased_task(
+            task_id,
+            worker_id,
+            lease_expires_at=func.now() + timedelta(seconds=lease_seconds),
+        )
+
+    def complete_task(
+        self, task_id: int, worker_id: str, result: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        return self._update_leased_task(
+            task_id, worker_id, status="done", result=result, lease_expires_at=None
+        )
+
+    def fail_task(
+        self, task_id: int, worker_id: str, error: str, max_attempts: int
+    ) -> bool:
+        """Release a failed task for a retry, or mark it failed once out of attempts."""
+        return self._update_leased_task(
+            task_id,
+            worker_id,
+            status=case((TaskDB.attempts >= max_attempts, "failed"), else_="pending"),
+            error=error,
+            lease_expires_at=None,
+        )
+
+    def fail_expired_tasks(self, run_id: str, max_attempts: int) -> int:
+        """Mark failed the tasks whose last allowed lease expired."""
+        with self.SessionLocal() as session:
+            failed = session.execute(
+                update(TaskDB)
+                .where(
+                    TaskDB.run_id == run_id,
+                    TaskDB.status == "running",
+                    TaskDB.lease_expires_at < func.now(),
+                    TaskDB.attempts >= max_attempts,
+                )
+                .values(status="failed", error="Lease expired", updated_at=func.now())
+            ).rowcount
+            session.commit()
+        return failed
+
+    def fail_unfinished_tasks(self, run_id: str, kind: str, error: str) -> int:
+        """Mark failed the pending and running tasks of a kind in a run.
+
+        Workers still running one of them lose their lease, so their result
+        is discarded.
+        """
+        with self.SessionLocal() as session:
+            failed = session.execute(
+                update(TaskDB)
+                .where(
+                    TaskDB.run_id == run_id,
+                    TaskDB.kind == kind,
+                    TaskDB.status.in_(["pending", "running"]),
+                )
+                .values(
+                    status="failed",
+                    error=error,
+                    lease_expires_at=None,
+                    updated_at=func.now(),
+                )
+            ).rowcount
+            session.commit()
+        return failed
+
+    def get_task_counts(self, run_id: str, kind: str) -> Dict[str, int]:
+        """Count the tasks of a run by status."""
+        with self.SessionLocal() as session:
+            rows = session.execute(
+                select(TaskDB.status, func.count())
+                .where(TaskDB.run_id == run_id, TaskDB.kind == kind)
+                .group_by(TaskDB.status)
+            )
+            return {status: count for status, count in rows}
+
+    def get_task_results(self, run_id: str, kind: str) -> List[Dict[str, Any]]:
+        """Retrieve the results of the completed tasks of a run."""
+        with self.SessionLocal() as session:
+            rows = session.execute(
+                select(TaskDB.result).where(
+                    TaskDB.run_id == run_id,
+                    TaskDB.kind == kind,
+                    TaskDB.status == "done",
+                )
+            )
+            return [result for (result,) in rows if result]
+
+    def get_all_youtube_videos(self, since: datetime | None = None) -> List[NewsItemDB]:
+        """Retrieve YouTube videos from the database, optionally since a time."""
         with self.SessionLocal() as session:
-            return session.query(NewsItemDB).all()
+            query = session.query(NewsItemDB).filter(NewsItemDB.source == "YouTube")
+            if since is not None:
+                query = query.filter(NewsItemDB.published_at >= since)
+            return query.all()
 
-    def get_all_news_articles(self) -> List[NewsItemDB]:
-        """Retrieve all news articles from the database."""
+    def get_all_news_articles(self, since: datetime | None = None) -> List[NewsItemDB]:
+        """Retrieve news articles from the database, optionally since a time."""
         with self.SessionLocal() as session:
-            return session.query(NewsItemDB).all()
+            query = session.query(NewsItemDB).filter(NewsItemDB.source != "YouTube")
+            if since is not None:
+                query = query.filter(NewsItemDB.published_at >= since)
+            return query.all()
@@ -0,0 +1,366 @@
+from .models import RunnerConfig, RunnerResult, SaveResult
+from .models.news import Coverage, NewsItem
+from .models.task import Task
+from .scrapers import (
+    AnthropicAIScraper,
+    YouTubeScraper,
+    OpenAIScraper,
+    ModularScraper,
+    FeedCache,
+    FeedFetcher,
+)
+from .db import Repository
+from .agent import Agent, DigestCache
+from .agent.condenser import CHARS_PER_TOKEN
+from .runner import Runner
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCRAPE_TASK = "scrape"
+DIGEST_TASK = "digest"
+
+ARTICLE_SCRAPERS = {
+    "openai": OpenAIScraper,
+    "anthropic": AnthropicAIScraper,
+    "modular": ModularScraper,
+}
+
+
+def feed_urls(payload: Dict[str, Any]) -> List[str]:
+    """The feed URLs a scrape task reads."""
+    if payload["source"] == "youtube":
+        return [YouTubeScraper.RSS_FEED_URL.format(channel_id=payload["channel_id"])]
+    scraper = ARTICLE_SCRAPERS[payload["source"]]
+    return list(getattr(scraper, "RSS_FEED_URLS", [])) or [scraper.RSS_FEED_URL]
+
+
+class Worker:
+    """Drains scrape and digest tasks from the database work queue.
+
+    Any number of worker processes on any number of hosts can share one
+    queue. Tasks are leased rather than locked for their whole duration, so
+    a task whose worker died is picked up again once its lease expires, and
+    both kinds of task are safe to run more than once.
+    """
+
+    def __init__(
+        self,
+        config: RunnerConfig,
+        repository: Repository,
+        worker_id: str | None = None,
+    ):
+        self.config = config.distributed
+        self.fetch_config = config.fetch
+        self.repository = repository
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.feed_cache = FeedCache(repository)
+        self.youtube_scraper = YouTubeScraper(
+            repository=repository, config=config.transcripts
+        )
+        self.agent = Agent(
+            DigestCache(repository), config.digest, config.prompts, config.llm
+        )
+
+    async def _scrape(self, fetcher: FeedFetcher, payload: Dict[str, Any]) -> Dict:
+        """Scrape one source and store its new items, with transcripts, undigested."""
+        urls = feed_urls(payload)
+        await asyncio.to_thread(self.feed_cache.refresh, urls)
+
+        hours = payload["time_window_hours"]
+        if payload["source"] == "youtube":
+            scraper = YouTubeScraper(fetcher)
+            items = await scraper.scrape_youtube_channel(payload["channel_id"], hours)
+        else:
+            items = await ARTICLE_SCRAPERS[payload["source"]](fetcher).scrape_news(
+                hours
+            )
+
+        known_items = await asyncio.to_thread(
+            self.repository.get_news_items_by_guids, [item.guid for item in items]
+        )
+        new_items = [item for item in items if item.guid not in known_items]
+        await self.youtube_scraper.add_transcripts(
+            [item for item in new_items if item.source == "YouTube"]
+        )
+        save_result = await asyncio.to_thread(
+            self.repository.save_news_items, new_items
+        )
+        # Only once the items are stored, so a failed task sees them again
+        await asyncio.to_thread(self.feed_cache.commit, urls)
+        return {
+            "guids": [item.guid for item in items],
+            "inserted": save_result.inserted,
+            "inserted_by_source": save_result.inserted_by_source,
+        }
+
+    async def _digest(self, payload: Dict[str, Any]) -> Dict:
+        items = await asyncio.to_thread(
+            self.repository.get_news_items_by_guids, payload["guids"]
+        )
+        undigested = [item for item in items.values() if not item.digest]
+        await self.agent.add_digest(undigested)
+        await asyncio.to_thread(self.repository.save_news_items, undigested)
+        return {"digested": sum(1 for item in undigested if item.digest)}
+
+    async def _keep_leased(self, task: Task):
+        while True:
+            await asyncio.sleep(self.config.lease_seconds / 3)
+            extended = await asyncio.to_thread(
+                self.repository.extend_lease,
+                task.id,
+                self.worker_id,
+                self.config.lease_seconds,
+            )
+            if not extended:
+                logger.warning(f"Lost the lease of task {task.id}")
+                return
+
+    async def _execute(self, fetcher: FeedFetcher, task: Task):
+        keep_leased = asyncio.create_task(self._keep_leased(task))
+        try:
+            if task.kind == SCRAPE_TASK:
+                result = await self._scrape(fetcher, task.payload)
+            elif task.kind == DIGEST_TASK:
+                result = await self._digest(task.payload)
+            else:
+                raise ValueError(f"Unknown task kind {task.kind}")
+        except Exception as e:
+            logger.exception(f"Task {task.id} ({task.kind}) failed: {e}")
+            await asyncio.to_thread(
+                self.repository.fail_task,
+                task.id,
+                self.worker_id,
+                repr(e),
+                self.config.max_attempts,
+            )
+            return
+        finally:
+            keep_leased.cancel()
+
+        completed = await asyncio.to_thread(
+            self.repository.complete_task, task.id, self.worker_id, result
+        )
+        if not completed:
+            logger.warning(f"Task {task.id} was taken over before it completed")
+
+    async def _work(self, fetcher: FeedFetcher, idle_exit_seconds: float | None):
+        idle_since = time.monotonic()
+        while True:
+            task = await asyncio.to_thread(
+                self.repository.claim_task,
+                self.worker_id,
+                self.config.lease_seconds,
+                self.config.max_attempts,
+            )
+            if task is None:
+                idle = time.monotonic() - idle_since
+                if idle_exit_seconds is not None and idle >= idle_exit_seconds:
+                    return
+                await asyncio.sleep(self.config.poll_seconds)
+                continue
+
+            await self._execute(fetcher, task)
+            idle_since = time.monotonic()
+
+    async def _run_async(self, idle_exit_seconds: float | None):
+        try:
+            async with FeedFetcher(self.feed_cache, self.fetch_config) as fetcher:
+                await asyncio.gather(
+                    *(
+                        self._work(fetcher, idle_exit_seconds)
+                        for _ in range(self.config.worker_concurrency)
+                    )
+                )
+        finally:
+            await self.agent.aclose()
+
+    def run(self, idle_exit_seconds: float | None = None):
+        """Work until interrupted, or until idle for ``idle_exit_seconds``."""
+        logger.info(
+            f"Worker {self.worker_id} started with "
+            f"{self.config.worker_concurrency} task slots"
+        )
+        asyncio.run(self._run_async(idle_exit_seconds))
+        logger.info(f"Worker {self.worker_id} stopped")
+
+
+class Coordinator(Runner):
+    """Runs the pipeline as tasks for workers, then assembles the email.
+
+    One scrape task is queued per source. Once they are all done, the new
+    undigested items are deduplicated and queued as token-budgeted digest
+    tasks, and once those are done the top items are summarized and mailed.
+    """
+
+    def __init__(self, config: RunnerConfig, repository: Repository):
+        super().__init__(config, repository)
+        self.distributed_config = config.distributed
+
+    def _scrape_payloads(self) -> List[Dict[str, Any]]:
+        payloads = [
+            {"source": "youtube", "channel_id": channel}
+            for channel in self.youtube_channels
+        ]
+        payloads.extend({"source": source} for source in ARTICLE_SCRAPERS)
+        for payload in payloads:
+            payload["time_window_hours"] = self.time_window_hours
+        return payloads
+
+    async def _wait_for(
+        self, run_id: str, kind: str, deadline: float
+    ) -> Dict[str, int]:
+        """Wait until no task of a kind is pending or running.
+
+        Tasks still unfinished at ``deadline``, on the time.monotonic clock,
+        are marked failed, so the run goes on with the tasks that are done.
+        """
+        config = self.distributed_config
+        while True:
+            await asyncio.to_thread(
+                self.repository.fail_expired_tasks, run_id, config.max_attempts
+            )
+            counts = await asyncio.to_thread(
+                self.repository.get_task_counts, run_id, kind
+            )
+            unfinished = counts.get("pending", 0) + counts.get("running", 0)
+            if unfinished and time.monotonic() >= deadline:
+                timed_out = await asyncio.to_thread(
+                    self.repository.fail_unfinished_tasks, run_id, kind, "Run timed out"
+                )
+                logger.error(
+                    f"Run {run_id} timed out after {config.run_timeout_seconds}s "
+                    f"with {timed_out} {kind} tasks unfinished"
+                )
+                counts = await asyncio.to_thread(
+                    self.repository.get_task_counts, run_id, kind
+                )
+                unfinished = 0
+            if not unfinished:
+                if counts.get("failed"):
+                    logger.error(
+                        f"{counts['failed']} {kind} tasks of run {run_id} failed"
+                    )
+                return counts
+            await asyncio.sleep(config.poll_seconds)
+
+    def _deduplicate(self, items: List[NewsItem]) -> List[Tuple[NewsItem, NewsItem]]:
+        """Attach near-duplicates to a representative.
+
+        Returns each duplicate with its representative, which is either a
+        stored, digested item or another of the given items.
+        """
+        index = self._load_dedup_index()
+        duplicates = []
+        for item in items:
+            representative, signature = index.find(item)
+            if representative is None:
+                index.add(item, signature)
+                continue
+            item.duplicate_of = representative.guid
+            representative.also_covered_by.append(
+                Coverage(source=item.source, url=item.url)
+            )
+            duplicates.append((item, representative))
+        return duplicates
+
+    def _digest_payloads(self, items: List[NewsItem]) -> List[Dict[str, Any]]:
+        """Split items into digest tasks that each fit one digest request."""
+        max_chars = self.digest_config.max_item_tokens * CHARS_PER_TOKEN
+        batches = self.agent._make_batches(
+            [
+                (item, f"{item.title} {(item.description or '')[:max_chars]}")
+                for item in items
+            ]
+        )
+        return [{"guids": [item.guid for item, _ in batch]} for batch in batches]
+
+    async def _coordinate(self, run_id: str, result: RunnerResult):
+        deadline = time.monotonic() + self.distributed_config.run_timeout_seconds
+
+        with self.timer.time("scrape", run_id):
+            queued = await asyncio.to_thread(
+                self.repository.enqueue_tasks,
+                run_id,
+                SCRAPE_TASK,
+                self._scrape_payloads(),
+            )
+            logger.info(f"Run {run_id}: queued {queued} scrape tasks")
+            await self._wait_for(run_id, SCRAPE_TASK, deadline)
+
+        task_results = await asyncio.to_thread(
+            self.repository.get_task_results, run_id, SCRAPE_TASK
+        )
+        items = await asyncio.to_thread(
+            self.repository.get_news_items_by_guids,
+            [guid for task_result in task_results for guid in task_result["guids"]],
+        )
+        self._counts["scraped"] += len(items)
+
+        with self.timer.time("digest", run_id) as timing:
+            undigested = [item for item in items.values() if not item.digest]
+            duplicates = (
+                await asyncio.to_thread(self._deduplicate, undigested)
+                if self.dedup_config.enabled
+                else []
+            )
+            duplicate_guids = {item.guid for item, _ in duplicates}
+            to_digest = [
+                item for item in undigested if item.guid not in duplicate_guids
+            ]
+            timing.items = len(to_digest)
+
+            queued = await asyncio.to_thread(
+                self.repository.enqueue_tasks,
+                run_id,
+                DIGEST_TASK,
+                self._digest_payloads(to_digest),
+            )
+            logger.info(
+                f"Run {run_id}: queued {queued} digest tasks for {len(to_digest)} "
+                f"items, {len(duplicates)} near-duplicates skipped"
+            )
+            await self._wait_for(run_id, DIGEST_TASK, deadline)
+
+        # Pick up the digests written by the workers, keeping coverage links
+        stored = await asyncio.to_thread(
+            self.repository.get_news_items_by_guids, list(items)
+        )
+        for guid, item in items.items():
+            if guid in stored and not item.digest:
+                item.digest = stored[guid].digest
+        for duplicate, representative in duplicates:
+            duplicate.digest = representative.digest
+        await asyncio.to_thread(
+            self.repository.mark_duplicates, [item for item, _ in duplicates]
+        )
+
+        self._counts["digested"] += sum(1 for item in to_digest if item.digest)
+        self._counts["duplicates"] += len(duplicates)
+        save_result = SaveResult()
+        for task_result in task_results:
+            save_result.add(
+                SaveResult(
+                    inserted=task_result["inserted"],
+                    inserted_by_source=task_result.get("inserted_by_source", {}),
+                )
+            )
+        self._record_items(result, list(items.values()), save_result)
+
+        candidates = [
+            item for item in items.values() if item.digest and not item.duplicate_of
+        ]
+        editions = await self._write_editions(candidates, result)
+        await asyncio.to_thread(self._deliver, editions, result)
+
+    def run(self, run_id: str | None = None) -> RunnerResult:
+        run_id = run_id or uuid.uuid4().hex
+        return self._execute(
+            f"Run {run_id}", lambda result: self._coordinate(run_id, result)
+        )
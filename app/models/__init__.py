@@ -1,14 +1,75 @@
 """Pydantic models for the AI news aggregator."""
 
-from .news import NewsItem
-from .config import RunnerConfig, RunnerResult
-from .llm_response import DigestLLMResponse, EmailItem, EmailLLMResponse
+from .news import Coverage, NewsItem, Transcript
+from .feed import FeedState
+from .prompt import CachedPrompt
+from .task import Task
+from .page import NewsItemPage, PageCursor
+from .search import SearchResult
+from .subscriber import Edition, Subscriber
+from .topic import Topic
+from .config import (
+    FetchConfig,
+    TranscriptConfig,
+    LLMConfig,
+    DigestConfig,
+    PromptCacheConfig,
+    PipelineConfig,
+    DedupConfig,
+    RankingConfig,
+    TopicConfig,
+    MetricsConfig,
+    DistributedConfig,
+    EmailConfig,
+    DaemonConfig,
+    RunnerConfig,
+    RunnerResult,
+    SaveResult,
+    DeliveryResult,
+    LLMCallStats,
+    StageTiming,
+)
+from .llm_response import (
+    DigestLLMResponse,
+    EmailItem,
+    EmailLLMResponse,
+    EmailSection,
+)
 
 __all__ = [
     "NewsItem",
+    "Coverage",
+    "Transcript",
+    "FeedState",
+    "CachedPrompt",
+    "Task",
+    "NewsItemPage",
+    "PageCursor",
+    "SearchResult",
+    "Subscriber",
+    "Edition",
+    "Topic",
+    "FetchConfig",
+    "TranscriptConfig",
+    "LLMConfig",
+    "DigestConfig",
+    "PromptCacheConfig",
+    "PipelineConfig",
+    "DedupConfig",
+    "RankingConfig",
+    "TopicConfig",
+    "MetricsConfig",
+    "DistributedConfig",
+    "EmailConfig",
+    "DaemonConfig",
     "RunnerConfig",
     "RunnerResult",
+    "SaveResult",
+    "DeliveryResult",
+    "LLMCallStats",
+    "StageTiming",
     "DigestLLMResponse",
     "EmailLLMResponse",
     "EmailItem",
+    "EmailSection",
 ]
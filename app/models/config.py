@@ -1,9 +1,244 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Optional
 
 from .news import NewsItem
 
 
+class FetchConfig(BaseModel):
+    max_connections: int = Field(
+        default=100, description="Maximum number of pooled HTTP connections"
+    )
+    max_connections_per_host: int = Field(
+        default=10, description="Maximum number of concurrent requests per host"
+    )
+    timeout_seconds: float = Field(default=20.0, description="Per-request timeout")
+    max_retries: int = Field(
+        default=3, description="Retries on transport errors, 429 and 5xx responses"
+    )
+    backoff_base_seconds: float = Field(
+        default=0.5, description="Base delay of the exponential retry backoff"
+    )
+    user_agent: str = Field(
+        default="ai-news-aggregator/0.1", description="User-Agent sent with requests"
+    )
+
+
+class TranscriptConfig(BaseModel):
+    max_concurrency: int = Field(
+        default=8, description="Maximum number of transcripts fetched at once"
+    )
+    negative_ttl_hours: int = Field(
+        default=24,
+        description="How long a missing transcript is cached before retrying",
+    )
+
+
+class LLMConfig(BaseModel):
+    requests_per_minute: int = Field(
+        default=1_000, description="Maximum LLM requests per minute"
+    )
+    tokens_per_minute: int = Field(
+        default=1_000_000, description="Maximum LLM tokens per minute"
+    )
+    timeout_seconds: float = Field(default=300.0, description="Per-call timeout")
+    circuit_failure_threshold: int = Field(
+        default=5, description="Consecutive failures before failing fast"
+    )
+    circuit_reset_seconds: float = Field(
+        default=60.0, description="How long to fail fast before a trial call"
+    )
+
+
+class DigestConfig(BaseModel):
+    max_batch_tokens: int = Field(
+        default=100_000, description="Estimated input token budget per digest request"
+    )
+    max_concurrency: int = Field(
+        default=4, description="Maximum number of digest requests in flight"
+    )
+    max_retries: int = Field(default=2, description="Retries of a failed digest batch")
+    backoff_base_seconds: float = Field(
+        default=2.0, description="Base delay of the exponential retry backoff"
+    )
+    max_item_tokens: int = Field(
+        default=4_000,
+        description="Estimated token ceiling of an item description in the prompt",
+    )
+    llm_condense_threshold_tokens: Optional[int] = Field(
+        default=None,
+        description="Descriptions longer than this are condensed with LLM "
+        "map-reduce instead of extractively, None to disable",
+    )
+    condense_chunk_tokens: int = Field(
+        default=8_000, description="Chunk size of the LLM map-reduce condensation"
+    )
+
+
+class PromptCacheConfig(BaseModel):
+    ttl_seconds: int = Field(
+        default=300, description="How long a cached prompt is used before refreshing"
+    )
+    cache_dir: str = Field(
+        default=".cache/prompts", description="Directory of the on-disk prompt cache"
+    )
+    pinned_versions: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Prompt versions to use instead of the latest, by prompt name",
+    )
+
+
+class PipelineConfig(BaseModel):
+    queue_size: int = Field(
+        default=1_000, description="Maximum number of items waiting between stages"
+    )
+    flush_seconds: float = Field(
+        default=2.0,
+        description="How long a stage waits for more items before flushing a batch",
+    )
+    save_batch_size: int = Field(
+        default=500, description="Number of items saved to the database at once"
+    )
+    max_batches_in_flight: int = Field(
+        default=4,
+        description="Maximum number of item batches being prepared for digesting",
+    )
+
+
+class DedupConfig(BaseModel):
+    enabled: bool = Field(
+        default=True, description="Whether to digest near-duplicates only once"
+    )
+    threshold: float = Field(
+        default=0.5, description="Minimum estimated Jaccard similarity of duplicates"
+    )
+    num_perm: int = Field(default=128, description="Number of MinHash permutations")
+    bands: int = Field(default=32, description="Number of LSH bands")
+    lookback_days: int = Field(
+        default=7, description="How far back stored items are indexed"
+    )
+    max_description_chars: int = Field(
+        default=2_000, description="Characters of the description that are compared"
+    )
+
+
+class RankingConfig(BaseModel):
+    top_k: int = Field(
+        default=15, description="Number of items summarized by the LLM in the email"
+    )
+    recency_half_life_hours: float = Field(
+        default=24.0, description="Age at which the recency score halves"
+    )
+    source_weights: Dict[str, float] = Field(
+        default_factory=dict, description="Score multiplier by source, default 1.0"
+    )
+    keyword_boosts: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Score added when a keyword appears in the title or digest",
+    )
+    coverage_weight: float = Field(
+        default=0.5, description="Score multiplier per other source covering a story"
+    )
+
+
+class TopicConfig(BaseModel):
+    enabled: bool = Field(
+        default=True, description="Whether to write the email one topic at a time"
+    )
+    similarity_threshold: float = Field(
+        default=0.15,
+        description="Minimum average TF-IDF cosine similarity of items in a topic",
+    )
+    min_topic_size: int = Field(
+        default=2, description="Topics with fewer items are pooled into Other news"
+    )
+    max_topics: int = Field(
+        default=5, description="Maximum number of topics in one email"
+    )
+    label_terms: int = Field(
+        default=3, description="Number of top terms naming a topic"
+    )
+
+
+class MetricsConfig(BaseModel):
+    json_path: Optional[str] = Field(
+        default=None, description="File the run metrics are written to as JSON"
+    )
+    prometheus_path: Optional[str] = Field(
+        default=None,
+        description="Prometheus textfile collector file the run metrics are "
+        "written to, e.g. /var/lib/node_exporter/textfile/ai_news.prom",
+    )
+
+
+class DistributedConfig(BaseModel):
+    worker_concurrency: int = Field(
+        default=8, description="Number of tasks a worker process runs at once"
+    )
+    lease_seconds: int = Field(
+        default=600,
+        description="How long a claimed task is reserved before another worker "
+        "may take it over, renewed while the task runs",
+    )
+    max_attempts: int = Field(
+        default=3, description="Claims of a task before it is marked failed"
+    )
+    poll_seconds: float = Field(
+        default=2.0, description="How often idle workers and the coordinator poll"
+    )
+    run_timeout_seconds: int = Field(
+        default=3600,
+        description="How long the coordinator waits for a run's tasks before "
+        "marking the unfinished ones failed and emailing what is done",
+    )
+
+
+class EmailConfig(BaseModel):
+    concurrency: int = Field(
+        default=4, description="Number of SMTP connections sending at once"
+    )
+    messages_per_connection: int = Field(
+        default=100, description="Messages sent before a connection is reopened"
+    )
+    max_attempts: int = Field(
+        default=3, description="Attempts per message on transient SMTP failures"
+    )
+    retry_backoff_seconds: float = Field(
+        default=2.0, description="Initial delay before retrying, doubled each time"
+    )
+    timeout_seconds: float = Field(default=30.0, description="SMTP socket timeout")
+
+
+class DaemonConfig(BaseModel):
+    send_at: str = Field(
+        default="12:00",
+        pattern=r"^([01]\d|2[0-3]):[0-5]\d$",
+        description="UTC time of day the email is sent, as HH:MM",
+    )
+    initial_poll_seconds: float = Field(
+        default=1800.0, description="Poll interval of a source before it has posted"
+    )
+    min_poll_seconds: float = Field(
+        default=300.0, description="Shortest interval between polls of a source"
+    )
+    max_poll_seconds: float = Field(
+        default=21600.0, description="Longest interval between polls of a source"
+    )
+    polls_per_post: float = Field(
+        default=4.0, description="Polls per average interval between a source's posts"
+    )
+    quiet_backoff: float = Field(
+        default=1.5, description="Interval multiplier after a poll finding nothing new"
+    )
+    jitter: float = Field(
+        default=0.2, description="Random fraction added to or taken from each interval"
+    )
+    posting_history: int = Field(
+        default=20,
+        description="Number of recent posts the posting frequency is estimated from",
+    )
+
+
 class RunnerConfig(BaseModel):
     time_window_hours: int = Field(
         default=24, description="The time window scrapers run for"
@@ -11,12 +246,142 @@ class RunnerConfig(BaseModel):
     youtube_channels: List[str] = Field(
         default=None, description="The list of channel ID's to scrape"
     )
+    fetch: FetchConfig = Field(
+        default_factory=FetchConfig, description="Feed fetching settings"
+    )
+    transcripts: TranscriptConfig = Field(
+        default_factory=TranscriptConfig, description="Transcript fetching settings"
+    )
+    digest: DigestConfig = Field(
+        default_factory=DigestConfig, description="Digest generation settings"
+    )
+    pipeline: PipelineConfig = Field(
+        default_factory=PipelineConfig, description="Streaming pipeline settings"
+    )
+    dedup: DedupConfig = Field(
+        default_factory=DedupConfig, description="Near-duplicate detection settings"
+    )
+    ranking: RankingConfig = Field(
+        default_factory=RankingConfig, description="Email item ranking settings"
+    )
+    topics: TopicConfig = Field(
+        default_factory=TopicConfig, description="Email topic clustering settings"
+    )
+    llm: LLMConfig = Field(
+        default_factory=LLMConfig, description="LLM rate limiting settings"
+    )
+    prompts: PromptCacheConfig = Field(
+        default_factory=PromptCacheConfig, description="Langfuse prompt cache settings"
+    )
+    metrics: MetricsConfig = Field(
+        default_factory=MetricsConfig, description="Run metrics export settings"
+    )
+    distributed: DistributedConfig = Field(
+        default_factory=DistributedConfig, description="Distributed mode settings"
+    )
+    email: EmailConfig = Field(
+        default_factory=EmailConfig, description="Email delivery settings"
+    )
+    daemon: DaemonConfig = Field(
+        default_factory=DaemonConfig, description="Daemon mode settings"
+    )
+
+
+class SaveResult(BaseModel):
+    inserted: int = Field(default=0, description="Number of new rows inserted")
+    updated: int = Field(
+        default=0, description="Number of existing rows that received a digest"
+    )
+    skipped: int = Field(default=0, description="Number of rows left untouched")
+    inserted_by_source: Dict[str, int] = Field(
+        default_factory=dict, description="Number of new rows inserted, by source"
+    )
+
+    def add(self, other: "SaveResult"):
+        """Add the counts of another save to these."""
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.skipped += other.skipped
+        for source, count in other.inserted_by_source.items():
+            self.inserted_by_source[source] = (
+                self.inserted_by_source.get(source, 0) + count
+            )
+
+
+class DeliveryResult(BaseModel):
+    sent: int = Field(default=0, description="Number of emails accepted by SMTP")
+    failed: List[str] = Field(
+        default_factory=list, description="Recipients whose email was not sent"
+    )
+    retries: int = Field(default=0, description="Number of transient failures retried")
+
+
+class LLMCallStats(BaseModel):
+    name: str = Field(..., description="The kind of LLM call, e.g. digest-batch")
+    items: int = Field(default=0, description="Number of items sent in the call")
+    latency_seconds: float = Field(default=0.0, description="Wall-clock latency")
+    input_tokens: int = Field(default=0, description="Prompt tokens used")
+    output_tokens: int = Field(default=0, description="Candidate tokens used")
+    attempts: int = Field(default=1, description="Number of attempts made")
+    success: bool = Field(default=True, description="Whether the call succeeded")
+
+
+class StageTiming(BaseModel):
+    stage: str = Field(..., description="The pipeline stage, e.g. scrape")
+    name: str = Field(..., description="What was timed, e.g. a feed or video ID")
+    seconds: float = Field(default=0.0, description="Wall-clock duration")
+    items: int = Field(default=0, description="Number of items handled")
+    success: bool = Field(default=True, description="Whether it succeeded")
 
 
 class RunnerResult(BaseModel):
+    started_at: Optional[datetime] = Field(
+        default=None, description="When the run started"
+    )
+    duration_seconds: float = Field(default=0.0, description="Wall-clock duration")
     youtube_videos: List[NewsItem] = Field(
         default=None, description="List of youtube videos"
     )
-    videos_saved: int = Field(default=0, description="Number of YouTube videos saved")
+    videos_saved: int = Field(
+        default=0, description="Number of YouTube videos inserted"
+    )
     articles: List[NewsItem] = Field(default=None, description="List of news articles")
-    articles_saved: int = Field(default=0, description="Number of news articles saved")
+    articles_saved: int = Field(
+        default=0, description="Number of news articles inserted"
+    )
+    items_scraped: int = Field(default=0, description="Number of new items scraped")
+    items_digested: int = Field(
+        default=0, description="Number of items that received a digest"
+    )
+    duplicates: int = Field(
+        default=0, description="Number of items digested as near-duplicates"
+    )
+    save_result: SaveResult = Field(
+        default_factory=SaveResult, description="Outcome of the database writes"
+    )
+    stage_timings: List[StageTiming] = Field(
+        default_factory=list, description="Timings of each unit of work"
+    )
+    llm_calls: List[LLMCallStats] = Field(
+        default_factory=list, description="Stats of each LLM call"
+    )
+    input_tokens: int = Field(default=0, description="Total LLM prompt tokens")
+    output_tokens: int = Field(default=0, description="Total LLM candidate tokens")
+    cache_hit_rates: Dict[str, float] = Field(
+        default_factory=dict, description="Hit rate of each cache, by cache name"
+    )
+    email_sent: bool = Field(
+        default=False, description="Whether the email reached every recipient"
+    )
+    editions: int = Field(
+        default=0, description="Number of distinct versions of the email"
+    )
+    emails_sent: int = Field(default=0, description="Number of emails sent")
+    emails_failed: int = Field(default=0, description="Number of emails not sent")
+
+    def stage_seconds(self) -> Dict[str, float]:
+        """Total time spent in each stage, which overlaps for concurrent work."""
+        totals: Dict[str, float] = {}
+        for timing in self.stage_timings:
+            totals[timing.stage] = totals.get(timing.stage, 0.0) + timing.seconds
+        return totals
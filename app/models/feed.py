@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class FeedState(BaseModel):
+    """Represents the conditional GET state of a single feed URL"""
+
+    url: str = Field(..., description="The feed URL")
+    etag: Optional[str] = Field(
+        default=None, description="The ETag returned by the last fetch"
+    )
+    last_modified: Optional[str] = Field(
+        default=None, description="The Last-Modified header returned by the last fetch"
+    )
+    seen_guids: List[str] = Field(
+        default_factory=list, description="GUIDs of the most recently seen entries"
+    )
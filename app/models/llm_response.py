@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 from typing import List
 
+from .news import Coverage
+
 
 class DigestItem(BaseModel):
     """Represents a news item digest"""
@@ -25,6 +28,17 @@ class EmailItem(BaseModel):
         ...,
         description="Source attribution (e.g., 'OpenAI', 'Anthropic', 'Modular', 'YouTube - Channel Name')",
     )
+    also_covered_by: List[Coverage] = Field(
+        default_factory=list, description="Other sources covering the same story"
+    )
+
+
+class EmailSection(BaseModel):
+    """Represents the items of one topic in the email digest."""
+
+    topic: str = Field(..., description="The topic heading")
+    introduction: str = Field(..., description="Introduction to the topic")
+    digest_items: List[EmailItem] = Field(..., description="The topic's digest items")
 
 
 class EmailLLMResponse(BaseModel):
@@ -32,3 +46,7 @@ class EmailLLMResponse(BaseModel):
 
     introduction: str = Field(..., description="Brief 1-2 sentence introduction")
     digest_items: List[EmailItem] = Field(..., description="List of news digest items")
+    # Filled in locally when topics are written separately, hidden from the LLM
+    sections: SkipJsonSchema[List[EmailSection]] = Field(
+        default_factory=list, description="The digest items grouped by topic"
+    )
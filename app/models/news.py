@@ -1,6 +1,13 @@
 from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Literal, Optional
+from typing import List, Literal, Optional
+
+
+class Coverage(BaseModel):
+    """Represents another source covering the same story"""
+
+    source: str = Field(..., description="The source of the covering item")
+    url: str = Field(..., description="The URL to the covering item")
 
 
 class NewsItem(BaseModel):
@@ -17,6 +24,22 @@ class NewsItem(BaseModel):
     url: str = Field(..., description="The URL to the item")
     published_at: datetime = Field(..., description="The publication date and time")
     author: str = Field(..., description="The author's name")
-    digest: str = Field(
+    digest: Optional[str] = Field(
         default=None, description="A digest summary of the news article"
     )
+    duplicate_of: Optional[str] = Field(
+        default=None, description="The GUID of the item this one near-duplicates"
+    )
+    also_covered_by: List[Coverage] = Field(
+        default_factory=list, description="Other sources covering the same story"
+    )
+
+
+class Transcript(BaseModel):
+    """Represents a fetched YouTube transcript, or the lack of one"""
+
+    video_id: str = Field(..., description="The YouTube video ID")
+    text: Optional[str] = Field(
+        default=None, description="The transcript text, None if unavailable"
+    )
+    fetched_at: datetime = Field(..., description="When the transcript was fetched")
@@ -0,0 +1,21 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+from .news import NewsItem
+
+
+class PageCursor(BaseModel):
+    """Represents the position after the last item of a page"""
+
+    published_at: datetime = Field(..., description="Publication time of the item")
+    id: int = Field(..., description="Row ID of the item, breaking ties")
+
+
+class NewsItemPage(BaseModel):
+    """Represents one page of news items, newest first"""
+
+    items: List[NewsItem] = Field(default_factory=list, description="The items")
+    next_cursor: Optional[PageCursor] = Field(
+        default=None, description="Cursor of the next page, None on the last page"
+    )
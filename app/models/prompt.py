@@ -0,0 +1,21 @@
+import re
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+VARIABLE_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class CachedPrompt(BaseModel):
+    """Represents a locally cached Langfuse text prompt"""
+
+    name: str = Field(..., description="The prompt name in Langfuse")
+    version: int = Field(..., description="The prompt version in Langfuse")
+    template: str = Field(..., description="The raw prompt template")
+    fetched_at: datetime = Field(..., description="When the prompt was fetched")
+
+    def compile(self, **variables) -> str:
+        """Fill in ``{{variable}}`` placeholders, like Langfuse prompt clients."""
+        return VARIABLE_PATTERN.sub(
+            lambda match: str(variables.get(match.group(1), match.group(0))),
+            self.template,
+        )
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from .news import NewsItem
+
+
+class SearchResult(BaseModel):
+    """Represents a news item matching a full-text search"""
+
+    item: NewsItem = Field(..., description="The matching item")
+    rank: float = Field(..., description="Relevance, higher is better")
+    snippet: Optional[str] = Field(
+        default=None, description="Matching text with the query terms highlighted"
+    )
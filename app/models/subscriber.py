@@ -0,0 +1,50 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional, Tuple
+
+from .llm_response import EmailLLMResponse
+from .news import NewsItem
+from .topic import Topic
+
+
+class Subscriber(BaseModel):
+    """Represents a recipient of the digest email"""
+
+    email: str = Field(..., description="The email address")
+    name: Optional[str] = Field(default=None, description="Name used in the greeting")
+    sources: List[str] = Field(
+        default_factory=list, description="Sources to include, or all when empty"
+    )
+    keywords: List[str] = Field(
+        default_factory=list,
+        description="Topics items must mention in their title or digest, or any when empty",
+    )
+
+    def profile(self) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """The subscriber's interests, equal for subscribers who want the same items."""
+        return (
+            tuple(sorted({source.lower() for source in self.sources})),
+            tuple(
+                sorted({" ".join(keyword.lower().split()) for keyword in self.keywords})
+            ),
+        )
+
+
+class Edition(BaseModel):
+    """One version of the email, sent to every subscriber who gets the same items"""
+
+    top_items: List[NewsItem] = Field(
+        default_factory=list, description="Items summarized by the LLM"
+    )
+    overflow_items: List[NewsItem] = Field(
+        default_factory=list, description="Items only linked under More news"
+    )
+    topics: List[Topic] = Field(
+        default_factory=list,
+        description="The top items grouped by topic, or empty to write them at once",
+    )
+    subscribers: List[Subscriber] = Field(
+        default_factory=list, description="Recipients of this edition"
+    )
+    email_content: Optional[EmailLLMResponse] = Field(
+        default=None, description="The LLM written introduction and entries"
+    )
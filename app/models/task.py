@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict
+
+
+class Task(BaseModel):
+    """Represents a unit of work claimed from the distributed task queue"""
+
+    id: int = Field(..., description="The task ID")
+    run_id: str = Field(..., description="The run the task belongs to")
+    kind: str = Field(..., description="The kind of task, e.g. scrape or digest")
+    payload: Dict[str, Any] = Field(
+        default_factory=dict, description="The task arguments"
+    )
+    attempts: int = Field(default=0, description="Number of times it was claimed")
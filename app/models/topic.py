@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+from .news import NewsItem
+
+
+class Topic(BaseModel):
+    """A group of related items, summarized by its own LLM call"""
+
+    label: str = Field(..., description="Heading of the topic in the email")
+    terms: List[str] = Field(
+        default_factory=list, description="The terms weighing most in the topic"
+    )
+    items: List[NewsItem] = Field(
+        default_factory=list, description="Items of the topic, best ranked first"
+    )
@@ -0,0 +1,25 @@
+"""Local processing stages that run between scraping and the LLM.
+
+Exports are imported on first use, as NumPy and SciPy take a while to load
+and the repository only needs the tokenizer in ``terms``.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "MinHasher": ".near_duplicates",
+    "NearDuplicateIndex": ".near_duplicates",
+    "ItemRanker": ".ranking",
+    "EditionPlanner": ".subscriptions",
+    "TopicIndex": ".subscriptions",
+    "TopicClusterer": ".topics",
+    "document_terms": ".terms",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
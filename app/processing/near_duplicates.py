@@ -0,0 +1,107 @@
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from ..models.config import DedupConfig
+from ..models.news import NewsItem
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Hash values stay below 2**32 and coefficients below this prime, so the
+# universal hash a * h + b never overflows uint64.
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+
+class MinHasher:
+    """Computes MinHash signatures over word shingles, vectorized with NumPy."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 2, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        words = WORD_PATTERN.findall(text.lower())
+        size = min(self.shingle_size, len(words)) or 1
+        return np.fromiter(
+            {
+                zlib.crc32(" ".join(words[i : i + size]).encode("utf-8"))
+                for i in range(max(len(words) - size + 1, 1))
+            },
+            dtype=np.uint64,
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self.shingles(text)
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+
+class NearDuplicateIndex:
+    """LSH index of MinHash signatures for finding near-duplicate news items.
+
+    Signatures are split into bands; items sharing any band are candidates,
+    and candidates are confirmed by their estimated Jaccard similarity.
+    """
+
+    def __init__(self, config: Optional[DedupConfig] = None):
+        self.config = config or DedupConfig()
+        self.hasher = MinHasher(self.config.num_perm)
+        self.rows_per_band = self.config.num_perm // self.config.bands
+        self._buckets: List[Dict[bytes, List[str]]] = [
+            defaultdict(list) for _ in range(self.config.bands)
+        ]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self.items: Dict[str, NewsItem] = {}
+
+    def _text(self, item: NewsItem) -> str:
+        description = (item.description or "")[: self.config.max_description_chars]
+        return f"{item.title} {description}"
+
+    def _bands(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[
+                band * self.rows_per_band : (band + 1) * self.rows_per_band
+            ].tobytes()
+            for band in range(self.config.bands)
+        ]
+
+    def add(self, item: NewsItem, signature: Optional[np.ndarray] = None):
+        if item.guid in self._signatures:
+            return
+        signature = (
+            self.hasher.signature(self._text(item)) if signature is None else signature
+        )
+        for band, key in enumerate(self._bands(signature)):
+            self._buckets[band][key].append(item.guid)
+        self._signatures[item.guid] = signature
+        self.items[item.guid] = item
+
+    def find(self, item: NewsItem) -> Tuple[Optional[NewsItem], np.ndarray]:
+        """Return the most similar indexed item above the threshold, if any.
+
+        The item's signature is returned too so it can be added without
+        hashing it again.
+        """
+        signature = self.hasher.signature(self._text(item))
+        candidates = {
+            guid
+            for band, key in enumerate(self._bands(signature))
+            for guid in self._buckets[band].get(key, ())
+            if guid != item.guid
+        }
+        if not candidates:
+            return None, signature
+
+        guids = list(candidates)
+        similarities = (
+            np.stack([self._signatures[guid] for guid in guids]) == signature
+        ).mean(axis=1)
+        best = int(similarities.argmax())
+        if similarities[best] < self.config.threshold:
+            return None, signature
+        return self.items[guids[best]], signature
@@ -0,0 +1,56 @@
+import heapq
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from ..models.config import RankingConfig
+from ..models.news import NewsItem
+
+
+class ItemRanker:
+    """Scores items locally and keeps the top K for the email prompt.
+
+    The score combines recency (exponential decay), a per-source weight,
+    keyword boosts from the config, and how many other sources covered the
+    same story, which stands in for engagement.
+    """
+
+    def __init__(self, config: Optional[RankingConfig] = None):
+        self.config = config or RankingConfig()
+        self._keywords = [
+            (keyword.lower(), boost)
+            for keyword, boost in self.config.keyword_boosts.items()
+        ]
+
+    def score(self, item: NewsItem, now: Optional[datetime] = None) -> float:
+        now = now or datetime.now(timezone.utc)
+        published_at = item.published_at
+        if published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=timezone.utc)
+        age_hours = max((now - published_at).total_seconds() / 3600, 0.0)
+        recency = 0.5 ** (age_hours / self.config.recency_half_life_hours)
+
+        text = f"{item.title} {item.digest or ''}".lower()
+        keyword_boost = sum(
+            boost for keyword, boost in self._keywords if keyword in text
+        )
+        coverage = 1 + self.config.coverage_weight * len(item.also_covered_by)
+
+        source_weight = self.config.source_weights.get(item.source, 1.0)
+        return (source_weight * recency + keyword_boost) * coverage
+
+    def select(self, items: List[NewsItem]) -> Tuple[List[NewsItem], List[NewsItem]]:
+        """Split items into the top K by score and the remaining overflow.
+
+        Both are ordered by descending score, keeping the given order on ties.
+        """
+        now = datetime.now(timezone.utc)
+        # The negated index ranks earlier items first among equal scores
+        scored = [
+            (self.score(item, now), -index, item) for index, item in enumerate(items)
+        ]
+        top = heapq.nlargest(self.config.top_k, scored)
+        top_indices = {index for _, index, _ in top}
+        overflow = sorted(
+            (entry for entry in scored if entry[1] not in top_indices), reverse=True
+        )
+        return [item for _, _, item in top], [item for _, _, item in overflow]
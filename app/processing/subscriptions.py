@@ -0,0 +1,91 @@
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..models.news import NewsItem
+from ..models.subscriber import Edition, Subscriber
+from .ranking import ItemRanker
+
+WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> List[str]:
+    return WORD.findall(text.lower())
+
+
+class TopicIndex:
+    """Inverted index from sources and title or digest words to items.
+
+    A keyword matches an item whose title or digest contains all of its
+    words in order, looked up through the postings of its words.
+    """
+
+    def __init__(self, items: List[NewsItem]):
+        self.items = items
+        self._by_source: Dict[str, Set[int]] = defaultdict(set)
+        self._by_word: Dict[str, Set[int]] = defaultdict(set)
+        self._texts: List[str] = []
+        for index, item in enumerate(items):
+            words = _words(f"{item.title} {item.digest or ''}")
+            self._by_source[item.source.lower()].add(index)
+            for word in words:
+                self._by_word[word].add(index)
+            self._texts.append(f" {' '.join(words)} ")
+
+    def _keyword_matches(self, keyword: str) -> Set[int]:
+        words = _words(keyword)
+        if not words:
+            return set()
+        postings = sorted((self._by_word.get(word, set()) for word in words), key=len)
+        matches = set.intersection(*postings)
+        if len(words) == 1:
+            return matches
+        phrase = f" {' '.join(words)} "
+        return {index for index in matches if phrase in self._texts[index]}
+
+    def match(self, sources: List[str], keywords: List[str]) -> List[NewsItem]:
+        """Items from any of the sources mentioning any keyword; empty means any."""
+        matches = set(range(len(self.items)))
+        if sources:
+            matches &= set().union(
+                *(self._by_source.get(source.lower(), set()) for source in sources)
+            )
+        if keywords:
+            matches &= set().union(
+                *(self._keyword_matches(keyword) for keyword in keywords)
+            )
+        return [self.items[index] for index in sorted(matches)]
+
+
+class EditionPlanner:
+    """Groups subscribers into editions by the items their interests select.
+
+    Items are matched and ranked once per distinct interest profile, and
+    subscribers whose profiles select the same items share one edition,
+    so the email is written once per edition rather than per subscriber.
+    """
+
+    def __init__(self, ranker: Optional[ItemRanker] = None):
+        self.ranker = ranker or ItemRanker()
+
+    def plan(
+        self, candidates: List[NewsItem], subscribers: List[Subscriber]
+    ) -> List[Edition]:
+        index = TopicIndex(candidates)
+        editions: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], Edition] = {}
+        by_profile: Dict[Tuple, Edition] = {}
+        for subscriber in subscribers:
+            profile = subscriber.profile()
+            if profile not in by_profile:
+                top_items, overflow_items = self.ranker.select(index.match(*profile))
+                key = (
+                    tuple(item.guid for item in top_items),
+                    tuple(item.guid for item in overflow_items),
+                )
+                if key not in editions:
+                    editions[key] = Edition(
+                        top_items=top_items, overflow_items=overflow_items
+                    )
+                by_profile[profile] = editions[key]
+            by_profile[profile].subscribers.append(subscriber)
+        return list(editions.values())
@@ -0,0 +1,24 @@
+import re
+from typing import List
+
+TERM = re.compile(r"[a-z][a-z0-9]+")
+MAX_TERM_CHARS = 50
+STOP_WORDS = frozenset("""
+    about above after again against all also am an and any are as at be because
+    been before being below between both but by can could did do does doing down
+    during each few for from further had has have having he her here hers him his
+    how if in into is it its just like made make makes many may me more most much
+    my new no nor not now of off on once one only or other our ours out over own
+    same she should so some such than that the their them then there these they
+    this those through to too two under until up us very via was we were what when
+    where which while who whom why will with would you your
+    """.split())
+
+
+def document_terms(title: str, digest: str | None) -> List[str]:
+    """The terms of an item's title and digest, repeated as often as they occur."""
+    return [
+        term
+        for term in TERM.findall(f"{title} {digest or ''}".lower())
+        if term not in STOP_WORDS and len(term) <= MAX_TERM_CHARS
+    ]
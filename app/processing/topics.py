@@ -0,0 +1,150 @@
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from scipy.cluster import hierarchy
+from scipy.spatial.distance import squareform
+
+from ..models.config import TopicConfig
+from ..models.news import NewsItem
+from ..models.subscriber import Edition
+from ..models.topic import Topic
+from .terms import document_terms
+
+OTHER_TOPIC = "Other news"
+
+# Looks up (number of documents, document frequency by term) for some terms
+TermStats = Callable[[List[str]], Tuple[int, Dict[str, int]]]
+
+
+class TopicClusterer:
+    """Groups the items of each edition into topics with TF-IDF vectors.
+
+    Items are vectorized into a sparse matrix weighted by inverse document
+    frequencies from the whole archive, which ``save_news_items`` keeps up
+    to date, and clustered by average-linkage on cosine distance. Small
+    topics are pooled, so each edition gets a few topics with one prompt
+    each.
+    """
+
+    def __init__(self, term_stats: TermStats, config: Optional[TopicConfig] = None):
+        self.term_stats = term_stats
+        self.config = config or TopicConfig()
+
+    def vectorize(self, items: List[NewsItem]) -> Tuple[sparse.csr_matrix, List[str]]:
+        """Row-normalized TF-IDF vectors of the items, and their vocabulary."""
+        counts = [Counter(document_terms(item.title, item.digest)) for item in items]
+        vocabulary = sorted(set().union(*counts))
+        columns = {term: column for column, term in enumerate(vocabulary)}
+
+        documents, frequencies = self.term_stats(vocabulary)
+        # Smoothed, so terms the archive has not seen get the highest weight
+        idf = (
+            np.log(
+                (1 + documents)
+                / (1 + np.array([frequencies.get(term, 0) for term in vocabulary]))
+            )
+            + 1
+        )
+
+        indptr = np.cumsum([0] + [len(terms) for terms in counts])
+        indices = np.fromiter(
+            (columns[term] for terms in counts for term in terms),
+            dtype=np.int64,
+            count=indptr[-1],
+        )
+        tf = np.fromiter(
+            (count for terms in counts for count in terms.values()),
+            dtype=np.float64,
+            count=indptr[-1],
+        )
+        weights = (1 + np.log(tf)) * idf[indices]
+        matrix = sparse.csr_matrix(
+            (weights, indices, indptr), shape=(len(items), len(vocabulary))
+        )
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms) @ matrix, vocabulary
+
+    def cluster(self, items: List[NewsItem]) -> List[Topic]:
+        """Cluster items into topics, ordered by the position of their first item."""
+        if len(items) < 2:
+            return [self._topic(items, [])] if items else []
+
+        matrix, vocabulary = self.vectorize(items)
+        similarity = (matrix @ matrix.T).toarray()
+        distances = np.clip(1 - similarity, 0, 2)
+        np.fill_diagonal(distances, 0)
+        labels = hierarchy.fcluster(
+            hierarchy.linkage(squareform(distances, checks=False), method="average"),
+            t=1 - self.config.similarity_threshold,
+            criterion="distance",
+        )
+
+        members: Dict[int, List[int]] = defaultdict(list)
+        for index, label in enumerate(labels):
+            members[label].append(index)
+        topics = []
+        for indices in members.values():
+            centroid = np.asarray(matrix[indices].mean(axis=0)).ravel()
+            top_columns = np.argsort(centroid)[::-1][: self.config.label_terms]
+            terms = [vocabulary[column] for column in top_columns if centroid[column]]
+            topics.append(self._topic([items[index] for index in indices], terms))
+        return topics
+
+    @staticmethod
+    def _topic(items: List[NewsItem], terms: List[str]) -> Topic:
+        return Topic(label=" · ".join(terms) or OTHER_TOPIC, terms=terms, items=items)
+
+    def assign(self, editions: List[Edition]) -> int:
+        """Group the top items of every edition by topic.
+
+        The union of the editions' top items is clustered once, so an item
+        falls under the same topic in every edition. Editions left with a
+        single topic are written at once. Returns the number of topics.
+        """
+        items = list(
+            {
+                item.guid: item for edition in editions for item in edition.top_items
+            }.values()
+        )
+        topics = self.cluster(items)
+        topic_of = {
+            item.guid: index
+            for index, topic in enumerate(topics)
+            for item in topic.items
+        }
+
+        for edition in editions:
+            groups: Dict[int, List[NewsItem]] = defaultdict(list)
+            for item in edition.top_items:
+                groups[topic_of[item.guid]].append(item)
+            large = sorted(
+                (
+                    index
+                    for index, group in groups.items()
+                    if len(group) >= self.config.min_topic_size
+                ),
+                key=lambda index: len(groups[index]),
+                reverse=True,
+            )
+            # Leave room for Other news when anything gets pooled
+            if len(large) > self.config.max_topics or len(large) < len(groups):
+                large = large[: self.config.max_topics - 1]
+            kept = set(large)
+            # Dicts keep insertion order, so topics follow their best ranked item
+            edition_topics = [
+                topics[index].model_copy(update={"items": group})
+                for index, group in groups.items()
+                if index in kept
+            ]
+            other = [
+                item
+                for index, group in groups.items()
+                if index not in kept
+                for item in group
+            ]
+            if other:
+                edition_topics.append(self._topic(other, []))
+            edition.topics = edition_topics if len(edition_topics) > 1 else []
+        return len(topics)
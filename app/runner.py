@@ -1,116 +1,681 @@
-from .models import RunnerConfig
-from .models.news import NewsItem
-from .models.llm_response import EmailLLMResponse
-from .scrapers import AnthropicAIScraper, YouTubeScraper, OpenAIScraper, ModularScraper
+from .models import RunnerConfig, RunnerResult, SaveResult
+from .models.news import Coverage, NewsItem
+from .models.subscriber import Edition
+from .scrapers import (
+    AnthropicAIScraper,
+    YouTubeScraper,
+    OpenAIScraper,
+    ModularScraper,
+    FeedCache,
+    FeedFetcher,
+)
 from .db import Repository
-from .agent import Agent
-from .services import EmailService
+from .agent import Agent, DigestCache
+from .agent.condenser import CHARS_PER_TOKEN, estimate_tokens
+from .processing import (
+    EditionPlanner,
+    ItemRanker,
+    NearDuplicateIndex,
+    TopicClusterer,
+)
+from .services import EmailService, MetricsService, StageTimer
 import asyncio
+import functools
 import logging
-from typing import List, Tuple
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Coroutine, Dict, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Marks the end of a stage's output in the pipeline queues
+_DONE = object()
+
 
 class Runner:
+    """Runs the scrape, digest, persist and email pipeline.
+
+    Stages are connected by bounded asyncio queues, so items flow from each
+    scraper into transcript fetching, digest batching and the database as
+    soon as they are ready, and a slow stage applies backpressure upstream.
+    """
+
     def __init__(self, config: RunnerConfig, repository: Repository):
         self.time_window_hours = config.time_window_hours
         self.youtube_channels = config.youtube_channels
+        self.fetch_config = config.fetch
+        self.pipeline_config = config.pipeline
+        self.digest_config = config.digest
+        self.dedup_config = config.dedup
+        self.dedup_index: NearDuplicateIndex | None = None
+        self.planner = EditionPlanner(ItemRanker(config.ranking))
+        self.clusterer = TopicClusterer(repository.get_term_stats, config.topics)
+        self._waiting_duplicates: Dict[str, List[NewsItem]] = defaultdict(list)
         self.repository = repository
-        self.agent = Agent()
-        self.email_service = EmailService()
+        self.feed_cache = FeedCache(repository)
+        self.youtube_scraper = YouTubeScraper(
+            repository=repository, config=config.transcripts
+        )
+        self.agent = Agent(
+            DigestCache(repository), config.digest, config.prompts, config.llm
+        )
+        self.email_service = EmailService(config.email)
+        self.metrics_service = MetricsService(config.metrics)
+        self.timer = StageTimer()
+        self._counts: Counter = Counter()
 
-    async def _run_digest_async(
-        self, articles: List[NewsItem], videos: List[NewsItem]
-    ) -> Tuple[List[NewsItem], List[NewsItem]]:
-        tasks = []
-        if articles:
-            tasks.append(self.agent.add_digest(articles))
-        if videos:
-            tasks.append(self.agent.add_digest(videos))
-        if not tasks:
-            return articles, videos
+    def _scrape_sources(
+        self, fetcher: FeedFetcher
+    ) -> Dict[str, Tuple[List[str], Callable[[int], Coroutine]]]:
+        """Each source's feed URLs, and a function scraping it over a time window."""
+        youtube_scraper = YouTubeScraper(fetcher)
+        openai_scraper = OpenAIScraper(fetcher)
+        anthropic_scraper = AnthropicAIScraper(fetcher)
+        modular_scraper = ModularScraper(fetcher)
 
-        results = await asyncio.gather(*tasks)
-        digested_articles = results[0] if articles else articles
-        digested_videos = (
-            results[1] if (articles and videos) else (results[0] if videos else videos)
+        sources = {
+            f"youtube:{channel}": (
+                [youtube_scraper.RSS_FEED_URL.format(channel_id=channel)],
+                functools.partial(youtube_scraper.scrape_youtube_channel, channel),
+            )
+            for channel in self.youtube_channels
+        }
+        sources["openai"] = ([openai_scraper.RSS_FEED_URL], openai_scraper.scrape_news)
+        sources["anthropic"] = (
+            list(anthropic_scraper.RSS_FEED_URLS),
+            anthropic_scraper.scrape_news,
         )
+        sources["modular"] = (
+            [modular_scraper.RSS_FEED_URL],
+            modular_scraper.scrape_news,
+        )
+        return sources
+
+    def _scrape_tasks(
+        self, fetcher: FeedFetcher, time_window_hours: int | None = None
+    ) -> List[Tuple[str, List[str], Coroutine]]:
+        """Each source's name, feed URLs and scrape coroutine."""
+        return [
+            (name, urls, scrape(time_window_hours or self.time_window_hours))
+            for name, (urls, scrape) in self._scrape_sources(fetcher).items()
+        ]
+
+    async def _next_batch(
+        self, queue: asyncio.Queue, max_items: int
+    ) -> tuple[List[NewsItem], bool]:
+        """Wait for items on a queue and return those ready, up to ``max_items``.
+
+        Returns an empty batch when nothing arrived within the flush interval,
+        and whether the upstream stage is done.
+        """
+        try:
+            item = await asyncio.wait_for(
+                queue.get(), timeout=self.pipeline_config.flush_seconds
+            )
+        except TimeoutError:
+            return [], False
+
+        batch = []
+        while True:
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+            if len(batch) >= max_items or queue.empty():
+                return batch, False
+            item = queue.get_nowait()
 
-        return digested_articles, digested_videos
+    async def _scrape_stage(
+        self, output: asyncio.Queue, tasks: List[Tuple[str, List[str], Coroutine]]
+    ) -> Dict[str, List[NewsItem] | None]:
+        """Run the scrape tasks, returning the items of each, or None if it failed."""
 
-    async def _scrape_all_async(
+        async def scrape(name: str, task: Coroutine) -> List[NewsItem] | None:
+            try:
+                with self.timer.time("scrape", name) as timing:
+                    items = await task
+                    timing.items = len(items)
+            except Exception as e:
+                logger.exception(f"Scraper {name} failed: {e}")
+                return None
+            self._counts["scraped"] += len(items)
+            for item in items:
+                await output.put(item)
+            return items
+
+        results = await asyncio.gather(*(scrape(name, task) for name, _, task in tasks))
+        await output.put(_DONE)
+        return {name: items for (name, *_), items in zip(tasks, results)}
+
+    async def _enrich(
         self,
-    ) -> Tuple[List[NewsItem], List[NewsItem], List[NewsItem], List[NewsItem]]:
-        youtube_scraper = YouTubeScraper()
-        openai_scraper = OpenAIScraper()
-        anthropic_scraper = AnthropicAIScraper()
-        modular_scraper = ModularScraper()
+        items: List[NewsItem],
+        digest_queue: asyncio.Queue,
+        save_queue: asyncio.Queue,
+        in_flight: asyncio.Semaphore,
+    ):
+        """Swap known items for their stored copies and add missing transcripts.
 
-        tasks = []
+        Items that cannot be prepared are stored undigested, to be digested
+        by a later ``digest`` command.
+        """
+        prepared = False
+        try:
+            known_items = await asyncio.to_thread(
+                self.repository.get_news_items_by_guids, [item.guid for item in items]
+            )
+            if known_items:
+                logger.info(
+                    f"{len(known_items)} scraped items already stored, reusing them"
+                )
+            items = [known_items.get(item.guid, item) for item in items]
 
-        for channel in self.youtube_channels:
-            task = asyncio.to_thread(
-                youtube_scraper.scrape_youtube_channel, channel, self.time_window_hours
+            await self.youtube_scraper.add_transcripts(
+                [
+                    item
+                    for item in items
+                    if item.source == "YouTube" and item.guid not in known_items
+                ]
+            )
+            prepared = True
+        except Exception as e:
+            logger.exception(
+                f"Failed to prepare {len(items)} items, storing them undigested: {e}"
             )
-            tasks.append(task)
+        finally:
+            in_flight.release()
+
+        for item in items:
+            queue = save_queue if item.digest or not prepared else digest_queue
+            await queue.put(item)
+
+    async def _enrich_stage(
+        self,
+        scraped: asyncio.Queue,
+        digest_queue: asyncio.Queue,
+        save_queue: asyncio.Queue,
+    ):
+        in_flight = asyncio.Semaphore(self.pipeline_config.max_batches_in_flight)
+        tasks = set()
+        done = False
+        while not done:
+            items, done = await self._next_batch(
+                scraped, self.pipeline_config.save_batch_size
+            )
+            if items:
+                await in_flight.acquire()
+                task = asyncio.create_task(
+                    self._enrich(items, digest_queue, save_queue, in_flight)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        await asyncio.gather(*tasks)
+        await digest_queue.put(_DONE)
+        await save_queue.put(_DONE)
 
-        openai_task = asyncio.to_thread(
-            openai_scraper.scrape_news, self.time_window_hours
+    def _load_dedup_index(self) -> NearDuplicateIndex:
+        """Index recently stored, digested items for near-duplicate lookups."""
+        index = NearDuplicateIndex(self.dedup_config)
+        since = datetime.now(timezone.utc) - timedelta(
+            days=self.dedup_config.lookback_days
         )
-        tasks.append(openai_task)
+        for item in self.repository.get_recent_news_items(
+            since, self.dedup_config.max_description_chars
+        ):
+            # Undigested items cannot lend their digest to a duplicate
+            if item.digest and not item.duplicate_of:
+                index.add(item)
+        logger.info(f"Indexed {len(index.items)} recent items for deduplication")
+        return index
 
-        anthropic_task = asyncio.to_thread(
-            anthropic_scraper.scrape_news, self.time_window_hours
+    async def _route_duplicate(self, item: NewsItem, output: asyncio.Queue) -> bool:
+        """Attach a near-duplicate to its representative instead of digesting it.
+
+        Returns whether the item was a duplicate. Duplicates reuse the digest
+        of their representative, waiting for it if it is still being digested.
+        """
+        if self.dedup_index is None:
+            return False
+
+        representative, signature = self.dedup_index.find(item)
+        if representative is None:
+            self.dedup_index.add(item, signature)
+            return False
+
+        item.duplicate_of = representative.guid
+        self._counts["duplicates"] += 1
+        representative.also_covered_by.append(
+            Coverage(source=item.source, url=item.url)
         )
-        tasks.append(anthropic_task)
+        if representative.digest:
+            item.digest = representative.digest
+            await output.put(item)
+        else:
+            self._waiting_duplicates[representative.guid].append(item)
+        return True
+
+    async def _digest(
+        self,
+        items: List[NewsItem],
+        output: asyncio.Queue,
+        in_flight: asyncio.Semaphore,
+    ):
+        try:
+            with self.timer.time("digest") as timing:
+                timing.items = len(items)
+                await self.agent.add_digest(items)
+        except Exception as e:
+            logger.exception(f"Failed to digest {len(items)} items: {e}")
+        finally:
+            in_flight.release()
+        self._counts["digested"] += sum(1 for item in items if item.digest)
+        for item in items:
+            await output.put(item)
+            for duplicate in self._waiting_duplicates.pop(item.guid, []):
+                duplicate.digest = item.digest
+                await output.put(duplicate)
+
+    async def _digest_stage(
+        self, digest_queue: asyncio.Queue, save_queue: asyncio.Queue
+    ):
+        """Group items into token-budgeted batches and digest them as they fill up."""
+        in_flight = asyncio.Semaphore(self.digest_config.max_concurrency)
+        tasks = set()
+        pending: List[NewsItem] = []
+        pending_tokens = 0
+        done = False
+
+        while not done:
+            items, done = await self._next_batch(
+                digest_queue, self.pipeline_config.save_batch_size
+            )
+            for item in items:
+                if await self._route_duplicate(item, save_queue):
+                    continue
+                pending.append(item)
+                pending_tokens += estimate_tokens(item.title) + min(
+                    estimate_tokens(item.description or ""),
+                    self.digest_config.max_item_tokens,
+                )
+
+            full = pending_tokens >= self.digest_config.max_batch_tokens
+            if pending and (full or done or not items):
+                await in_flight.acquire()
+                task = asyncio.create_task(self._digest(pending, save_queue, in_flight))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                pending, pending_tokens = [], 0
+
+        await asyncio.gather(*tasks)
+        for duplicates in self._waiting_duplicates.values():
+            for duplicate in duplicates:
+                await save_queue.put(duplicate)
+        self._waiting_duplicates.clear()
+        await save_queue.put(_DONE)
+
+    async def _persist_stage(
+        self,
+        save_queue: asyncio.Queue,
+        saved_items: List[NewsItem],
+        producers: int = 2,
+    ) -> SaveResult:
+        """Save items until each of the ``producers`` feeding the queue is done."""
+        result = SaveResult()
+        while producers:
+            items, done = await self._next_batch(
+                save_queue, self.pipeline_config.save_batch_size
+            )
+            producers -= done
+            if not items:
+                continue
+
+            with self.timer.time("db_write") as timing:
+                timing.items = len(items)
+                batch_result = await asyncio.to_thread(
+                    self.repository.save_news_items, items
+                )
+            result.add(batch_result)
+            saved_items.extend(items)
+
+        return result
+
+    async def _ingest(
+        self,
+        fetcher: FeedFetcher,
+        tasks: List[Tuple[str, List[str], Coroutine]],
+        digest: bool = True,
+    ) -> Tuple[Dict[str, List[NewsItem] | None], List[NewsItem], SaveResult]:
+        """Scrape, digest and store the items of some scrape tasks.
+
+        Items are stored without digests unless ``digest`` is set. Returns
+        the items scraped by each task, or None for failed tasks, along with
+        the items saved and the outcome of the writes. Only the feeds of
+        tasks whose items were all stored are marked as seen.
+        """
+        queue_size = self.pipeline_config.queue_size
+        scraped = asyncio.Queue(maxsize=queue_size)
+        digest_queue = asyncio.Queue(maxsize=queue_size)
+        save_queue = asyncio.Queue(maxsize=queue_size)
+        feeds_fetched = fetcher.feeds_fetched
+        feeds_not_modified = fetcher.feeds_not_modified
+
+        if digest:
+            stages = [
+                self._enrich_stage(scraped, digest_queue, save_queue),
+                self._digest_stage(digest_queue, save_queue),
+            ]
+        else:
+            # Items needing a digest go straight to the database as well
+            stages = [self._enrich_stage(scraped, save_queue, save_queue)]
 
-        modular_task = asyncio.to_thread(
-            modular_scraper.scrape_news, self.time_window_hours
+        saved_items: List[NewsItem] = []
+        try:
+            scraped_items, *_, save_result = await asyncio.gather(
+                self._scrape_stage(scraped, tasks),
+                *stages,
+                self._persist_stage(save_queue, saved_items),
+            )
+        except BaseException:
+            fetcher.feed_cache.discard([url for _, urls, _ in tasks for url in urls])
+            raise
+        self._log_saved(saved_items, save_result)
+        await asyncio.to_thread(
+            self._commit_feeds, fetcher.feed_cache, tasks, scraped_items, saved_items
+        )
+        self._counts["feeds_fetched"] += fetcher.feeds_fetched - feeds_fetched
+        self._counts["feeds_not_modified"] += (
+            fetcher.feeds_not_modified - feeds_not_modified
         )
-        tasks.append(modular_task)
+        return scraped_items, saved_items, save_result
+
+    @staticmethod
+    def _commit_feeds(
+        feed_cache: FeedCache,
+        tasks: List[Tuple[str, List[str], Coroutine]],
+        scraped_items: Dict[str, List[NewsItem] | None],
+        saved_items: List[NewsItem],
+    ):
+        """Mark as seen the entries of feeds whose items were all stored.
+
+        The feeds of failed tasks are forgotten, so their entries come back
+        on the next run.
+        """
+        saved = {item.guid for item in saved_items}
+        stored, failed = [], []
+        for name, urls, _ in tasks:
+            items = scraped_items[name]
+            if items is not None and all(item.guid in saved for item in items):
+                stored.extend(urls)
+            else:
+                failed.extend(urls)
+        feed_cache.discard(failed)
+        feed_cache.commit(stored)
+
+    @staticmethod
+    def _log_saved(saved_items: List[NewsItem], save_result: SaveResult):
+        if saved_items:
+            logger.info(
+                f"Saved {save_result.inserted} items to database "
+                f"({save_result.updated} digests added, {save_result.skipped} skipped)"
+            )
 
-        results = await asyncio.gather(*tasks)
+    @staticmethod
+    def _record_items(
+        result: RunnerResult,
+        items: List[NewsItem],
+        save_result: SaveResult | None = None,
+    ):
+        """Record the items a run saved or emailed, and the outcome of the writes.
 
-        youtube_videos = []
-        for result in results[:-3]:
-            youtube_videos.extend(result)
+        Only rows actually inserted count as saved videos and articles.
+        """
+        result.youtube_videos = [item for item in items if item.source == "YouTube"]
+        result.articles = [item for item in items if item.source != "YouTube"]
+        if save_result is not None:
+            result.save_result = save_result
+        inserted = result.save_result.inserted_by_source
+        result.videos_saved = inserted.get("YouTube", 0)
+        result.articles_saved = sum(inserted.values()) - result.videos_saved
 
-        openai_articles = results[-3]
-        anthropic_articles = results[-2]
-        modular_articles = results[-1]
+    async def _scrape_and_store(
+        self,
+        result: RunnerResult,
+        time_window_hours: int | None = None,
+        digest: bool = True,
+        feed_cache: FeedCache | None = None,
+    ) -> List[NewsItem]:
+        """Ingest every source over a time window and return the items saved."""
+        if digest and self.dedup_config.enabled:
+            self.dedup_index = await asyncio.to_thread(self._load_dedup_index)
 
-        return youtube_videos, openai_articles, anthropic_articles, modular_articles
+        feed_cache = feed_cache or self.feed_cache
+        async with FeedFetcher(feed_cache, self.fetch_config) as fetcher:
+            _, saved_items, save_result = await self._ingest(
+                fetcher, self._scrape_tasks(fetcher, time_window_hours), digest
+            )
+        self._record_items(result, saved_items, save_result)
+        return saved_items
 
-    def run(self):
-        youtube_videos, openai_articles, anthropic_articles, modular_articles = (
-            asyncio.run(self._scrape_all_async())
+    async def _digest_stored(self, since: datetime, result: RunnerResult):
+        """Digest the items stored since ``since`` without one."""
+        if self.dedup_config.enabled:
+            self.dedup_index = await asyncio.to_thread(self._load_dedup_index)
+        # The prompt takes no more of a description than this
+        pending = await asyncio.to_thread(
+            self.repository.get_stored_news_items,
+            since,
+            self.digest_config.max_item_tokens * CHARS_PER_TOKEN,
+            undigested=True,
         )
+        logger.info(f"Digesting {len(pending)} stored items without a digest")
 
-        all_articles = openai_articles + anthropic_articles + modular_articles
+        digest_queue = asyncio.Queue(maxsize=self.pipeline_config.queue_size)
+        save_queue = asyncio.Queue(maxsize=self.pipeline_config.queue_size)
 
-        digested_articles, digested_youtube_videos = asyncio.run(
-            self._run_digest_async(all_articles, youtube_videos)
+        async def feed():
+            for item in pending:
+                await digest_queue.put(item)
+            await digest_queue.put(_DONE)
+
+        saved_items: List[NewsItem] = []
+        *_, save_result = await asyncio.gather(
+            feed(),
+            self._digest_stage(digest_queue, save_queue),
+            self._persist_stage(save_queue, saved_items, producers=1),
         )
+        self._log_saved(saved_items, save_result)
+        self._record_items(result, saved_items, save_result)
+
+    @staticmethod
+    def _stored_candidates(items: List[NewsItem]) -> List[NewsItem]:
+        """Digested representatives among stored items, with their coverage links."""
+        by_guid = {item.guid: item for item in items}
+        for item in items:
+            representative = by_guid.get(item.duplicate_of)
+            if representative is not None:
+                representative.also_covered_by.append(
+                    Coverage(source=item.source, url=item.url)
+                )
+        return [item for item in items if item.digest and not item.duplicate_of]
 
-        videos_saved = self.repository.save_news_items(digested_youtube_videos)
-        articles_saved = self.repository.save_news_items(digested_articles)
+    async def _write_stored(
+        self, since: datetime, result: RunnerResult
+    ) -> List[Edition]:
+        """Write the email from the digested items stored since ``since``.
+
+        Items are selected by when they were stored rather than published,
+        so a post found late by a slowly polled source is not skipped.
+        """
+        # Only title and digest reach the email prompt
+        items = await asyncio.to_thread(self.repository.get_stored_news_items, since, 0)
+        self._record_items(result, items)
+        return await self._write_editions(self._stored_candidates(items), result)
+
+    async def _write_editions(
+        self, candidates: List[NewsItem], result: RunnerResult
+    ) -> List[Edition]:
+        """Plan the editions of the email from digested items and write them."""
+        subscribers = await asyncio.to_thread(self.repository.get_subscribers)
+        editions = self.planner.plan(
+            candidates, self.email_service.recipients(subscribers)
+        )
         logger.info(
-            f"Saved {videos_saved} videos and {articles_saved} articles to database"
+            f"Planned {len(editions)} editions of the email from "
+            f"{len(candidates)} items"
         )
+        if self.clusterer.config.enabled:
+            with self.timer.time("topics") as timing:
+                timing.items = await asyncio.to_thread(self.clusterer.assign, editions)
 
-        all_digested_items = digested_articles + digested_youtube_videos
+        with self.timer.time("email_content") as timing:
+            timing.items = await self.agent.write_editions(editions)
+        result.editions = len(editions)
+        return editions
 
-        if all_digested_items:
-            email_content = self.agent.create_email_content(all_digested_items)
-            email_sent = self.email_service.send_email(email_content)
-        else:
-            email_sent = self.email_service.send_email(
-                email_content=EmailLLMResponse(
-                    introduction="You're all caught up for today, check again tomorrow :)",
-                    digest_items=[],
-                )
-            )
+    def _deliver(self, editions: List[Edition], result: RunnerResult):
+        with self.timer.time("smtp_send") as timing:
+            delivery = self.email_service.send_editions(editions)
+            timing.items = delivery.sent
+            timing.success = not delivery.failed
+        result.emails_sent = delivery.sent
+        result.emails_failed = len(delivery.failed)
+        result.email_sent = delivery.sent > 0 and not delivery.failed
 
-        if not email_sent:
+        if not result.email_sent:
             logger.error("Failed to send email. Check logs for details")
+
+    async def _run_async(self, result: RunnerResult):
+        saved_items = await self._scrape_and_store(result)
+        candidates = [
+            item for item in saved_items if item.digest and not item.duplicate_of
+        ]
+        editions = await self._write_editions(candidates, result)
+        await asyncio.to_thread(self._deliver, editions, result)
+
+    async def _send_async(self, since: datetime, result: RunnerResult):
+        editions = await self._write_stored(since, result)
+        await asyncio.to_thread(self._deliver, editions, result)
+
+    def _reset_metrics(self):
+        self._counts.clear()
+        self.timer.reset()
+        self.youtube_scraper.timer.reset()
+        self.youtube_scraper.cache_hits = self.youtube_scraper.cache_misses = 0
+        self.agent.call_stats.clear()
+        self.agent.digest_cache.hits = self.agent.digest_cache.misses = 0
+
+    def _collect_metrics(self, result: RunnerResult):
+        counts = self._counts
+        result.items_scraped = counts["scraped"]
+        result.items_digested = counts["digested"]
+        result.duplicates = counts["duplicates"]
+        result.stage_timings = self.timer.reset() + self.youtube_scraper.timer.reset()
+        result.llm_calls = list(self.agent.call_stats)
+        result.input_tokens = sum(call.input_tokens for call in result.llm_calls)
+        result.output_tokens = sum(call.output_tokens for call in result.llm_calls)
+
+        digest_cache = self.agent.digest_cache
+        transcripts = self.youtube_scraper
+        lookups = {
+            "digest": (digest_cache.hits, digest_cache.hits + digest_cache.misses),
+            "transcript": (
+                transcripts.cache_hits,
+                transcripts.cache_hits + transcripts.cache_misses,
+            ),
+            "feed": (counts["feeds_not_modified"], counts["feeds_fetched"]),
+        }
+        result.cache_hit_rates = {
+            cache: hits / total for cache, (hits, total) in lookups.items() if total
+        }
+
+    async def _closing(self, coroutine: Coroutine):
+        """Await a run, then close the agent's client, which is bound to its loop."""
+        try:
+            return await coroutine
+        finally:
+            await self.agent.aclose()
+
+    def _execute(
+        self,
+        name: str,
+        pipeline: Callable[[RunnerResult], Coroutine],
+        export: bool = True,
+    ) -> RunnerResult:
+        """Run one pipeline with fresh metrics, logging and exporting its result.
+
+        Only pipelines that send the email export metrics, so the exported
+        result always describes the last email.
+        """
+        result = RunnerResult(started_at=datetime.now(timezone.utc))
+        started = time.perf_counter()
+        self._reset_metrics()
+
+        asyncio.run(self._closing(pipeline(result)))
+
+        self._collect_metrics(result)
+        result.duration_seconds = time.perf_counter() - started
+        stage_seconds = ", ".join(
+            f"{stage} {seconds:.1f}s"
+            for stage, seconds in result.stage_seconds().items()
+        )
+        logger.info(
+            f"{name} finished in {result.duration_seconds:.1f}s: "
+            f"{result.items_scraped} scraped, {result.items_digested} digested, "
+            f"{result.input_tokens + result.output_tokens} LLM tokens ({stage_seconds})"
+        )
+        if export:
+            self.metrics_service.export(result)
+        return result
+
+    def run(self) -> RunnerResult:
+        """Scrape, digest and store new items, and email them."""
+        return self._execute("Run", self._run_async)
+
+    def scrape(self, time_window_hours: int | None = None) -> RunnerResult:
+        """Store new items and their transcripts without digesting them."""
+        return self._execute(
+            "Scrape",
+            lambda result: self._scrape_and_store(
+                result, time_window_hours, digest=False
+            ),
+            export=False,
+        )
+
+    def digest(self, since: datetime) -> RunnerResult:
+        """Digest the items stored since ``since`` that have no digest."""
+        return self._execute(
+            "Digest", lambda result: self._digest_stored(since, result), export=False
+        )
+
+    def backfill(self, days: int) -> RunnerResult:
+        """Scrape, digest and store the items of the last ``days`` without emailing.
+
+        Feeds are fetched in full, ignoring the entries already seen, and
+        items already stored are kept as they are.
+        """
+        return self._execute(
+            "Backfill",
+            lambda result: self._scrape_and_store(
+                result, days * 24, feed_cache=FeedCache()
+            ),
+            export=False,
+        )
+
+    def send(self, since: datetime) -> RunnerResult:
+        """Email the digested items stored since ``since``."""
+        return self._execute("Send", lambda result: self._send_async(since, result))
+
+    def preview(self, since: datetime, directory: str) -> List[str]:
+        """Write the email of the items stored since ``since`` to HTML files.
+
+        Nothing is sent. Returns the paths written, one per edition.
+        """
+        paths: List[str] = []
+
+        async def write(result: RunnerResult):
+            editions = await self._write_stored(since, result)
+            paths.extend(self.email_service.save_editions(editions, directory))
+
+        self._execute("Dry run", write, export=False)
+        return paths
@@ -4,5 +4,14 @@ from .youtube_scraper import YouTubeScraper
 from .anthropic_scraper import AnthropicAIScraper
 from .openai_scraper import OpenAIScraper
 from .modular_scraper import ModularScraper
+from .feed_cache import FeedCache
+from .feed_fetcher import FeedFetcher
 
-__all__ = ["YouTubeScraper", "AnthropicAIScraper", "OpenAIScraper", "ModularScraper"]
+__all__ = [
+    "YouTubeScraper",
+    "AnthropicAIScraper",
+    "OpenAIScraper",
+    "ModularScraper",
+    "FeedCache",
+    "FeedFetcher",
+]
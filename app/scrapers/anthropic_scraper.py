@@ -1,8 +1,8 @@
 from datetime import datetime, timedelta, timezone
-import feedparser
 import logging
 
 from ..models.news import NewsItem
+from .feed_fetcher import FeedFetcher
 
 logger = logging.getLogger(__name__)
 
@@ -16,17 +16,20 @@ class AnthropicAIScraper:
         "https://raw.githubusercontent.com/Olshansk/rss-feeds/main/feeds/feed_anthropic_research.xml",
     ]
 
-    def scrape_news(self, time_window_hours: int = 24) -> list[NewsItem]:
+    def __init__(self, fetcher: FeedFetcher | None = None):
+        self.fetcher = fetcher or FeedFetcher()
+
+    async def scrape_news(self, time_window_hours: int = 24) -> list[NewsItem]:
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_window_hours)
         articles = []
 
         for feed_url in self.RSS_FEED_URLS:
-            feed = feedparser.parse(feed_url)
+            entries = await self.fetcher.parse(feed_url)
 
-            if not feed.entries:
+            if not entries:
                 continue
 
-            for entry in feed.entries:
+            for entry in entries:
                 if hasattr(entry, "published_parsed") and entry.published_parsed:
                     published_at = datetime(
                         *entry.published_parsed[:6], tzinfo=timezone.utc
@@ -0,0 +1,95 @@
+from typing import Dict, List, Optional
+import logging
+
+from ..db import Repository
+from ..models.feed import FeedState
+
+logger = logging.getLogger(__name__)
+
+
+class FeedCache:
+    """Conditional GET state for RSS feeds, shared by all scrapers.
+
+    Keeps the ETag / Last-Modified validators and recently seen GUIDs of every
+    feed, and filters out entries that were already seen. State changes are
+    buffered and only persisted on ``commit``, so a run that fails before
+    saving its items will see the same entries again next time.
+    """
+
+    MAX_SEEN_GUIDS = 500
+
+    def __init__(self, repository: Optional[Repository] = None):
+        self.repository = repository
+        self._states: Optional[Dict[str, FeedState]] = None
+        self._pending: Dict[str, FeedState] = {}
+
+    def refresh(self, urls: List[str]):
+        """Reload the stored state of some feeds, which other processes may update.
+
+        Once refreshed, only the state of requested feeds is known, so this
+        avoids loading every feed when one process handles a few of them.
+        """
+        states = self.repository.get_feed_states(urls) if self.repository else {}
+        if self._states is None:
+            self._states = {}
+        for url in urls:
+            self._pending.pop(url, None)
+            self._states.pop(url, None)
+        self._states.update(states)
+
+    def get_state(self, url: str) -> FeedState:
+        if self._states is None:
+            self._states = self.repository.get_feed_states() if self.repository else {}
+        return self._pending.get(url) or self._states.get(url) or FeedState(url=url)
+
+    @staticmethod
+    def _entry_id(entry) -> Optional[str]:
+        return entry.get("id") or entry.get("link")
+
+    def update(
+        self,
+        url: str,
+        entries: List,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> List:
+        """Record a fresh fetch of a feed and return only its unseen entries."""
+        state = self.get_state(url)
+        seen = set(state.seen_guids)
+        new_entries = [entry for entry in entries if self._entry_id(entry) not in seen]
+        new_ids = [self._entry_id(entry) for entry in new_entries]
+
+        self._pending[url] = FeedState(
+            url=url,
+            etag=etag,
+            last_modified=last_modified,
+            seen_guids=([guid for guid in new_ids if guid] + state.seen_guids)[
+                : self.MAX_SEEN_GUIDS
+            ],
+        )
+        return new_entries
+
+    def discard(self, urls: List[str]):
+        """Forget the fetches of some feeds since the last commit.
+
+        Their entries count as unseen again, as their items were not stored.
+        """
+        for url in urls:
+            self._pending.pop(url, None)
+
+    def commit(self, urls: Optional[List[str]] = None) -> int:
+        """Persist the state of feeds fetched since the last commit.
+
+        Only the given feeds are committed when ``urls`` is set.
+        """
+        pending = [
+            self._pending.pop(url)
+            for url in list(self._pending if urls is None else urls)
+            if url in self._pending
+        ]
+        for state in pending:
+            self._states[state.url] = state
+
+        if self.repository is None:
+            return len(pending)
+        return self.repository.save_feed_states(pending)
@@ -0,0 +1,134 @@
+import asyncio
+import random
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit
+import feedparser
+import httpx
+import logging
+
+from ..models.config import FetchConfig
+from .feed_cache import FeedCache
+
+logger = logging.getLogger(__name__)
+
+
+class FeedFetcher:
+    """Async feed downloader sharing one pooled, keep-alive HTTP client.
+
+    Requests are limited per host, retried with exponential backoff on
+    transport errors, 429 and 5xx responses, and made conditional using the
+    validators stored in the ``FeedCache``. Downloaded bytes are handed to
+    feedparser, so no thread is needed per feed.
+    """
+
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        feed_cache: Optional[FeedCache] = None,
+        config: Optional[FetchConfig] = None,
+    ):
+        self.feed_cache = feed_cache or FeedCache()
+        self.config = config or FetchConfig()
+        self._client: Optional[httpx.AsyncClient] = None
+        self.feeds_fetched = 0
+        self.feeds_not_modified = 0
+        # Feeds whose last fetch failed, told apart from feeds with no news
+        self.failed_urls: Set[str] = set()
+        self._host_limits: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.config.max_connections_per_host)
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.config.timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_connections,
+                ),
+                headers={"User-Agent": self.config.user_agent},
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "FeedFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        delay = self.config.backoff_base_seconds * (2**attempt)
+        return delay + random.uniform(0, delay)
+
+    async def fetch(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Optional[httpx.Response]:
+        """GET a URL with per-host limiting and retries, None if it keeps failing."""
+        host_limit = self._host_limits[urlsplit(url).netloc]
+
+        for attempt in range(self.config.max_retries + 1):
+            response = None
+            try:
+                async with host_limit:
+                    response = await self.client.get(url, headers=headers)
+                if response.status_code not in self.RETRY_STATUS_CODES:
+                    return response
+                error = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                error = repr(e)
+
+            if attempt == self.config.max_retries:
+                break
+            delay = self._backoff(attempt, response)
+            logger.warning(f"Fetching {url} failed ({error}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        logger.error(f"Giving up on {url} after {self.config.max_retries + 1} attempts")
+        return None
+
+    async def parse(self, url: str) -> List:
+        """Fetch and parse a feed, returning only entries not seen before."""
+        state = self.feed_cache.get_state(url)
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+
+        response = await self.fetch(url, headers)
+        if response is None:
+            self.failed_urls.add(url)
+            return []
+        self.feeds_fetched += 1
+        if response.status_code >= 400:
+            self.failed_urls.add(url)
+            logger.error(f"Fetching {url} failed with HTTP {response.status_code}")
+            return []
+        self.failed_urls.discard(url)
+        if response.status_code == 304:
+            self.feeds_not_modified += 1
+            logger.info(f"Feed not modified since last run: {url}")
+            return []
+
+        feed = feedparser.parse(
+            response.content,
+            response_headers={"content-location": url, **response.headers},
+        )
+        return self.feed_cache.update(
+            url,
+            feed.entries,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
@@ -1,8 +1,8 @@
 from datetime import datetime, timedelta, timezone
-import feedparser
 import logging
 
 from ..models.news import NewsItem
+from .feed_fetcher import FeedFetcher
 
 logger = logging.getLogger(__name__)
 
@@ -12,16 +12,19 @@ class ModularScraper:
 
     RSS_FEED_URL = "https://www.modular.com/blog/rss.xml"
 
-    def scrape_news(self, time_window_hours: int = 24) -> list[NewsItem]:
-        feed = feedparser.parse(self.RSS_FEED_URL)
+    def __init__(self, fetcher: FeedFetcher | None = None):
+        self.fetcher = fetcher or FeedFetcher()
 
-        if not feed.entries:
+    async def scrape_news(self, time_window_hours: int = 24) -> list[NewsItem]:
+        entries = await self.fetcher.parse(self.RSS_FEED_URL)
+
+        if not entries:
             return []
 
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_window_hours)
         articles = []
 
-        for entry in feed.entries:
+        for entry in entries:
             published_at = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
 
             if published_at >= cutoff_time:
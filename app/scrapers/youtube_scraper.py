@@ -1,10 +1,21 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import List
-import feedparser
-from youtube_transcript_api import YouTubeTranscriptApi
+from typing import List, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from youtube_transcript_api import (
+    YouTubeTranscriptApi,
+    TranscriptsDisabled,
+    NoTranscriptFound,
+    VideoUnavailable,
+)
 import logging
 
-from ..models.news import NewsItem
+from ..db import Repository
+from ..models.config import TranscriptConfig
+from ..models.news import NewsItem, Transcript
+from ..services.metrics_service import StageTimer
+from .feed_fetcher import FeedFetcher
 
 logger = logging.getLogger(__name__)
 
@@ -14,28 +25,146 @@ class YouTubeScraper:
 
     RSS_FEED_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
 
-    def get_transcript(self, video_id: str) -> str:
-        ytt_api = YouTubeTranscriptApi()
+    # Errors meaning the video has no transcript, as opposed to a transient failure
+    MISSING_TRANSCRIPT_ERRORS = (
+        TranscriptsDisabled,
+        NoTranscriptFound,
+        VideoUnavailable,
+    )
+
+    def __init__(
+        self,
+        fetcher: FeedFetcher | None = None,
+        repository: Repository | None = None,
+        config: TranscriptConfig | None = None,
+    ):
+        self.fetcher = fetcher or FeedFetcher()
+        self.repository = repository
+        self.config = config or TranscriptConfig()
+        self._ytt_api: Optional[YouTubeTranscriptApi] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.timer = StageTimer()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def ytt_api(self) -> YouTubeTranscriptApi:
+        if self._ytt_api is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=self.config.max_concurrency)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._ytt_api = YouTubeTranscriptApi(http_client=session)
+        return self._ytt_api
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Shared by every add_transcripts call so the cap is global.
+
+        Created again in each event loop, as every run has its own.
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def fetch_transcript(self, video_id: str) -> Transcript | None:
+        """Fetch a transcript, None on transient failures that should not be cached."""
+        fetched_at = datetime.now(timezone.utc)
         try:
-            transcript_list = ytt_api.fetch(video_id)
-            return " ".join([snippet.text for snippet in transcript_list])
-        except Exception:
+            transcript_list = self.ytt_api.fetch(video_id)
+            text = " ".join([snippet.text for snippet in transcript_list])
+        except self.MISSING_TRANSCRIPT_ERRORS:
+            text = None
+        except Exception as e:
+            logger.warning(f"Failed to fetch transcript for video {video_id}: {e}")
             return None
+        return Transcript(video_id=video_id, text=text, fetched_at=fetched_at)
+
+    def get_transcript(self, video_id: str) -> str:
+        transcript = self.fetch_transcript(video_id)
+        return transcript.text if transcript else None
+
+    def _is_fresh(self, transcript: Transcript) -> bool:
+        if transcript.text is not None:
+            return True
+        fetched_at = transcript.fetched_at
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        expires_at = fetched_at + timedelta(hours=self.config.negative_ttl_hours)
+        return expires_at > datetime.now(timezone.utc)
+
+    async def add_transcripts(self, videos: List[NewsItem]) -> List[NewsItem]:
+        """Fill in video descriptions with transcripts, fetching only uncached ones."""
+        if not videos:
+            return videos
+
+        video_ids = [video.guid for video in videos]
+        cached = (
+            await asyncio.to_thread(self.repository.get_transcripts, video_ids)
+            if self.repository
+            else {}
+        )
+        cached = {
+            video_id: transcript
+            for video_id, transcript in cached.items()
+            if self._is_fresh(transcript)
+        }
+
+        async def fetch(video_id: str) -> Transcript | None:
+            async with self.semaphore:
+                with self.timer.time("transcript", video_id) as timing:
+                    transcript = await asyncio.to_thread(
+                        self.fetch_transcript, video_id
+                    )
+                    timing.success = transcript is not None
+                return transcript
+
+        missing = [
+            video_id for video_id in dict.fromkeys(video_ids) if video_id not in cached
+        ]
+        self.cache_hits += len(cached)
+        self.cache_misses += len(missing)
+        fetched = [
+            transcript
+            for transcript in await asyncio.gather(
+                *(fetch(video_id) for video_id in missing)
+            )
+            if transcript is not None
+        ]
+        if self.repository:
+            await asyncio.to_thread(self.repository.save_transcripts, fetched)
+
+        transcripts = {
+            **cached,
+            **{transcript.video_id: transcript for transcript in fetched},
+        }
+        for video in videos:
+            if video.guid in transcripts:
+                video.description = transcripts[video.guid].text
+
+        logger.info(
+            f"Transcripts ready for {len(videos)} videos "
+            f"({len(cached)} cached, {len(missing)} fetched)"
+        )
+        return videos
 
-    def scrape_youtube_channel(
+    async def scrape_youtube_channel(
         self, channel_id: str, time_window_hours: int = 24
     ) -> List[NewsItem]:
         feed_url = self.RSS_FEED_URL.format(channel_id=channel_id)
-        feed = feedparser.parse(feed_url)
+        entries = await self.fetcher.parse(feed_url)
 
-        if not feed.entries:
+        if not entries:
             logger.info("No YouTube videos available to scrape")
             return []
 
         cutoff_time = datetime.now(timezone.utc) - timedelta(hours=time_window_hours)
         videos = []
 
-        for entry in feed.entries:
+        for entry in entries:
             if "/shorts/" in entry.link:
                 continue
 
@@ -49,7 +178,6 @@ class YouTubeScraper:
                     url=entry.link,
                     published_at=published_at,
                     author=entry.author,
-                    description=self.get_transcript(entry.yt_videoid),
                 )
                 videos.append(video)
         logger.info("YouTube videos scraped successfully")
@@ -1,5 +1,12 @@
 """Services for the AI news aggregator."""
 
-from .email_service import EmailService
+from .email_service import EmailService, RenderedEmail, SmtpPool
+from .metrics_service import MetricsService, StageTimer
 
-__all__ = ["EmailService"]
+__all__ = [
+    "EmailService",
+    "RenderedEmail",
+    "SmtpPool",
+    "MetricsService",
+    "StageTimer",
+]
@@ -1,43 +1,27 @@
 import os
+import queue
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.utils import getaddresses
+from html import escape
+from string import Template
 import logging
 from datetime import datetime
-from dotenv import load_dotenv
+from typing import List, Optional
 
-from ..models.llm_response import EmailLLMResponse
+from ..models.config import DeliveryResult, EmailConfig
+from ..models.llm_response import EmailItem, EmailLLMResponse
+from ..models.news import NewsItem
+from ..models.subscriber import Edition, Subscriber
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
-
-class EmailService:
-    def __init__(self):
-        self.email_from = os.getenv("EMAIL_FROM")
-        self.email_to = os.getenv("EMAIL_TO")
-        self.email_password = os.getenv("EMAIL_PASSWORD")
-
-        if not all([self.email_from, self.email_to, self.email_password]):
-            logger.warning("Email credentials not fully configured in .env file")
-
-    def render_email_html(
-        self, email_content: EmailLLMResponse, user: str = "Andrea"
-    ) -> str:
-        items_html = ""
-        for item in email_content.digest_items:
-            items_html += f"""
-            <div style="background-color: #f8f9fa; border-left: 4px solid #4a90e2; padding: 20px; margin: 20px 0; border-radius: 4px;">
-                <h2 style="color: #2c3e50; margin: 0 0 10px 0; font-size: 20px;">{item.title}</h2>
-                <p style="color: #555; line-height: 1.6; margin: 10px 0;">{item.summary}</p>
-                <div style="margin-top: 15px;">
-                    <a href="{item.url}" style="display: inline-block; background-color: #4a90e2; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">Read More</a>
-                    <div style="color: #888; font-size: 14px; margin-top: 15px;">Source: {item.source}</div>
-                </div>
-            </div>
-            """
-
-        html = f"""<!DOCTYPE html>
+# Compiled once; every value substituted into them is HTML-escaped first
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
         <html lang="en">
         <head>
             <meta charset="UTF-8">
@@ -48,31 +32,49 @@ class EmailService:
             <div style="background-color: #4a90e2; color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0;">
                 <h1 style="margin: 0; font-size: 28px;">AI News Digest</h1>
             </div>
-            
+
             <div style="background-color: white; padding: 30px; border: 1px solid #e0e0e0; border-top: none;">
-                <p style="font-size: 16px; margin: 0 0 10px 0;">Hi {user},</p>
-                <p style="font-size: 18px; color: #4a90e2; font-weight: bold; margin: 0 0 20px 0;">Your AI News Digest for {datetime.now().strftime("%B %d, %Y")} is ready!</p>
-                <p style="color: #555; line-height: 1.8; margin-bottom: 30px;">{email_content.introduction}</p>
-                
-                {items_html}
+                <p style="font-size: 16px; margin: 0 0 10px 0;">Hi $recipient,</p>
+                <p style="font-size: 18px; color: #4a90e2; font-weight: bold; margin: 0 0 20px 0;">Your AI News Digest for $date is ready!</p>
+                <p style="color: #555; line-height: 1.8; margin-bottom: 30px;">$introduction</p>
+
+                $items
+                $overflow
             </div>
-            
+
             <div style="text-align: center; padding: 20px; color: #888; font-size: 12px;">
                 <p>AI News Aggregator | Automated Daily Digest</p>
             </div>
         </body>
-        </html>"""
-
-        return html
-
-    def send_email(self, email_content: EmailLLMResponse | None) -> bool:
-        if not all([self.email_from, self.email_to, self.email_password]):
-            logger.error("Cannot send email: missing credentials in .env file")
-            return False
-
-        if email_content is None:
-            subject = "AI News Digest - Content Generation Failed"
-            html_content = """
+        </html>""")
+ITEM_TEMPLATE = Template("""
+            <div style="background-color: #f8f9fa; border-left: 4px solid #4a90e2; padding: 20px; margin: 20px 0; border-radius: 4px;">
+                <h2 style="color: #2c3e50; margin: 0 0 10px 0; font-size: 20px;">$title</h2>
+                <p style="color: #555; line-height: 1.6; margin: 10px 0;">$summary</p>
+                <div style="margin-top: 15px;">
+                    <a href="$url" style="display: inline-block; background-color: #4a90e2; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">Read More</a>
+                    <div style="color: #888; font-size: 14px; margin-top: 15px;">Source: $source</div>
+                    $also_covered
+                </div>
+            </div>
+            """)
+ALSO_COVERED_TEMPLATE = Template(
+    '<div style="color: #888; font-size: 14px; margin-top: 5px;">Also covered by: $links</div>'
+)
+COVERAGE_LINK_TEMPLATE = Template('<a href="$url" style="color: #888;">$source</a>')
+SECTION_TEMPLATE = Template("""
+                <h3 style="color: #2c3e50; margin: 30px 0 5px 0; font-size: 18px;">$topic</h3>
+                <p style="color: #555; line-height: 1.6; margin: 0;">$introduction</p>
+                $items
+            """)
+OVERFLOW_TEMPLATE = Template("""
+                <h3 style="color: #2c3e50; margin: 30px 0 10px 0; font-size: 18px;">More news</h3>
+                <ul style="padding-left: 20px; margin: 0;">$links</ul>
+            """)
+OVERFLOW_LINK_TEMPLATE = Template(
+    '<li style="margin: 6px 0;"><a href="$url" style="color: #4a90e2; text-decoration: none;">$title</a> <span style="color: #888; font-size: 13px;">($source)</span></li>'
+)
+FAILURE_HTML = """
             <!DOCTYPE html>
             <html>
             <body style="font-family: Arial, sans-serif; padding: 20px;">
@@ -81,26 +83,344 @@ class EmailService:
             </body>
             </html>
             """
+
+# Outcomes of a single delivery attempt
+SENT, FAILED, RETRY = "sent", "failed", "retry"
+
+# Marks where each recipient's name goes in an otherwise shared rendering
+RECIPIENT_MARKER = "\x00recipient\x00"
+
+
+class RenderedEmail:
+    """An email rendered once and personalized per recipient by concatenation."""
+
+    def __init__(self, subject: str, html: str):
+        self.subject = subject
+        self._head, self._marker, self._tail = html.partition(RECIPIENT_MARKER)
+
+    def html(self, name: Optional[str] = None) -> str:
+        if not self._marker:
+            return self._head
+        return self._head + escape(name or "there") + self._tail
+
+
+class EmailService:
+    def __init__(self, config: EmailConfig | None = None):
+        self.config = config or EmailConfig()
+        self.email_from = os.getenv("EMAIL_FROM")
+        self.email_to = os.getenv("EMAIL_TO")
+        self.email_password = os.getenv("EMAIL_PASSWORD")
+        self.smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
+        self.smtp_port = int(os.getenv("SMTP_PORT", "465"))
+        self.smtp_ssl = os.getenv("SMTP_SSL", "true").lower() != "false"
+
+        if not all([self.email_from, self.email_password]):
+            logger.warning("Email credentials not fully configured in .env file")
+
+    def recipients(
+        self, subscribers: List[Subscriber] | None = None
+    ) -> List[Subscriber]:
+        """The given subscribers, or else the comma-separated EMAIL_TO addresses.
+
+        EMAIL_TO entries may include a name, as in ``Andrea <andrea@example.com>``.
+        """
+        if subscribers:
+            return subscribers
+        return [
+            Subscriber(email=email, name=name or None)
+            for name, email in getaddresses([self.email_to or ""])
+            if email
+        ]
+
+    @staticmethod
+    def _render_items(items: List[EmailItem]) -> str:
+        items_html = ""
+        for item in items:
+            also_covered_html = ""
+            if item.also_covered_by:
+                links = ", ".join(
+                    COVERAGE_LINK_TEMPLATE.substitute(
+                        url=escape(coverage.url), source=escape(coverage.source)
+                    )
+                    for coverage in item.also_covered_by
+                )
+                also_covered_html = ALSO_COVERED_TEMPLATE.substitute(links=links)
+            items_html += ITEM_TEMPLATE.substitute(
+                title=escape(item.title),
+                summary=escape(item.summary),
+                url=escape(item.url),
+                source=escape(item.source),
+                also_covered=also_covered_html,
+            )
+        return items_html
+
+    def render_digest(
+        self,
+        email_content: EmailLLMResponse | None,
+        overflow_items: List[NewsItem] | None = None,
+    ) -> RenderedEmail:
+        """Render the email shared by all recipients."""
+        if email_content is None:
+            return RenderedEmail(
+                "AI News Digest - Content Generation Failed", FAILURE_HTML
+            )
+
+        if email_content.sections:
+            items_html = "".join(
+                SECTION_TEMPLATE.substitute(
+                    topic=escape(section.topic),
+                    introduction=escape(section.introduction),
+                    items=self._render_items(section.digest_items),
+                )
+                for section in email_content.sections
+            )
         else:
-            subject = "Your AI News Digest"
-            html_content = self.render_email_html(email_content)
+            items_html = self._render_items(email_content.digest_items)
 
+        overflow_html = ""
+        if overflow_items:
+            overflow_html = OVERFLOW_TEMPLATE.substitute(
+                links="".join(
+                    OVERFLOW_LINK_TEMPLATE.substitute(
+                        url=escape(item.url),
+                        title=escape(item.title),
+                        source=escape(item.source),
+                    )
+                    for item in overflow_items
+                )
+            )
+
+        html = PAGE_TEMPLATE.substitute(
+            recipient=RECIPIENT_MARKER,
+            date=datetime.now().strftime("%B %d, %Y"),
+            introduction=escape(email_content.introduction),
+            items=items_html,
+            overflow=overflow_html,
+        )
+        return RenderedEmail("Your AI News Digest", html)
+
+    def render_email_html(
+        self,
+        email_content: EmailLLMResponse,
+        user: str | None = None,
+        overflow_items: List[NewsItem] | None = None,
+    ) -> str:
+        return self.render_digest(email_content, overflow_items).html(user)
+
+    def _build_message(self, email: RenderedEmail, subscriber: Subscriber):
+        message = MIMEMultipart("alternative")
+        message["Subject"] = email.subject
+        message["From"] = self.email_from
+        message["To"] = subscriber.email
+        message.attach(MIMEText(email.html(subscriber.name), "html"))
+        return message
+
+    def send_email(
+        self,
+        email_content: EmailLLMResponse | None,
+        overflow_items: List[NewsItem] | None = None,
+        subscribers: List[Subscriber] | None = None,
+    ) -> DeliveryResult:
+        """Send the digest to every subscriber, or to EMAIL_TO without any."""
+        return self.send_editions(
+            [
+                Edition(
+                    overflow_items=overflow_items or [],
+                    subscribers=self.recipients(subscribers),
+                    email_content=email_content,
+                )
+            ]
+        )
+
+    def save_editions(self, editions: List[Edition], directory: str) -> List[str]:
+        """Write each edition to an HTML file instead of sending it."""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for number, edition in enumerate(editions, 1):
+            email = self.render_digest(edition.email_content, edition.overflow_items)
+            name = edition.subscribers[0].name if edition.subscribers else None
+            path = os.path.join(directory, f"edition-{number}.html")
+            with open(path, "w") as file:
+                file.write(email.html(name))
+            paths.append(path)
+        logger.info(f"Wrote {len(paths)} editions of the email to {directory}")
+        return paths
+
+    def send_editions(self, editions: List[Edition]) -> DeliveryResult:
+        """Send every edition to its subscribers over one connection pool."""
+        recipients = sum(len(edition.subscribers) for edition in editions)
+        if not recipients:
+            logger.error("Cannot send email: no subscribers and no EMAIL_TO")
+            return DeliveryResult()
+        if not all([self.email_from, self.email_password]):
+            logger.error("Cannot send email: missing credentials in .env file")
+            return DeliveryResult(
+                failed=[
+                    subscriber.email
+                    for edition in editions
+                    for subscriber in edition.subscribers
+                ]
+            )
+
+        messages = []
+        for edition in editions:
+            email = self.render_digest(edition.email_content, edition.overflow_items)
+            messages.extend(
+                (
+                    subscriber.email,
+                    lambda email=email, subscriber=subscriber: self._build_message(
+                        email, subscriber
+                    ),
+                )
+                for subscriber in edition.subscribers
+            )
+        pool = SmtpPool(
+            self.smtp_host,
+            self.smtp_port,
+            self.smtp_ssl,
+            self.email_from,
+            self.email_password,
+            self.config,
+        )
+        result = pool.send(messages)
+        logger.info(
+            f"Email sent to {result.sent} of {recipients} recipients"
+            + (f" in {len(editions)} editions" if len(editions) > 1 else "")
+            + (f", {result.retries} retries" if result.retries else "")
+        )
+        if result.failed:
+            logger.error(f"Failed to send email to {len(result.failed)} recipients")
+        return result
+
+
+class SmtpPool:
+    """Sends messages concurrently over reused, logged-in SMTP connections.
+
+    Transient failures, like dropped connections and 4xx replies, are
+    retried. Permanent 5xx replies fail the message, and a rejected login
+    or 5xx greeting fails all of them.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        ssl: bool,
+        username: str,
+        password: str,
+        config: EmailConfig,
+    ):
+        self.host = host
+        self.port = port
+        self.ssl = ssl
+        self.username = username
+        self.password = password
+        self.config = config
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._session_refused = threading.Event()
+
+    def _acquire(self):
+        """An idle connection, or a new one. Returned with its message count."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            smtp_class = smtplib.SMTP_SSL if self.ssl else smtplib.SMTP
+            connection = smtp_class(
+                self.host, self.port, timeout=self.config.timeout_seconds
+            )
+            try:
+                connection.login(self.username, self.password)
+            except Exception:
+                self._close(connection)
+                raise
+            return connection, 0
+
+    def _release(self, connection, sent: int):
+        if sent >= self.config.messages_per_connection:
+            self._close(connection)
+        else:
+            self._idle.put((connection, sent))
+
+    @staticmethod
+    def _close(connection):
         try:
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = self.email_from
-            message["To"] = self.email_to
+            connection.quit()
+        except Exception:
+            connection.close()
 
-            html_part = MIMEText(html_content, "html")
-            message.attach(html_part)
+    def _send_one(self, entry) -> str:
+        """Attempt one message: SENT, FAILED for good, or RETRY later."""
+        recipient, build_message = entry
+        if self._session_refused.is_set():
+            return FAILED
+        try:
+            connection, sent = self._acquire()
+        except (smtplib.SMTPException, OSError) as e:
+            # Says nothing about this message: the server is refusing us, for
+            # good when the login or a 5xx greeting is rejected
+            if isinstance(e, smtplib.SMTPAuthenticationError) or (
+                isinstance(e, smtplib.SMTPConnectError) and e.smtp_code >= 500
+            ):
+                logger.error(f"SMTP server refused the session, not sending: {e}")
+                self._session_refused.set()
+                return FAILED
+            logger.warning(f"Could not connect to send to {recipient}: {e}")
+            return RETRY
+        try:
+            connection.send_message(build_message())
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+            code = getattr(e, "smtp_code", None) or min(
+                (reply[0] for reply in getattr(e, "recipients", {}).values()),
+                default=500,
+            )
+            # The server answered, so unless it is closing the session the
+            # connection is still good for other messages
+            if code != 421:
+                self._release(connection, sent)
+            else:
+                self._close(connection)
+            if code >= 500:
+                logger.warning(f"Email to {recipient} rejected: {e}")
+                return FAILED
+            logger.warning(f"Transient failure sending to {recipient}: {e}")
+            return RETRY
+        except (smtplib.SMTPException, OSError) as e:
+            self._close(connection)
+            logger.warning(f"Transient failure sending to {recipient}: {e}")
+            return RETRY
+        self._release(connection, sent + 1)
+        return SENT
 
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-                server.login(self.email_from, self.email_password)
-                server.send_message(message)
+    def send(self, messages) -> DeliveryResult:
+        """Send ``(recipient, build_message)`` pairs, building each message lazily.
 
-            logger.info(f"Email sent successfully to {self.email_to}")
-            return True
+        Messages that hit a transient failure are requeued and retried once
+        the rest are sent, after a backoff that doubles every round.
+        """
+        result = DeliveryResult()
+        pending = list(messages)
+        with ThreadPoolExecutor(max_workers=self.config.concurrency) as executor:
+            for attempt in range(self.config.max_attempts):
+                if attempt:
+                    delay = self.config.retry_backoff_seconds * 2 ** (attempt - 1)
+                    logger.info(f"Retrying {len(pending)} emails in {delay:.1f}s")
+                    time.sleep(delay)
+                    result.retries += len(pending)
+                requeued = []
+                for entry, outcome in zip(
+                    pending, executor.map(self._send_one, pending)
+                ):
+                    if outcome == SENT:
+                        result.sent += 1
+                    elif outcome == RETRY:
+                        requeued.append(entry)
+                    else:
+                        result.failed.append(entry[0])
+                pending = requeued
+                if not pending:
+                    break
+        result.failed.extend(recipient for recipient, _ in pending)
 
-        except Exception as e:
-            logger.exception(f"Failed to send email: {e}")
-            return False
+        while not self._idle.empty():
+            self._close(self._idle.get_nowait()[0])
+        return result
@@ -0,0 +1,207 @@
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+import logging
+
+from ..models.config import MetricsConfig, RunnerResult, StageTiming
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "ai_news"
+
+
+class StageTimer:
+    """Collects the timings of units of work in the pipeline."""
+
+    def __init__(self):
+        self.timings: List[StageTiming] = []
+
+    @contextmanager
+    def time(self, stage: str, name: Optional[str] = None) -> Iterator[StageTiming]:
+        """Time the enclosed block, marking it failed if it raises.
+
+        The yielded timing can be updated inside the block, e.g. with the
+        number of items handled.
+        """
+        timing = StageTiming(stage=stage, name=name or stage)
+        started = time.perf_counter()
+        try:
+            yield timing
+        except BaseException:
+            timing.success = False
+            raise
+        finally:
+            timing.seconds = time.perf_counter() - started
+            self.timings.append(timing)
+
+    def reset(self) -> List[StageTiming]:
+        """Return the collected timings and start over."""
+        timings, self.timings = self.timings, []
+        return timings
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render_prometheus(result: RunnerResult) -> str:
+    """Render a run result in the Prometheus text exposition format.
+
+    Timings are aggregated per stage rather than per feed or video, which
+    would create a series for every source.
+    """
+    metrics = {}
+
+    def add(metric: str, metric_type: str, help_text: str, value: float, **labels):
+        if metric not in metrics:
+            metrics[metric] = [
+                f"# HELP {METRIC_PREFIX}_{metric} {help_text}",
+                f"# TYPE {METRIC_PREFIX}_{metric} {metric_type}",
+            ]
+        label_text = ",".join(
+            f'{key}="{_escape(str(label))}"' for key, label in labels.items()
+        )
+        series = f"{METRIC_PREFIX}_{metric}" + (f"{{{label_text}}}" if labels else "")
+        metrics[metric].append(f"{series} {value}")
+
+    add(
+        "last_run_timestamp_seconds",
+        "gauge",
+        "When the last run started.",
+        result.started_at.timestamp() if result.started_at else 0,
+    )
+    add(
+        "run_duration_seconds",
+        "gauge",
+        "Wall-clock duration of the last run.",
+        result.duration_seconds,
+    )
+
+    stage_calls = Counter(timing.stage for timing in result.stage_timings)
+    stage_failures = Counter(
+        timing.stage for timing in result.stage_timings if not timing.success
+    )
+    for stage, seconds in result.stage_seconds().items():
+        add(
+            "stage_seconds",
+            "gauge",
+            "Time spent in each stage, summed over concurrent work.",
+            seconds,
+            stage=stage,
+        )
+    for stage, calls in stage_calls.items():
+        add("stage_calls", "gauge", "Units of work per stage.", calls, stage=stage)
+        add(
+            "stage_failures",
+            "gauge",
+            "Failed units of work per stage.",
+            stage_failures[stage],
+            stage=stage,
+        )
+
+    for kind, count in {
+        "scraped": result.items_scraped,
+        "digested": result.items_digested,
+        "duplicates": result.duplicates,
+        "inserted": result.save_result.inserted,
+        "updated": result.save_result.updated,
+        "skipped": result.save_result.skipped,
+    }.items():
+        add("items", "gauge", "Items handled in the last run.", count, kind=kind)
+
+    llm_seconds = Counter()
+    for call in result.llm_calls:
+        llm_seconds[call.name] += call.latency_seconds
+    for name, seconds in llm_seconds.items():
+        add(
+            "llm_seconds",
+            "gauge",
+            "Time spent in LLM calls, summed over concurrent calls.",
+            seconds,
+            name=name,
+        )
+    llm_calls = Counter((call.name, call.success) for call in result.llm_calls)
+    for (name, success), calls in llm_calls.items():
+        add(
+            "llm_calls",
+            "gauge",
+            "LLM calls in the last run.",
+            calls,
+            name=name,
+            success=str(success).lower(),
+        )
+    add(
+        "llm_tokens",
+        "gauge",
+        "LLM tokens used in the last run.",
+        result.input_tokens,
+        direction="input",
+    )
+    add(
+        "llm_tokens",
+        "gauge",
+        "LLM tokens used in the last run.",
+        result.output_tokens,
+        direction="output",
+    )
+
+    for cache, hit_rate in result.cache_hit_rates.items():
+        add(
+            "cache_hit_ratio",
+            "gauge",
+            "Cache hit rate in the last run.",
+            hit_rate,
+            cache=cache,
+        )
+    add(
+        "email_sent",
+        "gauge",
+        "Whether the last run sent its email to every recipient.",
+        int(result.email_sent),
+    )
+    add(
+        "email_editions",
+        "gauge",
+        "Distinct versions of the email in the last run.",
+        result.editions,
+    )
+    for status, count in {
+        "sent": result.emails_sent,
+        "failed": result.emails_failed,
+    }.items():
+        add("emails", "gauge", "Emails in the last run.", count, status=status)
+
+    return "\n".join(line for lines in metrics.values() for line in lines) + "\n"
+
+
+class MetricsService:
+    """Writes run results to the configured JSON and Prometheus files."""
+
+    def __init__(self, config: Optional[MetricsConfig] = None):
+        self.config = config or MetricsConfig()
+
+    @staticmethod
+    def _write(path: str, content: str):
+        # Written to a temporary file first so collectors never read a partial file
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(content)
+        tmp_path.replace(target)
+
+    def export(self, result: RunnerResult):
+        try:
+            if self.config.json_path:
+                self._write(
+                    self.config.json_path,
+                    result.model_dump_json(
+                        indent=2, exclude={"youtube_videos", "articles"}
+                    ),
+                )
+            if self.config.prometheus_path:
+                self._write(self.config.prometheus_path, render_prometheus(result))
+        except OSError as e:
+            logger.error(f"Failed to export run metrics: {e}")
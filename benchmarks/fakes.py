@@ -0,0 +1,388 @@
+"""Local stand-ins for the external services the pipeline talks to."""
+
+import base64
+import json
+import random
+import re
+import socketserver
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+WORDS = """
+    model agent inference training benchmark latency token context window
+    reasoning dataset open weights release api developer compiler kernel gpu
+    cluster evaluation alignment safety research paper scaling multimodal
+    vision speech retrieval embedding fine tuning distillation quantization
+    serving throughput memory cache attention transformer mixture experts
+    """.split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _text(rng: random.Random, words: int) -> str:
+    sentences, remaining = [], words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 20))
+        sentences.append(_sentence(rng, length))
+        remaining -= length
+    return " ".join(sentences)
+
+
+class _Server:
+    """A threaded HTTP server running in the background."""
+
+    handler_class = BaseHTTPRequestHandler
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        class Handler(self.handler_class):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def send_body(self, status: int, body: bytes, content_type: str):
+                owner = self.server.owner
+                with owner._lock:
+                    owner.requests += 1
+                time.sleep(owner.latency_seconds)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.owner = self
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        feeds = self.server.owner
+        url = urlsplit(self.path)
+        if url.path == "/youtube":
+            channel_id = parse_qs(url.query).get("channel_id", [""])[0]
+            body = feeds.youtube_feed(channel_id)
+            self.send_body(200, body.encode(), "application/atom+xml")
+        elif url.path.startswith("/rss/"):
+            body = feeds.rss_feed(url.path.removeprefix("/rss/"))
+            self.send_body(200, body.encode(), "application/rss+xml")
+        elif url.path.startswith("/transcripts/"):
+            text = feeds.transcript(url.path.removeprefix("/transcripts/"))
+            if text is None:
+                self.send_body(404, b"", "text/plain")
+            else:
+                self.send_body(200, text.encode(), "text/plain")
+        else:
+            self.send_body(404, b"", "text/plain")
+
+
+class FeedServer(_Server):
+    """Serves synthetic YouTube channel feeds, article RSS feeds and transcripts.
+
+    Content is derived from a seeded RNG, so every run of a given size sees
+    the same feeds. ``duplicate_ratio`` of the articles reuse the title of a
+    video, so the near-duplicate path is exercised too.
+    """
+
+    handler_class = _FeedHandler
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.05,
+        videos_per_channel: int = 2,
+        articles_per_feed: int = 5,
+        transcript_words: int = 1500,
+        missing_transcript_ratio: float = 0.1,
+        duplicate_ratio: float = 0.1,
+        seed: int = 0,
+    ):
+        super().__init__(latency_seconds)
+        self.videos_per_channel = videos_per_channel
+        self.articles_per_feed = articles_per_feed
+        self.transcript_words = transcript_words
+        self.missing_transcript_ratio = missing_transcript_ratio
+        self.duplicate_ratio = duplicate_ratio
+        self.seed = seed
+        self.now = datetime.now(timezone.utc)
+
+    def _rng(self, key: str) -> random.Random:
+        return random.Random(f"{self.seed}:{key}")
+
+    def _video_title(self, video_id: str) -> str:
+        return _sentence(self._rng(f"title:{video_id}"), 8).rstrip(".")
+
+    def youtube_feed(self, channel_id: str) -> str:
+        rng = self._rng(channel_id)
+        entries = []
+        for index in range(self.videos_per_channel):
+            video_id = f"{channel_id}-{index}"
+            published = self.now - timedelta(minutes=rng.randint(1, 12 * 60))
+            entries.append(f"""<entry>
+  <id>yt:video:{video_id}</id>
+  <yt:videoId>{video_id}</yt:videoId>
+  <yt:channelId>{channel_id}</yt:channelId>
+  <title>{escape(self._video_title(video_id))}</title>
+  <link rel="alternate" href="https://www.youtube.com/watch?v={video_id}"/>
+  <author><name>Channel {channel_id}</name></author>
+  <published>{published.isoformat()}</published>
+  <updated>{published.isoformat()}</updated>
+</entry>""")
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns="http://www.w3.org/2005/Atom">
+<title>Channel {channel_id}</title>
+{"".join(entries)}
+</feed>"""
+
+    def rss_feed(self, name: str) -> str:
+        rng = self._rng(name)
+        items = []
+        for index in range(self.articles_per_feed):
+            published = self.now - timedelta(minutes=rng.randint(1, 12 * 60))
+            if rng.random() < self.duplicate_ratio:
+                title = self._video_title(f"channel-{rng.randrange(10)}-0")
+            else:
+                title = _sentence(rng, 8).rstrip(".")
+            items.append(f"""<item>
+  <title>{escape(title)}</title>
+  <link>https://example.com/{name}/{index}</link>
+  <guid>https://example.com/{name}/{index}</guid>
+  <description>{escape(_text(rng, 120))}</description>
+  <category>Research</category>
+  <pubDate>{format_datetime(published)}</pubDate>
+</item>""")
+        return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+<title>{name}</title>
+{"".join(items)}
+</channel></rss>"""
+
+    def transcript(self, video_id: str) -> str | None:
+        rng = self._rng(f"transcript:{video_id}")
+        if rng.random() < self.missing_transcript_ratio:
+            return None
+        return _text(rng, self.transcript_words)
+
+
+class _GeminiHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        gemini = self.server.owner
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        request = json.loads(body or b"{}")
+        prompt = "".join(
+            part.get("text", "")
+            for content in request.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        text = gemini.respond(json.dumps(request.get("generationConfig", {})), prompt)
+        response = {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [{"text": text}]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }
+            ],
+            "usageMetadata": {
+                "promptTokenCount": len(prompt) // 4,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": (len(prompt) + len(text)) // 4,
+            },
+            "modelVersion": "fake-gemini",
+        }
+        self.send_body(200, json.dumps(response).encode(), "application/json")
+
+
+class GeminiServer(_Server):
+    """Answers ``generateContent`` calls with schema-valid fake responses.
+
+    Digest requests get one digest per item found in the prompt, email
+    requests get one email item per prompt item, and anything else (the
+    condense prompt) gets a plain text summary.
+    """
+
+    handler_class = _GeminiHandler
+
+    def __init__(self, latency_seconds: float = 0.5):
+        super().__init__(latency_seconds)
+        self.calls: Dict[str, int] = {"digest": 0, "email": 0, "text": 0}
+
+    @staticmethod
+    def _prompt_items(prompt: str) -> List[dict]:
+        decoder = json.JSONDecoder()
+        items = []
+        for match in re.finditer(r"^\{", prompt, re.MULTILINE):
+            try:
+                item, _ = decoder.raw_decode(prompt, match.start())
+            except ValueError:
+                continue
+            if isinstance(item, dict):
+                items.append(item)
+        return items
+
+    def respond(self, generation_config: str, prompt: str) -> str:
+        items = self._prompt_items(prompt)
+        if '"digests"' in generation_config:
+            self.calls["digest"] += 1
+            return json.dumps(
+                {
+                    "digests": [
+                        {
+                            "guid": item["guid"],
+                            "digest": f"Summary of {item.get('title', '')}",
+                        }
+                        for item in items
+                        if "guid" in item
+                    ]
+                }
+            )
+        if '"digest_items"' in generation_config:
+            self.calls["email"] += 1
+            return json.dumps(
+                {
+                    "introduction": "Here is your benchmark digest.",
+                    "digest_items": [
+                        {
+                            "title": item.get("title", ""),
+                            "summary": item.get("digest") or "",
+                            "url": item["url"],
+                            "source": item.get("source", ""),
+                        }
+                        for item in items
+                        if "url" in item
+                    ],
+                }
+            )
+        self.calls["text"] += 1
+        return prompt[:2000]
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        sink = self.server.owner
+        with sink.lock:
+            sink.connections += 1
+            busy = sink.connections <= sink.busy_connections
+        if busy:
+            self.reply("421 localhost Too many connections, try again later")
+            return
+        if sink.refuse_connections:
+            self.reply("554 localhost No SMTP service here")
+            return
+        self.reply("220 localhost ESMTP sink")
+        while line := self.rfile.readline():
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250-localhost")
+                self.reply("250 AUTH PLAIN LOGIN")
+            elif verb == "AUTH" and sink.reject_login:
+                self.reply("535 Authentication credentials invalid")
+            elif verb == "AUTH":
+                if command.upper().startswith("AUTH LOGIN"):
+                    self.reply(f"334 {base64.b64encode(b'Username:').decode()}")
+                    self.rfile.readline()
+                    self.reply(f"334 {base64.b64encode(b'Password:').decode()}")
+                    self.rfile.readline()
+                self.reply("235 Authentication successful")
+            elif verb == "MAIL" and sink.fail_next():
+                self.reply("451 Temporary local problem, try again later")
+            elif verb == "RCPT" and any(
+                recipient in command for recipient in sink.rejected_recipients
+            ):
+                self.reply("550 No such user here")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                message = []
+                while (data := self.rfile.readline()) not in (b".\r\n", b""):
+                    message.append(data)
+                sink.messages.append(b"".join(message))
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class SmtpSink:
+    """A minimal SMTP server that accepts any login and keeps sent messages.
+
+    A share of messages can be refused with a transient 451 reply, to
+    exercise retries. The first ``busy_connections`` are turned away with a
+    421 greeting, ``refuse_connections`` turns all away with a 554,
+    ``rejected_recipients`` get a permanent 550 and ``reject_login``
+    refuses every login.
+    """
+
+    def __init__(
+        self,
+        transient_failure_ratio: float = 0.0,
+        seed: int = 0,
+        busy_connections: int = 0,
+        refuse_connections: bool = False,
+        rejected_recipients: Iterable[str] = (),
+        reject_login: bool = False,
+    ):
+        self.messages: List[bytes] = []
+        self.connections = 0
+        self.transient_failures = 0
+        self.transient_failure_ratio = transient_failure_ratio
+        self.busy_connections = busy_connections
+        self.refuse_connections = refuse_connections
+        self.rejected_recipients = set(rejected_recipients)
+        self.reject_login = reject_login
+        self.lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SmtpHandler)
+        self.server.daemon_threads = True
+        self.server.owner = self
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def fail_next(self) -> bool:
+        with self.lock:
+            if self._rng.random() >= self.transient_failure_ratio:
+                return False
+            self.transient_failures += 1
+            return True
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,91 @@
+"""Startup regression check for the quick CLI commands.
+
+Runs each command in a fresh interpreter against a throwaway SQLite database
+and fails if it loaded a heavy library it does not use, or took too long::
+
+    python -m benchmarks.import_time
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+# Run in the child, which reports its modules once the command is done
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from app.cli import main
+try:
+    main(sys.argv[2:])
+except SystemExit:
+    pass
+with open(sys.argv[1], "w") as file:
+    json.dump({"seconds": time.perf_counter() - started, "modules": list(sys.modules)}, file)
+"""
+
+# The LLM, scraping and clustering libraries only the pipeline commands need
+HEAVY_MODULES = [
+    "google.genai",
+    "langfuse",
+    "youtube_transcript_api",
+    "feedparser",
+    "httpx",
+    "numpy",
+    "scipy",
+]
+
+COMMANDS: Dict[str, List[str]] = {
+    "--help": HEAVY_MODULES + ["sqlalchemy", "pydantic"],
+    "search agents": HEAVY_MODULES,
+    "subscribers": HEAVY_MODULES,
+    "maintenance": HEAVY_MODULES,
+}
+
+
+def probe(command: str, database_url: str) -> Dict:
+    """Run one command and return its duration and loaded modules."""
+    with tempfile.NamedTemporaryFile(suffix=".json") as report:
+        subprocess.run(
+            [sys.executable, "-c", PROBE, report.name, *command.split()],
+            check=True,
+            capture_output=True,
+            cwd=Path(__file__).resolve().parent.parent,
+            env={**os.environ, "DATABASE_URL": database_url},
+        )
+        return json.loads(Path(report.name).read_text())
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=2.0,
+        help="Slowest acceptable command, from importing the CLI to exiting",
+    )
+    args = parser.parse_args(argv)
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{Path(tmp) / 'import_time.db'}"
+        for command, forbidden in COMMANDS.items():
+            result = probe(command, database_url)
+            loaded = set(result["modules"])
+            unexpected = [module for module in forbidden if module in loaded]
+            too_slow = result["seconds"] > args.max_seconds
+            failures += bool(unexpected) or too_slow
+            print(
+                f"{command:<20}{result['seconds']:>7.2f}s  "
+                + (f"loaded {', '.join(unexpected)}" if unexpected else "ok")
+                + (f", over {args.max_seconds}s" if too_slow else "")
+            )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,378 @@
+"""End-to-end pipeline benchmark against local stand-ins.
+
+Runs ``Runner.run`` with synthetic feeds, transcripts, a fake Gemini endpoint
+and an SMTP sink, so no request leaves the machine except to the benchmark
+database, which is dropped and recreated for every run::
+
+    python -m benchmarks.run_pipeline --database-url postgresql://.../bench
+
+The database must be a local Postgres used only for benchmarking.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .fakes import WORDS, FeedServer, GeminiServer, SmtpSink
+
+logger = logging.getLogger(__name__)
+
+PROMPTS = {
+    "digest-prompt": (
+        "Write a short digest of each item below and return it with its guid.\n"
+        "{{contents}}"
+    ),
+    "email-prompt": (
+        "Write an introduction and an email entry for each item below.\n{{contents}}"
+    ),
+    "condense-prompt": (
+        "Condense the text below to at most {{max_tokens}} tokens.\n{{contents}}"
+    ),
+}
+
+
+class StageTimer:
+    """Wraps methods to record how long each pipeline stage spends in them.
+
+    ``busy`` is the summed duration of all calls, which exceeds ``span`` when
+    calls overlap, and ``span`` runs from the first call to the last return.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _record(self, stage: str, started: float, items: int):
+        ended = time.perf_counter()
+        with self._lock:
+            stats = self.stages.setdefault(
+                stage,
+                {"calls": 0, "items": 0, "busy": 0.0, "start": started, "end": ended},
+            )
+            stats["calls"] += 1
+            stats["items"] += items
+            stats["busy"] += ended - started
+            stats["start"] = min(stats["start"], started)
+            stats["end"] = max(stats["end"], ended)
+
+    def wrap(self, obj, name: str, stage: str):
+        method = getattr(obj, name)
+
+        def count(args) -> int:
+            return len(args[0]) if args and isinstance(args[0], list) else 0
+
+        if asyncio.iscoroutinefunction(method):
+
+            @functools.wraps(method)
+            async def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    self._record(stage, started, count(args))
+
+        else:
+
+            @functools.wraps(method)
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    self._record(stage, started, count(args))
+
+        setattr(obj, name, timed)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {
+            stage: {
+                "calls": int(stats["calls"]),
+                "items": int(stats["items"]),
+                "busy_seconds": round(stats["busy"], 3),
+                "span_seconds": round(stats["end"] - stats["start"], 3),
+            }
+            for stage, stats in self.stages.items()
+        }
+
+
+def configure_environment(gemini: GeminiServer, smtp: SmtpSink):
+    """Point the agent, email service and Langfuse at the local stand-ins."""
+    os.environ.update(
+        {
+            "GEMINI_API_KEY": "benchmark",
+            "GEMINI_BASE_URL": gemini.base_url,
+            "SMTP_HOST": "127.0.0.1",
+            "SMTP_PORT": str(smtp.port),
+            "SMTP_SSL": "false",
+            "EMAIL_FROM": "benchmark@localhost",
+            "EMAIL_TO": "benchmark@localhost",
+            "EMAIL_PASSWORD": "benchmark",
+            "LANGFUSE_PUBLIC_KEY": "",
+            "LANGFUSE_SECRET_KEY": "",
+            "LANGFUSE_TRACING_ENABLED": "false",
+        }
+    )
+
+
+def seed_prompts(cache_dir: Path):
+    """Write the prompts to the on-disk prompt cache so Langfuse is never hit."""
+    from app.models.prompt import CachedPrompt
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for name, template in PROMPTS.items():
+        prompt = CachedPrompt(
+            name=name,
+            version=1,
+            template=template,
+            fetched_at=datetime.now(timezone.utc),
+        )
+        (cache_dir / f"{name}.json").write_text(prompt.model_dump_json())
+
+
+def patch_sources(feeds: FeedServer):
+    """Redirect the scrapers' feed URLs and transcript fetching to the feed server."""
+    from app.models.news import Transcript
+    from app.scrapers import (
+        AnthropicAIScraper,
+        ModularScraper,
+        OpenAIScraper,
+        YouTubeScraper,
+    )
+
+    YouTubeScraper.RSS_FEED_URL = f"{feeds.base_url}/youtube?channel_id={{channel_id}}"
+    OpenAIScraper.RSS_FEED_URL = f"{feeds.base_url}/rss/openai"
+    ModularScraper.RSS_FEED_URL = f"{feeds.base_url}/rss/modular"
+    AnthropicAIScraper.RSS_FEED_URLS = [
+        f"{feeds.base_url}/rss/anthropic-{name}"
+        for name in ("news", "engineering", "research")
+    ]
+
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_maxsize=32))
+
+    def fetch_transcript(self, video_id: str) -> Transcript | None:
+        fetched_at = datetime.now(timezone.utc)
+        try:
+            response = session.get(f"{feeds.base_url}/transcripts/{video_id}")
+        except requests.RequestException as e:
+            logger.warning(f"Failed to fetch transcript for video {video_id}: {e}")
+            return None
+        text = response.text if response.status_code == 200 else None
+        return Transcript(video_id=video_id, text=text, fetched_at=fetched_at)
+
+    YouTubeScraper.fetch_transcript = fetch_transcript
+
+
+def interest_profile(index: int) -> Dict[str, List[str]]:
+    """Synthetic subscriber interests; profile 0 takes everything."""
+    if index == 0:
+        return {"sources": [], "keywords": []}
+    sources = ["YouTube", "OpenAI", "Anthropic", "Modular"]
+    return {
+        "sources": [sources[index % len(sources)]] if index % 2 else [],
+        "keywords": [WORDS[index % len(WORDS)], WORDS[(index * 7) % len(WORDS)]],
+    }
+
+
+def run_once(
+    channels: int,
+    database_url: str,
+    prompt_dir: Path,
+    feeds: FeedServer,
+    gemini: GeminiServer,
+    smtp: SmtpSink,
+    unthrottled: bool = False,
+    subscribers: int = 1,
+    interest_profiles: int = 1,
+) -> Dict:
+    from app.db import Base, Repository
+    from app.models import LLMConfig, PromptCacheConfig, RunnerConfig, Subscriber
+    from app.runner import Runner
+
+    repository = Repository(database_url)
+    Base.metadata.drop_all(repository.engine)
+    repository.create_tables()
+    repository.save_subscribers(
+        [
+            Subscriber(
+                email=f"subscriber-{index}@localhost",
+                name=f"Reader {index}",
+                **interest_profile(index % interest_profiles),
+            )
+            for index in range(subscribers)
+        ]
+    )
+
+    config = RunnerConfig(
+        youtube_channels=[f"channel-{index}" for index in range(channels)],
+        prompts=PromptCacheConfig(cache_dir=str(prompt_dir), ttl_seconds=86_400),
+    )
+    if unthrottled:
+        config.llm = LLMConfig(requests_per_minute=10**9, tokens_per_minute=10**12)
+    runner = Runner(config, repository)
+
+    timer = StageTimer()
+    timer.wrap(runner, "_scrape_stage", "scrape")
+    timer.wrap(runner.youtube_scraper, "add_transcripts", "transcripts")
+    timer.wrap(runner.agent, "add_digest", "digest")
+    timer.wrap(runner.repository, "save_news_items", "persist")
+    timer.wrap(runner.clusterer, "assign", "topics")
+    timer.wrap(runner.agent, "create_email_content", "email_content")
+    timer.wrap(runner.email_service, "send_editions", "send_email")
+
+    feed_requests = feeds.requests
+    llm_calls = dict(gemini.calls)
+    emails = len(smtp.messages)
+    smtp_connections = smtp.connections
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    run_result = runner.run()
+    elapsed = time.perf_counter() - started
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    repository.engine.dispose()
+
+    stages = timer.report()
+    items = stages.get("persist", {}).get("items", 0)
+    return {
+        "channels": channels,
+        "total_seconds": round(elapsed, 3),
+        "items_saved": items,
+        "items_per_second": round(items / elapsed, 2) if elapsed else 0.0,
+        "peak_traced_memory_mb": round(peak_memory / 2**20, 2),
+        "max_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10, 2
+        ),
+        "feed_requests": feeds.requests - feed_requests,
+        "llm_calls": {
+            kind: count - llm_calls[kind] for kind, count in gemini.calls.items()
+        },
+        "emails_sent": len(smtp.messages) - emails,
+        "editions": run_result.editions,
+        "smtp_connections": smtp.connections - smtp_connections,
+        "llm_tokens": run_result.input_tokens + run_result.output_tokens,
+        "cache_hit_rates": run_result.cache_hit_rates,
+        "stages": stages,
+    }
+
+
+def print_result(result: Dict):
+    print(
+        f"\n{result['channels']} channels: {result['total_seconds']}s, "
+        f"{result['items_saved']} items ({result['items_per_second']}/s), "
+        f"peak {result['peak_traced_memory_mb']} MB traced / "
+        f"{result['max_rss_mb']} MB RSS, {result['feed_requests']} HTTP requests, "
+        f"LLM calls {result['llm_calls']}, {result['emails_sent']} emails "
+        f"in {result['editions']} editions over "
+        f"{result['smtp_connections']} SMTP connections"
+    )
+    print(f"  {'stage':<15}{'calls':>7}{'items':>8}{'busy s':>10}{'span s':>10}")
+    for stage, stats in result["stages"].items():
+        print(
+            f"  {stage:<15}{stats['calls']:>7}{stats['items']:>8}"
+            f"{stats['busy_seconds']:>10.3f}{stats['span_seconds']:>10.3f}"
+        )
+
+
+def main(argv: List[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--database-url",
+        default=os.getenv("BENCHMARK_DATABASE_URL"),
+        help="Local Postgres database to drop and recreate for every run "
+        "(default: $BENCHMARK_DATABASE_URL)",
+    )
+    parser.add_argument(
+        "--channels", type=int, nargs="+", default=[10, 100, 1000], metavar="N"
+    )
+    parser.add_argument("--videos-per-channel", type=int, default=2)
+    parser.add_argument("--transcript-words", type=int, default=1500)
+    parser.add_argument(
+        "--feed-latency", type=float, default=0.05, help="Seconds per feed request"
+    )
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.5, help="Seconds per LLM call"
+    )
+    parser.add_argument(
+        "--unthrottled",
+        action="store_true",
+        help="Lift the LLM rate limits, which otherwise dominate large runs",
+    )
+    parser.add_argument(
+        "--subscribers", type=int, default=1, help="Recipients of the digest email"
+    )
+    parser.add_argument(
+        "--interest-profiles",
+        type=int,
+        default=1,
+        help="Distinct source and keyword interests spread over the subscribers",
+    )
+    parser.add_argument(
+        "--smtp-failure-ratio",
+        type=float,
+        default=0.0,
+        help="Share of emails the SMTP sink refuses with a transient error",
+    )
+    parser.add_argument("--json", type=Path, help="Also write the results here")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline logs")
+    args = parser.parse_args(argv)
+
+    if not args.database_url:
+        parser.error("--database-url or BENCHMARK_DATABASE_URL is required")
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    feeds = FeedServer(
+        latency_seconds=args.feed_latency,
+        videos_per_channel=args.videos_per_channel,
+        transcript_words=args.transcript_words,
+    )
+    gemini = GeminiServer(latency_seconds=args.llm_latency)
+    results = []
+    smtp_sink = SmtpSink(transient_failure_ratio=args.smtp_failure_ratio)
+    with feeds, gemini, smtp_sink as smtp, tempfile.TemporaryDirectory() as tmp:
+        configure_environment(gemini, smtp)
+        prompt_dir = Path(tmp) / "prompts"
+        seed_prompts(prompt_dir)
+        patch_sources(feeds)
+
+        for channels in args.channels:
+            result = run_once(
+                channels,
+                args.database_url,
+                prompt_dir,
+                feeds,
+                gemini,
+                smtp,
+                args.unthrottled,
+                args.subscribers,
+                args.interest_profiles,
+            )
+            print_result(result)
+            results.append(result)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
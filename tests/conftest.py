@@ -0,0 +1,36 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+from app.db.repository import Repository
+
+# The task queue relies on Postgres row locks, so its tests need a database
+# of their own, e.g. postgresql://postgres@localhost:5432/ai_news_test
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def postgres_repository():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    repository = Repository(TEST_DATABASE_URL)
+    repository.create_tables()
+    with repository.engine.begin() as connection:
+        connection.execute(text("TRUNCATE tasks, news_items, term_stats, transcripts"))
+    yield repository
+    repository.engine.dispose()
+
+
+@pytest.fixture
+def sqlite_repository(tmp_path):
+    repository = Repository(f"sqlite:///{tmp_path / 'news.db'}")
+    repository.create_tables()
+    yield repository
+    repository.engine.dispose()
+
+
+@pytest.fixture(params=["sqlite", "postgres"])
+def repository(request):
+    """Runs a test against both SQLite and, when configured, Postgres."""
+    return request.getfixturevalue(f"{request.param}_repository")
@@ -0,0 +1,91 @@
+import asyncio
+
+from app.agent import Agent
+from app.agent.condenser import (
+    estimate_tokens,
+    extractive_condense,
+    split_chunks,
+    split_segments,
+)
+from app.models import DigestConfig
+
+TOPIC = "The new model doubles context length and cuts inference cost."
+
+
+def transcript(sentences: int = 200) -> str:
+    return " ".join(
+        TOPIC if index % 4 == 0 else f"Aside {index} on lunch{index} and trip{index}."
+        for index in range(sentences)
+    )
+
+
+def test_short_text_is_kept_as_is():
+    assert extractive_condense(TOPIC, max_tokens=100) == TOPIC
+
+
+def test_condensed_text_fits_the_budget_in_original_order():
+    text = " ".join(
+        f"Point {index} about model context length." for index in range(300)
+    )
+
+    condensed = extractive_condense(text, max_tokens=200)
+
+    assert estimate_tokens(condensed) <= 200
+    kept = [int(segment.split()[1]) for segment in condensed.split(" ... ")]
+    assert kept == sorted(kept)
+
+
+def test_recurring_topic_outranks_one_off_chatter():
+    condensed = extractive_condense(transcript(), max_tokens=150)
+
+    assert condensed.count(TOPIC) > condensed.count("Aside")
+
+
+def test_unpunctuated_transcripts_are_windowed():
+    words = " ".join(f"word{index}" for index in range(100))
+
+    segments = split_segments(words)
+
+    assert [len(segment.split()) for segment in segments] == [40, 40, 20]
+
+
+def test_chunks_cover_the_text_within_their_budget():
+    text = transcript(100)
+
+    chunks = split_chunks(text, chunk_tokens=300)
+
+    assert len(chunks) > 1
+    assert " ".join(chunks).split() == text.split()
+    assert all(estimate_tokens(chunk) <= 300 + 20 for chunk in chunks)
+
+
+def condensing_agent(summary: str | None) -> Agent:
+    agent = Agent(
+        digest_config=DigestConfig(
+            max_item_tokens=200,
+            llm_condense_threshold_tokens=500,
+            condense_chunk_tokens=400,
+        )
+    )
+
+    async def condense_chunk(chunk: str, max_tokens: int) -> str | None:
+        return summary
+
+    agent._condense_chunk = condense_chunk
+    return agent
+
+
+def test_long_transcripts_are_summarized_chunk_by_chunk():
+    condensed = asyncio.run(
+        condensing_agent("Context doubles.")._condense(transcript(400))
+    )
+
+    assert condensed.startswith("Context doubles. Context doubles.")
+    assert estimate_tokens(condensed) <= 200
+
+
+def test_failed_chunk_summaries_fall_back_to_extraction():
+    condensed = asyncio.run(condensing_agent(None)._condense(transcript(400)))
+
+    assert TOPIC in condensed
+    assert estimate_tokens(condensed) <= 200
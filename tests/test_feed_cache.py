@@ -0,0 +1,52 @@
+from app.scrapers import FeedCache
+
+URL = "https://example.com/feed.xml"
+
+
+def entries(*ids: str):
+    return [{"id": entry_id} for entry_id in ids]
+
+
+def test_update_returns_only_unseen_entries():
+    cache = FeedCache()
+    assert cache.update(URL, entries("a", "b")) == entries("a", "b")
+
+    assert cache.update(URL, entries("a", "b", "c"), etag='"v2"') == entries("c")
+    assert cache.get_state(URL).etag == '"v2"'
+
+
+def test_state_is_saved_only_on_commit(sqlite_repository):
+    cache = FeedCache(sqlite_repository)
+    cache.update(URL, entries("a"))
+    cache.update("https://example.com/other.xml", entries("x"))
+
+    assert cache.commit([URL]) == 1
+
+    reloaded = FeedCache(sqlite_repository)
+    assert reloaded.update(URL, entries("a", "b")) == entries("b")
+    assert reloaded.update("https://example.com/other.xml", entries("x")) == (
+        entries("x")
+    )
+
+
+def test_discarded_fetches_see_their_entries_again(sqlite_repository):
+    cache = FeedCache(sqlite_repository)
+    cache.update(URL, entries("a"))
+    cache.commit()
+    cache.update(URL, entries("a", "b"), etag='"v2"')
+
+    cache.discard([URL])
+
+    assert cache.get_state(URL).etag is None
+    assert cache.update(URL, entries("a", "b")) == entries("b")
+
+
+def test_seen_guids_are_capped_newest_first():
+    cache = FeedCache()
+    cache.update(URL, entries(*(f"old-{i}" for i in range(FeedCache.MAX_SEEN_GUIDS))))
+
+    cache.update(URL, entries("new"))
+
+    seen = cache.get_state(URL).seen_guids
+    assert len(seen) == FeedCache.MAX_SEEN_GUIDS
+    assert seen[0] == "new" and "old-499" not in seen
@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from app.agent import Agent, circuit_breaker, rate_limiter
+from app.agent.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.agent.rate_limiter import RateLimiter
+
+
+class Clock:
+    """Stands in for time.monotonic, and for asyncio.sleep by moving it on."""
+
+    def __init__(self):
+        self.now = 1_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def acquire_all(limiter: RateLimiter, tokens: list[int]):
+    async def run():
+        for count in tokens:
+            await limiter.acquire(count)
+
+    asyncio.run(run())
+
+
+def test_token_bucket_waits_for_the_tokens_to_refill(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1_000)
+
+    acquire_all(limiter, [400, 400])
+    assert clock.now == 1_000.0
+
+    acquire_all(limiter, [400])
+    # 200 tokens were left, and 1,000 come back per minute
+    assert clock.now == pytest.approx(1_012.0)
+
+
+def test_request_bucket_limits_calls_per_minute(clock):
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=1_000_000)
+
+    acquire_all(limiter, [1, 1, 1])
+
+    assert clock.now == pytest.approx(1_030.0)
+
+
+def test_buckets_refill_up_to_one_minute_of_capacity(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1_000)
+    acquire_all(limiter, [1_000])
+
+    clock.now += 3_600
+    acquire_all(limiter, [1_000])
+    acquire_all(limiter, [1_000])
+
+    assert clock.now == pytest.approx(1_000.0 + 3_600 + 60)
+
+
+def test_recorded_usage_corrects_the_estimate(clock):
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=1_000)
+    acquire_all(limiter, [100])
+    limiter.record(estimated_tokens=100, actual_tokens=600)
+
+    acquire_all(limiter, [500])
+
+    # Only 400 tokens were left, not 900
+    assert clock.now == pytest.approx(1_006.0)
+
+
+def failing_breaker(clock: Clock) -> CircuitBreaker:
+    breaker = CircuitBreaker("gemini", failure_threshold=3, reset_seconds=30)
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("gemini", failure_threshold=3, reset_seconds=30)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert not breaker.is_open
+
+    breaker = failing_breaker(clock)
+
+    assert breaker.is_open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_lets_one_trial_through_once_half_open(clock):
+    breaker = failing_breaker(clock)
+    clock.now += 30
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert not breaker.is_open
+    breaker.before_call()
+
+
+def test_failed_trial_opens_the_breaker_again(clock):
+    breaker = failing_breaker(clock)
+    clock.now += 30
+    breaker.before_call()
+
+    breaker.record_failure()
+
+    assert breaker.is_open
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 1
+    breaker.before_call()
+
+
+def test_loop_bound_state_is_created_per_run():
+    agent = Agent()
+
+    async def state():
+        return agent.semaphore, agent.rate_limiter.lock, agent.semaphore
+
+    first, second = asyncio.run(state()), asyncio.run(state())
+
+    assert first[0] is first[2]
+    assert first[0] is not second[0] and first[1] is not second[1]
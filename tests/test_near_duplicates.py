@@ -0,0 +1,95 @@
+import random
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models.news import NewsItem
+from app.processing import MinHasher, NearDuplicateIndex
+
+VOCABULARY = [f"word{index}" for index in range(5_000)]
+
+
+def story(rng: random.Random, words: int = 100) -> list[str]:
+    return rng.choices(VOCABULARY, k=words)
+
+
+def rewrite(rng: random.Random, words: list[str], changed: int) -> list[str]:
+    """The same story with ``changed`` words replaced, as another outlet."""
+    words = list(words)
+    for position in rng.sample(range(len(words)), changed):
+        words[position] = rng.choice(VOCABULARY)
+    return words
+
+
+def news_item(guid: str, words: list[str], source: str = "OpenAI") -> NewsItem:
+    return NewsItem(
+        guid=guid,
+        source=source,
+        title=" ".join(words[:8]),
+        description=" ".join(words[8:]),
+        url=f"https://example.com/{guid}",
+        published_at=datetime(2025, 6, 2, tzinfo=timezone.utc),
+        author=source,
+    )
+
+
+def jaccard(first: set, second: set) -> float:
+    return len(first & second) / len(first | second)
+
+
+@pytest.mark.parametrize("changed", [0, 10, 30, 60])
+def test_signatures_estimate_jaccard_similarity(changed):
+    rng = random.Random(changed)
+    hasher = MinHasher(num_perm=256, shingle_size=1)
+    first = story(rng)
+    second = rewrite(rng, first, changed)
+
+    estimate = (
+        hasher.signature(" ".join(first)) == hasher.signature(" ".join(second))
+    ).mean()
+
+    assert estimate == pytest.approx(jaccard(set(first), set(second)), abs=0.1)
+
+
+def test_rewritten_stories_are_found_across_sources():
+    rng = random.Random(1)
+    index = NearDuplicateIndex()
+    originals = [story(rng) for _ in range(200)]
+    for number, words in enumerate(originals):
+        index.add(news_item(f"openai-{number}", words))
+
+    found = 0
+    for number, words in enumerate(originals):
+        duplicate = news_item(f"youtube-{number}", rewrite(rng, words, 5), "YouTube")
+        representative, _ = index.find(duplicate)
+        found += (
+            representative is not None and representative.guid == f"openai-{number}"
+        )
+
+    # Around 0.8 similar, which 32 bands of 4 rows miss about once in 10,000
+    assert found >= 198
+
+
+def test_unrelated_stories_are_not_duplicates():
+    rng = random.Random(2)
+    index = NearDuplicateIndex()
+    for number in range(200):
+        index.add(news_item(f"openai-{number}", story(rng)))
+
+    matches = [index.find(news_item(f"new-{n}", story(rng)))[0] for n in range(200)]
+
+    assert matches == [None] * 200
+
+
+def test_the_most_similar_item_is_the_representative():
+    rng = random.Random(3)
+    words = story(rng)
+    index = NearDuplicateIndex()
+    index.add(news_item("loose", rewrite(rng, words, 15)))
+    index.add(news_item("close", rewrite(rng, words, 2)))
+
+    representative, signature = index.find(news_item("new", words))
+
+    assert representative.guid == "close"
+    index.add(news_item("new", words), signature)
+    assert index.find(news_item("new", words))[0].guid == "close"
@@ -0,0 +1,136 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models import RunnerConfig, RunnerResult
+from app.models.news import NewsItem
+from app.runner import Runner
+from app.scrapers import FeedCache
+
+FEED_URL = "https://example.com/{name}.xml"
+
+
+class Fetcher:
+    """Counts like a FeedFetcher, with entries recorded by the test's scrapers."""
+
+    def __init__(self, feed_cache: FeedCache):
+        self.feed_cache = feed_cache
+        self.feeds_fetched = 0
+        self.feeds_not_modified = 0
+
+
+def entries(name: str):
+    return [{"id": f"{name}-{index}"} for index in range(3)]
+
+
+def scrape(fetcher: Fetcher, name: str, fail: bool = False):
+    """A scrape task whose feed is parsed before the scraper itself fails."""
+
+    async def run():
+        new_entries = fetcher.feed_cache.update(
+            FEED_URL.format(name=name), entries(name)
+        )
+        if fail:
+            raise RuntimeError(f"{name} markup changed")
+        return [
+            NewsItem(
+                guid=entry["id"],
+                source="OpenAI",
+                title=f"Post {entry['id']}",
+                url=f"https://example.com/{entry['id']}",
+                published_at=datetime.now(timezone.utc),
+                author="OpenAI",
+            )
+            for entry in new_entries
+        ]
+
+    return name, [FEED_URL.format(name=name)], run()
+
+
+@pytest.fixture
+def runner(sqlite_repository):
+    return Runner(RunnerConfig(youtube_channels=[]), sqlite_repository)
+
+
+def ingest(runner: Runner, fetcher: Fetcher, fail: bool = False):
+    tasks = [scrape(fetcher, "news"), scrape(fetcher, "blog", fail)]
+    return asyncio.run(runner._ingest(fetcher, tasks, digest=False))
+
+
+def test_failed_scraper_sees_its_entries_again(runner):
+    fetcher = Fetcher(FeedCache(runner.repository))
+
+    scraped, saved, _ = ingest(runner, fetcher, fail=True)
+    assert scraped["blog"] is None and len(saved) == 3
+
+    scraped, saved, _ = ingest(runner, Fetcher(FeedCache(runner.repository)))
+    assert scraped["news"] == []
+    assert [item.guid for item in scraped["blog"]] == ["blog-0", "blog-1", "blog-2"]
+
+
+def test_failed_enrichment_stores_items_undigested(runner, monkeypatch):
+    async def fail(videos):
+        raise RuntimeError("transcripts unavailable")
+
+    monkeypatch.setattr(runner.youtube_scraper, "add_transcripts", fail)
+    fetcher = Fetcher(FeedCache(runner.repository))
+    tasks = [scrape(fetcher, "news")]
+
+    _, saved, save_result = asyncio.run(runner._ingest(fetcher, tasks))
+
+    assert save_result.inserted == 3
+    assert all(item.digest is None for item in saved)
+    assert fetcher.feed_cache.get_state(FEED_URL.format(name="news")).seen_guids
+
+
+def test_failed_write_forgets_every_fetch(runner, monkeypatch):
+    def fail(items):
+        raise RuntimeError("database is gone")
+
+    fetcher = Fetcher(FeedCache(runner.repository))
+    monkeypatch.setattr(runner.repository, "save_news_items", fail)
+    with pytest.raises(RuntimeError):
+        ingest(runner, fetcher)
+
+    # The same cache, as the daemon keeps polling with it
+    for name in ("news", "blog"):
+        state = fetcher.feed_cache.get_state(FEED_URL.format(name=name))
+        assert state.seen_guids == []
+
+
+def test_only_inserted_items_count_as_saved(runner):
+    fetcher = Fetcher(FeedCache())
+    first, second = RunnerResult(), RunnerResult()
+
+    for result in (first, second):
+        # The cache has no repository, so the same entries are scraped again
+        _, saved, save_result = asyncio.run(
+            runner._ingest(fetcher, [scrape(fetcher, "news")], digest=False)
+        )
+        fetcher.feed_cache = FeedCache()
+        runner._record_items(result, saved, save_result)
+
+    assert (first.articles_saved, first.videos_saved) == (3, 0)
+    assert len(second.articles) == 3
+    assert (second.articles_saved, second.save_result.skipped) == (0, 3)
+
+
+def test_items_are_stored_while_other_scrapers_run(runner):
+    fetcher = Fetcher(FeedCache(runner.repository))
+
+    async def slow_scraper():
+        # Only finishes once the fast scraper's items reached the database
+        for _ in range(500):
+            stored = await asyncio.to_thread(
+                runner.repository.get_news_items_by_guids, ["news-0"]
+            )
+            if stored:
+                return []
+            await asyncio.sleep(0.01)
+        raise TimeoutError("items waited for every scraper")
+
+    tasks = [scrape(fetcher, "news"), ("slow", [], slow_scraper())]
+    scraped, saved, _ = asyncio.run(runner._ingest(fetcher, tasks, digest=False))
+
+    assert scraped["slow"] == [] and len(saved) == 3
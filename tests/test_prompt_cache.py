@@ -0,0 +1,68 @@
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.agent import PromptCache
+from app.models import PromptCacheConfig
+from app.models.prompt import CachedPrompt
+
+
+class Langfuse:
+    """Serves version 3 of every prompt, or fails while ``down``."""
+
+    def __init__(self, down: bool = False):
+        self.down = down
+        self.calls = 0
+
+    def get_prompt(self, name, version=None):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("Langfuse is unreachable")
+        return SimpleNamespace(version=3, prompt=f"Langfuse {name}: {{{{contents}}}}")
+
+
+@pytest.fixture
+def config(tmp_path):
+    return PromptCacheConfig(cache_dir=str(tmp_path / "prompts"), ttl_seconds=0)
+
+
+@pytest.mark.parametrize("name", ["digest-prompt", "email-prompt", "condense-prompt"])
+def test_outage_on_a_fresh_host_uses_the_bundled_template(config, name):
+    prompt = PromptCache(Langfuse(down=True), config).get(name)
+
+    assert prompt.version == PromptCache.BUNDLED_VERSION
+    assert prompt.compile(contents="<items>").endswith("<items>\n")
+
+
+def test_bundled_template_is_replaced_once_langfuse_is_back(config):
+    langfuse = Langfuse(down=True)
+    cache = PromptCache(langfuse, config)
+    cache.get("digest-prompt")
+
+    langfuse.down = False
+    cache.get("digest-prompt")
+    for _ in range(100):
+        if not cache._refreshing and cache.get("digest-prompt").version == 3:
+            break
+        time.sleep(0.01)
+
+    assert cache.get("digest-prompt").version == 3
+    assert cache._path("digest-prompt").exists()
+
+
+def test_outage_uses_the_disk_copy_whatever_its_age(config):
+    cache = PromptCache(Langfuse(down=True), config)
+    cache._store(
+        CachedPrompt(
+            name="digest-prompt",
+            version=2,
+            template="Old {{contents}}",
+            fetched_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        )
+    )
+
+    prompt = PromptCache(Langfuse(down=True), config).get("digest-prompt")
+
+    assert (prompt.version, prompt.template) == (2, "Old {{contents}}")
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.models import RankingConfig
+from app.models.news import Coverage, NewsItem
+from app.processing import ItemRanker
+
+NOW = datetime.now(timezone.utc)
+
+
+def news_item(guid: str, hours_old: float = 0, source: str = "OpenAI", **fields):
+    return NewsItem(
+        guid=guid,
+        source=source,
+        title=fields.pop("title", f"Post {guid}"),
+        url=f"https://example.com/{guid}",
+        published_at=NOW - timedelta(hours=hours_old),
+        author=source,
+        **fields,
+    )
+
+
+def guids(items):
+    return [item.guid for item in items]
+
+
+def test_recency_halves_every_half_life():
+    ranker = ItemRanker(RankingConfig(recency_half_life_hours=24))
+
+    fresh = ranker.score(news_item("fresh"), NOW)
+    day_old = ranker.score(news_item("old", hours_old=24), NOW)
+
+    assert day_old == pytest.approx(fresh / 2)
+
+
+def test_weights_boosts_and_coverage_raise_the_score():
+    ranker = ItemRanker(
+        RankingConfig(
+            source_weights={"Anthropic": 2.0},
+            keyword_boosts={"Open Weights": 1.0},
+            coverage_weight=0.5,
+        )
+    )
+    plain = ranker.score(news_item("plain"), NOW)
+
+    assert ranker.score(news_item("a", source="Anthropic"), NOW) == pytest.approx(2.0)
+    assert ranker.score(
+        news_item("b", digest="open weights out"), NOW
+    ) == pytest.approx(2.0)
+    covered = news_item(
+        "c", also_covered_by=[Coverage(source="YouTube", url="https://y.tube/1")]
+    )
+    assert ranker.score(covered, NOW) == pytest.approx(plain * 1.5)
+
+
+def test_top_k_is_ordered_by_score_and_the_rest_overflows():
+    ranker = ItemRanker(RankingConfig(top_k=2))
+    items = [
+        news_item(guid, hours_old=hours)
+        for guid, hours in [("c", 30), ("a", 1), ("d", 50), ("b", 10)]
+    ]
+
+    top, overflow = ranker.select(items)
+
+    assert guids(top) == ["a", "b"]
+    assert guids(overflow) == ["c", "d"]
+
+
+def test_ties_keep_the_given_order():
+    ranker = ItemRanker(RankingConfig(top_k=3))
+    published_at = NOW - timedelta(hours=5)
+    items = [
+        news_item(guid).model_copy(update={"published_at": published_at})
+        for guid in ["first", "second", "third", "fourth", "fifth"]
+    ]
+
+    top, overflow = ranker.select(items)
+
+    assert guids(top) == ["first", "second", "third"]
+    assert guids(overflow) == ["fourth", "fifth"]
+
+
+def test_fewer_items_than_k_are_all_selected():
+    top, overflow = ItemRanker(RankingConfig(top_k=15)).select(
+        [news_item("a", 2), news_item("b", 1)]
+    )
+
+    assert (guids(top), overflow) == (["b", "a"], [])
@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, text
+
+from app.db.compression import BodyCompressor
+from app.db.models import NewsItemDB
+from app.models.news import NewsItem, Transcript
+
+PUBLISHED_AT = datetime(2025, 6, 2, 12, tzinfo=timezone.utc)
+
+
+def news_item(guid="post-1", published_at=PUBLISHED_AT, **fields) -> NewsItem:
+    return NewsItem(
+        guid=guid,
+        source="Anthropic",
+        title=fields.pop("title", "Open weights release"),
+        url=f"https://example.com/{guid}",
+        published_at=published_at,
+        author="Anthropic",
+        **fields,
+    )
+
+
+def count_rows(repository) -> int:
+    with repository.SessionLocal() as session:
+        return session.scalar(select(func.count()).select_from(NewsItemDB))
+
+
+def test_redated_entry_keeps_one_row(repository):
+    first = repository.save_news_items([news_item(digest="Weights are out.")])
+    assert first.inserted_by_source == {"Anthropic": 1}
+    result = repository.save_news_items(
+        [news_item(published_at=PUBLISHED_AT + timedelta(days=3), digest="Later.")]
+    )
+
+    assert (result.inserted, result.updated, result.skipped) == (0, 0, 1)
+    assert result.inserted_by_source == {}
+    assert count_rows(repository) == 1
+    assert len(repository.search("weights")) == 1
+    assert repository.get_term_stats(["weights"]) == (1, {"weights": 1})
+
+
+def test_redated_entry_receives_its_digest(repository):
+    repository.save_news_items([news_item()])
+    result = repository.save_news_items(
+        [news_item(published_at=PUBLISHED_AT + timedelta(days=3), digest="Digest.")]
+    )
+
+    assert (result.inserted, result.updated) == (0, 1)
+    stored = repository.get_news_items_by_guids(["post-1"])["post-1"]
+    assert stored.digest == "Digest."
+    assert stored.published_at.replace(tzinfo=timezone.utc) == PUBLISHED_AT
+
+
+def test_sqlite_drops_duplicate_guids_stored_before(sqlite_repository):
+    sqlite_repository.save_news_items(
+        [
+            news_item(),
+            news_item(guid="post-2", published_at=PUBLISHED_AT + timedelta(days=3)),
+        ]
+    )
+    with sqlite_repository.engine.begin() as connection:
+        connection.execute(text("DROP INDEX uq_news_items_guid"))
+        connection.execute(text("UPDATE news_items SET guid = 'post-1'"))
+
+    sqlite_repository.create_tables()
+
+    assert count_rows(sqlite_repository) == 1
+    assert sqlite_repository.save_news_items([news_item()]).skipped == 1
+
+
+def test_listings_read_the_preview_of_long_descriptions(repository):
+    transcript = " ".join(f"word{index}" for index in range(2_000))
+    repository.save_news_items([news_item(description=transcript)])
+
+    [listed] = repository.get_news_items_page().items
+    [streamed] = repository.iter_news_items()
+    [full] = repository.get_news_items_page(description_chars=None).items
+
+    assert listed.description == transcript[: BodyCompressor.PREVIEW_CHARS]
+    assert streamed.description == listed.description
+    assert full.description == transcript
+
+
+def test_stored_items_filtered_to_undigested(repository):
+    since = datetime.now(timezone.utc) - timedelta(hours=1)
+    repository.save_news_items(
+        [news_item(digest="Done."), news_item(guid="post-2", description="x" * 50)]
+    )
+
+    [pending] = repository.get_stored_news_items(since, 10, undigested=True)
+
+    assert pending.guid == "post-2"
+    assert pending.description == "x" * 10
+    assert len(repository.get_stored_news_items(since)) == 2
+
+
+def transcript_ending_with(word: str) -> str:
+    return " ".join(["filler"] * 1_000 + [word])
+
+
+def test_search_finds_words_past_the_preview(repository):
+    repository.save_news_items(
+        [news_item(description=transcript_ending_with("quokka"))]
+    )
+
+    [result] = repository.search("quokka")
+
+    assert result.item.guid == "post-1"
+    assert repository.search("quokka filler")
+
+
+def forget_indexed_bodies(connection, repository):
+    if repository.is_sqlite:
+        connection.execute(
+            text(
+                "INSERT INTO news_items_body_fts (news_items_body_fts) "
+                "VALUES ('delete-all')"
+            )
+        )
+    else:
+        connection.execute(text("UPDATE news_items SET description_vector = NULL"))
+
+
+def test_search_indexes_bodies_compressed_later(repository):
+    repository.save_news_items(
+        [news_item(description=transcript_ending_with("quokka"))]
+    )
+    with repository.engine.begin() as connection:
+        connection.execute(
+            text("UPDATE news_items SET description = :body, description_zlib = NULL"),
+            {"body": transcript_ending_with("quokka")},
+        )
+        forget_indexed_bodies(connection, repository)
+
+    assert repository.compress_descriptions() == 1
+    assert len(repository.search("quokka")) == 1
+
+
+def test_search_indexes_bodies_compressed_before_it_did(repository):
+    repository.save_news_items(
+        [news_item(description=transcript_ending_with("quokka"))]
+    )
+    with repository.engine.begin() as connection:
+        forget_indexed_bodies(connection, repository)
+    assert repository.search("quokka") == []
+
+    assert repository.index_compressed_descriptions() == 1
+    assert repository.index_compressed_descriptions() == 0
+    assert len(repository.search("quokka")) == 1
+
+
+def test_transcripts_are_saved_in_chunks(repository, monkeypatch):
+    monkeypatch.setattr(repository, "SAVE_CHUNK_SIZE", 3)
+    fetched_at = datetime.now(timezone.utc)
+    transcripts = [
+        Transcript(
+            video_id=f"video-{index}", text=f"Take {index}", fetched_at=fetched_at
+        )
+        for index in range(7)
+    ]
+    transcripts.append(transcripts[0].model_copy(update={"text": "Retake"}))
+
+    assert repository.save_transcripts(transcripts) == 7
+    repository.save_transcripts([transcripts[6].model_copy(update={"text": None})])
+
+    stored = repository.get_transcripts([f"video-{index}" for index in range(8)])
+    assert len(stored) == 7
+    assert (stored["video-0"].text, stored["video-6"].text) == ("Retake", None)
@@ -0,0 +1,76 @@
+from email.message import EmailMessage
+
+import pytest
+
+from app.models.config import EmailConfig
+from app.services.email_service import SmtpPool
+from benchmarks.fakes import SmtpSink
+
+RECIPIENTS = [f"reader{index}@example.com" for index in range(6)]
+
+
+def message_to(recipient: str):
+    def build_message() -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = "digest@example.com"
+        message["To"] = recipient
+        message["Subject"] = "AI News Digest"
+        message.set_content("Today in AI")
+        return message
+
+    return recipient, build_message
+
+
+def send(sink: SmtpSink, max_attempts: int = 3):
+    pool = SmtpPool(
+        "127.0.0.1",
+        sink.port,
+        ssl=False,
+        username="digest",
+        password="secret",
+        config=EmailConfig(
+            concurrency=2,
+            max_attempts=max_attempts,
+            retry_backoff_seconds=0,
+            timeout_seconds=5,
+        ),
+    )
+    return pool.send([message_to(recipient) for recipient in RECIPIENTS])
+
+
+def test_transient_replies_are_requeued():
+    with SmtpSink(transient_failure_ratio=0.5, seed=1) as sink:
+        result = send(sink, max_attempts=10)
+
+    assert sink.transient_failures > 0
+    assert result.retries >= sink.transient_failures
+    assert (result.sent, result.failed) == (len(RECIPIENTS), [])
+    assert len(sink.messages) == len(RECIPIENTS)
+
+
+def test_busy_server_is_retried_rather_than_failing_recipients():
+    with SmtpSink(busy_connections=2) as sink:
+        result = send(sink)
+
+    assert result.retries > 0
+    assert (result.sent, result.failed) == (len(RECIPIENTS), [])
+
+
+def test_permanent_rejection_fails_only_that_recipient():
+    with SmtpSink(rejected_recipients=[RECIPIENTS[0]]) as sink:
+        result = send(sink)
+
+    assert result.failed == [RECIPIENTS[0]]
+    assert (result.sent, result.retries) == (len(RECIPIENTS) - 1, 0)
+
+
+@pytest.mark.parametrize(
+    "refusal", [{"reject_login": True}, {"refuse_connections": True}]
+)
+def test_refused_session_stops_the_send(refusal):
+    with SmtpSink(**refusal) as sink:
+        result = send(sink)
+
+    assert sorted(result.failed) == sorted(RECIPIENTS)
+    assert (result.sent, result.retries) == (0, 0)
+    assert sink.connections <= 2
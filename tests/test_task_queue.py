@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from app.distributed import Coordinator, Worker
+from app.models.config import DistributedConfig, RunnerConfig
+
+
+def enqueue(repository, count=1, run_id="run"):
+    repository.enqueue_tasks(run_id, "scrape", [{"index": i} for i in range(count)])
+
+
+def task_row(repository, task_id):
+    with repository.engine.connect() as connection:
+        return connection.execute(
+            text("SELECT status, worker_id, attempts FROM tasks WHERE id = :id"),
+            {"id": task_id},
+        ).one()
+
+
+def test_claim_skips_locked_rows(postgres_repository):
+    enqueue(postgres_repository, 2)
+    with postgres_repository.engine.connect() as connection:
+        with connection.begin():
+            locked = connection.execute(
+                text("SELECT id FROM tasks ORDER BY id LIMIT 1 FOR UPDATE")
+            ).scalar_one()
+            task = postgres_repository.claim_task("w1", 60, 3)
+
+    assert task is not None
+    assert task.id != locked
+    assert task_row(postgres_repository, locked).status == "pending"
+
+
+def test_expired_lease_is_reclaimed(postgres_repository):
+    enqueue(postgres_repository)
+    first = postgres_repository.claim_task("w1", -1, 3)
+    second = postgres_repository.claim_task("w2", 60, 3)
+
+    assert second.id == first.id
+    assert second.attempts == 2
+    assert task_row(postgres_repository, first.id).worker_id == "w2"
+
+
+def test_live_lease_is_not_reclaimed(postgres_repository):
+    enqueue(postgres_repository)
+    assert postgres_repository.claim_task("w1", 60, 3) is not None
+    assert postgres_repository.claim_task("w2", 60, 3) is None
+
+
+def test_complete_is_rejected_after_the_lease_is_lost(postgres_repository):
+    enqueue(postgres_repository)
+    task = postgres_repository.claim_task("w1", -1, 3)
+    postgres_repository.claim_task("w2", 60, 3)
+
+    assert not postgres_repository.complete_task(task.id, "w1", {"stale": True})
+    assert not postgres_repository.extend_lease(task.id, "w1", 60)
+    assert postgres_repository.complete_task(task.id, "w2", {"fresh": True})
+    assert postgres_repository.get_task_results("run", "scrape") == [{"fresh": True}]
+
+
+def test_task_fails_after_max_attempts(postgres_repository):
+    enqueue(postgres_repository)
+    for attempt in range(1, 3):
+        task = postgres_repository.claim_task("w1", 60, 2)
+        assert task.attempts == attempt
+        postgres_repository.fail_task(task.id, "w1", "boom", 2)
+
+    assert postgres_repository.claim_task("w1", 60, 2) is None
+    assert postgres_repository.get_task_counts("run", "scrape") == {"failed": 1}
+
+
+def test_expired_last_lease_fails_the_task(postgres_repository):
+    enqueue(postgres_repository)
+    postgres_repository.claim_task("w1", -1, 2)
+    # One attempt is left, so the expired task stays claimable
+    assert postgres_repository.fail_expired_tasks("run", 2) == 0
+    postgres_repository.claim_task("w2", -1, 2)
+
+    assert postgres_repository.fail_expired_tasks("run", 2) == 1
+    assert postgres_repository.claim_task("w2", 60, 2) is None
+
+
+def test_worker_keeps_its_lease_until_it_is_lost(postgres_repository):
+    config = RunnerConfig(distributed=DistributedConfig(lease_seconds=3))
+    worker = Worker(config, postgres_repository, "w1")
+    enqueue(postgres_repository)
+    task = postgres_repository.claim_task("w1", 3, 3)
+
+    async def keep_then_lose():
+        keep_leased = asyncio.create_task(worker._keep_leased(task))
+        await asyncio.sleep(1.5)
+        assert not keep_leased.done()
+        postgres_repository.fail_unfinished_tasks("run", "scrape", "taken over")
+        await asyncio.wait_for(keep_leased, timeout=3)
+
+    started = time.monotonic()
+    asyncio.run(keep_then_lose())
+    # Outlived its original three second lease while it was being extended
+    assert time.monotonic() - started >= 1.5
+
+
+def test_coordinator_fails_unfinished_tasks_at_the_deadline(postgres_repository):
+    config = RunnerConfig(distributed=DistributedConfig(poll_seconds=0.1))
+    coordinator = Coordinator(config, postgres_repository)
+    enqueue(postgres_repository, 2)
+    postgres_repository.claim_task("w1", 60, 3)
+
+    counts = asyncio.run(
+        coordinator._wait_for("run", "scrape", deadline=time.monotonic())
+    )
+
+    assert counts == {"failed": 2}
+    assert postgres_repository.claim_task("w1", 60, 3) is None